@@ -14,11 +14,136 @@ class Settings:
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
 
+    # Async PostgREST connection pool
+    DB_POOL_MAX_CONNECTIONS: int = int(os.getenv("DB_POOL_MAX_CONNECTIONS", "100"))
+    DB_POOL_MAX_KEEPALIVE: int = int(os.getenv("DB_POOL_MAX_KEEPALIVE", "20"))
+    DB_POOL_KEEPALIVE_EXPIRY_SECONDS: float = float(
+        os.getenv("DB_POOL_KEEPALIVE_EXPIRY_SECONDS", "30")
+    )
+    DB_TIMEOUT_SECONDS: float = float(os.getenv("DB_TIMEOUT_SECONDS", "10"))
+    # Connections opened on startup so the first requests skip the handshake
+    DB_WARMUP_CONNECTIONS: int = int(os.getenv("DB_WARMUP_CONNECTIONS", "2"))
+
+    # "postgrest" (HTTP, via SUPABASE_URL) or "postgres" (direct SQL over
+    # asyncpg, via DATABASE_URL)
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "postgrest")
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    PG_POOL_MIN_SIZE: int = int(os.getenv("PG_POOL_MIN_SIZE", "2"))
+    PG_POOL_MAX_SIZE: int = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+    # Prepared statements kept per connection; 0 behind PgBouncer
+    # (transaction mode), e.g. the Supabase pooler on port 6543
+    PG_STATEMENT_CACHE_SIZE: int = int(os.getenv("PG_STATEMENT_CACHE_SIZE", "256"))
+
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "11520")
     )  # 8 days
 
+    # Authenticated-principal cache (get_current_user); TTL 0 disables it
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(
+        os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60")
+    )
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+    # bcrypt worker pool ("thread" or "process"); requests beyond
+    # size + max queue are rejected with 503
+    PASSWORD_POOL_KIND: str = os.getenv("PASSWORD_POOL_KIND", "thread")
+    PASSWORD_POOL_SIZE: int = int(
+        os.getenv("PASSWORD_POOL_SIZE", str(min(4, os.cpu_count() or 1)))
+    )
+    PASSWORD_POOL_MAX_QUEUE: int = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", "32"))
+
+    # Token-bucket rate limits per JWT subject, or per client IP for
+    # anonymous requests, login and registration. Syntax in
+    # app/utils/ratelimit.py; an empty RATE_LIMIT_DEFAULT leaves routes
+    # without a rule unlimited
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_DEFAULT: str = os.getenv("RATE_LIMIT_DEFAULT", "20/s:40")
+    RATE_LIMIT_RULES: str = os.getenv(
+        "RATE_LIMIT_RULES",
+        f"POST {API_V1_STR}/auth/token=10/m:20;POST {API_V1_STR}/auth/register=10/h:20",
+    )
+    RATE_LIMIT_MAX_BUCKETS: int = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))
+    # Reverse proxies in front of the app (1 on Render, Railway or Heroku);
+    # client IPs are then read from X-Forwarded-For. Leave 0 when clients
+    # connect directly, or the header could be spoofed
+    RATE_LIMIT_TRUSTED_HOPS: int = int(os.getenv("RATE_LIMIT_TRUSTED_HOPS", "0"))
+
+    # Public event response cache; TTL 0 disables it
+    EVENT_CACHE_TTL_SECONDS: float = float(os.getenv("EVENT_CACHE_TTL_SECONDS", "30"))
+    EVENT_CACHE_SIZE: int = int(os.getenv("EVENT_CACHE_SIZE", "2000"))
+
+    # Rows per multi-row insert / RPC call in the bulk import endpoints
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+    # "sync" applies POST /rsvps/ before answering; "queue" journals it
+    # locally, answers 202 with a ticket and applies it in the background
+    # (app/services/rsvp_queue.py). RSVP_QUEUE_SYNCHRONOUS=FULL makes the
+    # journal survive power loss, not just a crash, at one fsync per commit
+    RSVP_INGEST_MODE: str = os.getenv("RSVP_INGEST_MODE", "sync")
+    RSVP_QUEUE_PATH: str = os.getenv("RSVP_QUEUE_PATH", "rsvp_queue.db")
+    RSVP_QUEUE_SYNCHRONOUS: str = os.getenv("RSVP_QUEUE_SYNCHRONOUS", "NORMAL")
+    RSVP_QUEUE_BATCH_SIZE: int = int(os.getenv("RSVP_QUEUE_BATCH_SIZE", "200"))
+    # How long the drainer lets a batch fill after the first new RSVP
+    RSVP_QUEUE_LINGER_MS: float = float(os.getenv("RSVP_QUEUE_LINGER_MS", "10"))
+    RSVP_QUEUE_LEASE_SECONDS: float = float(
+        os.getenv("RSVP_QUEUE_LEASE_SECONDS", "10")
+    )
+    # Outcomes of applied RSVPs stay readable by ticket this long
+    RSVP_QUEUE_RETENTION_SECONDS: float = float(
+        os.getenv("RSVP_QUEUE_RETENTION_SECONDS", "86400")
+    )
+
+    # "Starts in an hour" reminders to 'going' attendees
+    # (app/services/reminders.py). Enable the scheduler in one process per
+    # deployment; event writes elsewhere reach it through its broker.
+    # Reminders go to REMINDER_SINK_PATH as JSON lines if set, else the log
+    REMINDERS_ENABLED: bool = os.getenv("REMINDERS_ENABLED", "false").lower() == "true"
+    REMINDER_LEAD_MINUTES: float = float(os.getenv("REMINDER_LEAD_MINUTES", "60"))
+    # Events are loaded into memory this far ahead of their reminder
+    REMINDER_HORIZON_MINUTES: float = float(
+        os.getenv("REMINDER_HORIZON_MINUTES", "360")
+    )
+    REMINDER_PAGE_SIZE: int = int(os.getenv("REMINDER_PAGE_SIZE", "1000"))
+    REMINDER_BATCH_SIZE: int = int(os.getenv("REMINDER_BATCH_SIZE", "500"))
+    REMINDER_SINK_PATH: str = os.getenv("REMINDER_SINK_PATH", "")
+
+    # Rows fetched per keyset page when streaming attendee exports
+    EXPORT_PAGE_SIZE: int = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+
+    # Widest window, in days, that series occurrences are expanded over
+    SERIES_MAX_WINDOW_DAYS: int = int(os.getenv("SERIES_MAX_WINDOW_DAYS", "366"))
+
+    # Calendar delta-sync tombstones are kept this long; older sync tokens
+    # get 410 Gone and must start over with a full sync
+    CALENDAR_SYNC_RETENTION_DAYS: int = int(
+        os.getenv("CALENDAR_SYNC_RETENTION_DAYS", "30")
+    )
+
+    # Live RSVP updates (GET /events/{id}/live): messages per event per
+    # second, RSVP changes carried per message before clients are told to
+    # refetch, open streams per worker, and idle keep-alive interval
+    LIVE_MAX_UPDATES_PER_SECOND: float = float(
+        os.getenv("LIVE_MAX_UPDATES_PER_SECOND", "2")
+    )
+    LIVE_MAX_CHANGES: int = int(os.getenv("LIVE_MAX_CHANGES", "50"))
+    LIVE_MAX_SUBSCRIBERS: int = int(os.getenv("LIVE_MAX_SUBSCRIBERS", "10000"))
+    LIVE_HEARTBEAT_SECONDS: float = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+    # Lifetime of the ?token= credential EventSource clients open streams with
+    STREAM_TOKEN_TTL_SECONDS: int = int(os.getenv("STREAM_TOKEN_TTL_SECONDS", "60"))
+
+    # Serve list endpoints from trusted database rows without re-validating
+    # them (app/utils/serialization.py)
+    TRUSTED_RESPONSES: bool = os.getenv("TRUSTED_RESPONSES", "true").lower() == "true"
+
+    # Requests issuing more database queries than this are logged as warnings
+    DB_QUERY_WARN_THRESHOLD: int = int(os.getenv("DB_QUERY_WARN_THRESHOLD", "10"))
+
+    # Opt-in stack sampling: this fraction of requests is profiled, and the
+    # profiles of those slower than PROFILE_SLOW_MS are logged (0 disables)
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_SLOW_MS: float = float(os.getenv("PROFILE_SLOW_MS", "500"))
+
 
 settings = Settings()
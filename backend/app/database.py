@@ -1,20 +1,155 @@
-from typing import Generator
-from supabase import create_client, Client
+"""Database clients, created lazily per process and per event loop.
+
+Nothing connects (or even imports supabase) at import time, so the app can
+be imported without credentials and a pre-fork master (gunicorn --preload,
+uvicorn --workers) never hands a live connection pool to its workers. Each
+worker builds its own client on first use, or in ``startup()`` when the app
+lifespan warms the pool up.
+"""
+import asyncio
+import logging
+import os
+import time
+import weakref
+from typing import TYPE_CHECKING, Generator, Optional
 from .config import settings
+from .db import (
+    AsyncClient,
+    InstrumentedClient,
+    create_async_client,
+    create_pg_client,
+)
+
+if TYPE_CHECKING:
+    from supabase import Client
 
+logger = logging.getLogger(__name__)
 
-def _create_client() -> Client:
+
+def _check_credentials() -> None:
     if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
         raise RuntimeError(
             "SUPABASE_URL and SUPABASE_KEY must be set in your environment (.env)"
         )
+
+
+def _create_client() -> "Client":
+    from supabase import create_client
+
+    _check_credentials()
     return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
 
-# Global Supabase client
-supabase: Client = _create_client()
+def _create_async_client() -> AsyncClient:
+    if settings.DB_BACKEND == "postgres":
+        if not settings.DATABASE_URL:
+            raise RuntimeError("DB_BACKEND=postgres needs DATABASE_URL to be set")
+        return create_pg_client(
+            settings.DATABASE_URL,
+            min_size=settings.PG_POOL_MIN_SIZE,
+            max_size=settings.PG_POOL_MAX_SIZE,
+            statement_cache_size=settings.PG_STATEMENT_CACHE_SIZE,
+            timeout=settings.DB_TIMEOUT_SECONDS,
+        )
+    if settings.DB_BACKEND != "postgrest":
+        raise RuntimeError(f"Unknown DB_BACKEND: {settings.DB_BACKEND!r}")
+    _check_credentials()
+    return create_async_client(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_KEY,
+        max_connections=settings.DB_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.DB_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.DB_POOL_KEEPALIVE_EXPIRY_SECONDS,
+        timeout=settings.DB_TIMEOUT_SECONDS,
+    )
+
+
+# Set by set_client() (tests, benchmarks); used on every loop instead of the
+# per-loop clients below
+async_db: Optional[AsyncClient] = None
+
+_supabase: Optional["Client"] = None
+# httpx pools are bound to the loop that opened them
+_loop_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_instrumented: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _forget_clients() -> None:
+    # In a forked child the inherited sockets belong to the parent: drop them
+    # without closing, and let the child connect on its own
+    global _supabase
+    _supabase = None
+    _loop_clients.clear()
+    _instrumented.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_clients)
+
+
+def get_supabase() -> "Client":
+    """The synchronous supabase client, kept for scripts and one-off tooling."""
+    global _supabase
+    if _supabase is None:
+        _supabase = _create_client()
+    return _supabase
+
+
+def set_client(client: Optional[AsyncClient]) -> None:
+    """Serve every query through ``client``; None restores the default."""
+    global async_db
+    async_db = client
+
+
+def get_async_client() -> AsyncClient:
+    if async_db is not None:
+        return async_db
+    loop = asyncio.get_running_loop()
+    client = _loop_clients.get(loop)
+    if client is None:
+        client = _loop_clients[loop] = _create_async_client()
+    return client
+
+
+def get_db() -> Generator[InstrumentedClient, None, None]:
+    # Simple dependency to provide the async PostgREST client, timed per
+    # table and operation (app/db/instrumented.py)
+    client = get_async_client()
+    instrumented = _instrumented.get(client)
+    if instrumented is None:
+        instrumented = _instrumented[client] = InstrumentedClient(client)
+    yield instrumented
+
+
+async def startup() -> float:
+    """Open up to DB_WARMUP_CONNECTIONS pooled connections; returns seconds.
+
+    A failed warm-up is logged, not raised: the app still starts and the
+    first requests connect on demand.
+    """
+    started = time.perf_counter()
+    db = next(get_db())
+    try:
+        await asyncio.gather(
+            *(
+                db.table("events").select("id").limit(1).execute()
+                for _ in range(settings.DB_WARMUP_CONNECTIONS)
+            )
+        )
+    except Exception:
+        logger.warning("database warm-up failed", exc_info=True)
+    return time.perf_counter() - started
+
+
+async def shutdown() -> None:
+    client = _loop_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        _instrumented.pop(client, None)
+        await client.aclose()
 
 
-def get_db() -> Generator[Client, None, None]:
-    # Simple dependency to provide the supabase client
-    yield supabase
+def __getattr__(name: str):
+    # ``from app.database import supabase`` keeps working, lazily
+    if name == "supabase":
+        return get_supabase()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
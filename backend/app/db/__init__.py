@@ -0,0 +1,21 @@
+from .postgrest import (
+    APIError,
+    APIResponse,
+    AsyncClient,
+    create_async_client,
+)
+from .instrumented import InstrumentedClient
+from .pg import PgClient, create_pg_client
+from .stats import RequestStats, current_request_stats
+
+__all__ = [
+    "APIError",
+    "APIResponse",
+    "AsyncClient",
+    "create_async_client",
+    "InstrumentedClient",
+    "PgClient",
+    "create_pg_client",
+    "RequestStats",
+    "current_request_stats",
+]
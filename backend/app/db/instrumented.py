@@ -0,0 +1,64 @@
+"""Per-table, per-operation timing for every PostgREST call.
+
+``InstrumentedClient`` wraps the client handed out by ``get_db()``. It
+builds queries exactly like ``AsyncClient`` but routes ``send`` through a
+timer, so the services need no changes.
+"""
+import time
+from typing import Any, Dict, Optional
+
+from ..utils.metrics import counter, histogram
+from .postgrest import QueryBuilder, Request, TableBuilder
+from .stats import current_request_stats
+
+db_queries = counter(
+    "db_queries_total", "PostgREST calls by table, operation and outcome"
+)
+db_seconds = histogram(
+    "db_query_duration_seconds",
+    "PostgREST round-trip time by table and operation",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+_METHOD_OPS = {"GET": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+def operation(request: Request) -> str:
+    if request.is_rpc:
+        return "rpc"
+    if request.method == "POST" and "resolution=" in request.headers.get("Prefer", ""):
+        return "upsert"
+    return _METHOD_OPS.get(request.method, request.method.lower())
+
+
+class InstrumentedClient:
+    def __init__(self, client):
+        self.client = client
+
+    def table(self, name: str) -> TableBuilder:
+        return TableBuilder(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> QueryBuilder:
+        return QueryBuilder(self, Request("POST", f"rpc/{fn}", body=params or {}))
+
+    async def send(self, request: Request):
+        table, op = request.table, operation(request)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self.client.send(request)
+            outcome = "ok"
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            db_seconds.observe(elapsed, table=table, op=op)
+            db_queries.inc(table=table, op=op, outcome=outcome)
+            stats = current_request_stats.get()
+            if stats is not None:
+                stats.db_seconds += elapsed
+
+    def __getattr__(self, name: str):
+        # aclose(), rest_url, http, ... come from the wrapped client
+        return getattr(self.client, name)
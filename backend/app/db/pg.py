@@ -0,0 +1,213 @@
+"""Direct Postgres backend: PostgREST requests run as SQL over asyncpg.
+
+``PgClient`` has the same surface as ``AsyncClient`` (``table``, ``rpc``,
+``send``, ``aclose``), so ``get_db()`` can hand either one to the services.
+Requests are compiled to SQL by ``app.db.sql`` against a schema read from
+the catalog on first use, the way PostgREST builds its schema cache.
+
+asyncpg prepares every statement it runs and keeps the prepared statements
+in a per-connection LRU cache (``statement_cache_size``). Because compiled
+SQL only depends on the query shape, the hot lookups (user by email, event
+by id, a page of events) are parsed and planned once per connection. Set the
+cache size to 0 behind a transaction-mode pooler such as PgBouncer, which
+cannot keep prepared statements.
+"""
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from .postgrest import APIError, APIResponse, QueryBuilder, Request, TableBuilder
+from .sql import Compiler, ForeignKey, Function, Schema
+from .stats import record_query
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - only needed for DB_BACKEND=postgres
+    asyncpg = None
+
+COLUMNS_SQL = """
+select c.relname, a.attname, format_type(a.atttypid, a.atttypmod)
+from pg_attribute a
+join pg_class c on c.oid = a.attrelid
+join pg_namespace n on n.oid = c.relnamespace
+where n.nspname = $1 and c.relkind in ('r', 'v', 'm', 'p', 'f')
+  and a.attnum > 0 and not a.attisdropped
+order by c.relname, a.attnum
+"""
+
+KEYS_SQL = """
+select c.relname,
+       array(select a.attname from unnest(i.indkey) with ordinality k(num, pos)
+             join pg_attribute a on a.attrelid = i.indrelid and a.attnum = k.num
+             order by k.pos)
+from pg_index i
+join pg_class c on c.oid = i.indrelid
+join pg_namespace n on n.oid = c.relnamespace
+where n.nspname = $1 and i.indisunique and i.indpred is null
+  and i.indexprs is null
+order by c.relname, i.indisprimary desc
+"""
+
+FOREIGN_KEYS_SQL = """
+select con.conname, c.relname,
+       array(select a.attname from unnest(con.conkey) with ordinality k(num, pos)
+             join pg_attribute a on a.attrelid = con.conrelid and a.attnum = k.num
+             order by k.pos),
+       f.relname,
+       array(select a.attname from unnest(con.confkey) with ordinality k(num, pos)
+             join pg_attribute a on a.attrelid = con.confrelid and a.attnum = k.num
+             order by k.pos)
+from pg_constraint con
+join pg_class c on c.oid = con.conrelid
+join pg_namespace n on n.oid = c.relnamespace
+join pg_class f on f.oid = con.confrelid
+join pg_namespace fn on fn.oid = f.relnamespace
+where con.contype = 'f' and n.nspname = $1 and fn.nspname = $1
+"""
+
+FUNCTIONS_SQL = """
+select p.proname, p.proretset, p.proargnames, p.proargmodes::text[], p.pronargs,
+       p.pronargdefaults,
+       array(select format_type(t.oid, null)
+             from unnest(coalesce(p.proallargtypes, p.proargtypes::oid[]))
+                  with ordinality u(oid, pos)
+             join pg_type t on t.oid = u.oid
+             order by u.pos),
+       rt.typtype = 'c' or p.prorettype = 'record'::regtype,
+       p.prorettype = 'void'::regtype
+from pg_proc p
+join pg_namespace n on n.oid = p.pronamespace
+join pg_type rt on rt.oid = p.prorettype
+where n.nspname = $1 and p.prokind = 'f'
+  and p.prorettype not in ('trigger'::regtype, 'event_trigger'::regtype)
+"""
+
+
+async def introspect(conn, schema: str = "public") -> Schema:
+    columns: Dict[str, Dict[str, str]] = {}
+    for table, column, sql_type in await conn.fetch(COLUMNS_SQL, schema):
+        columns.setdefault(table, {})[column] = sql_type
+
+    keys: Dict[str, List[tuple]] = {}
+    for table, names in await conn.fetch(KEYS_SQL, schema):
+        keys.setdefault(table, []).append(tuple(names))
+
+    foreign_keys = [
+        ForeignKey(name, table, tuple(cols), ref_table, tuple(ref_cols))
+        for name, table, cols, ref_table, ref_cols in await conn.fetch(
+            FOREIGN_KEYS_SQL, schema
+        )
+    ]
+
+    functions: Dict[str, List[Function]] = {}
+    for row in await conn.fetch(FUNCTIONS_SQL, schema):
+        (name, retset, arg_names, modes, nargs, ndefaults, types, rows, void) = row
+        modes = modes or ["i"] * len(types)
+        arg_names = arg_names or [""] * len(types)
+        args = {
+            arg: sql_type
+            for arg, mode, sql_type in zip(arg_names, modes, types)
+            if mode in ("i", "b", "v") and arg
+        }
+        functions.setdefault(name, []).append(
+            Function(
+                name=name,
+                args=args,
+                required=nargs - ndefaults,
+                returns_set=retset,
+                returns_row=rows,
+                returns_void=void,
+            )
+        )
+    return Schema(columns, keys, foreign_keys, functions)
+
+
+def _api_error(exc: Exception) -> APIError:
+    # Same shape PostgREST reports database errors in
+    return APIError(
+        {
+            "code": getattr(exc, "sqlstate", None),
+            "message": getattr(exc, "message", None) or str(exc),
+            "details": getattr(exc, "detail", None),
+            "hint": getattr(exc, "hint", None),
+        }
+    )
+
+
+class PgClient:
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        min_size: int = 2,
+        max_size: int = 10,
+        statement_cache_size: int = 256,
+        timeout: float = 10.0,
+        schema: str = "public",
+    ):
+        if asyncpg is None:
+            raise RuntimeError("DB_BACKEND=postgres needs asyncpg: pip install asyncpg")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.timeout = timeout
+        self.schema = schema
+        self.pool = None
+        self.compiler: Optional[Compiler] = None
+        self._opening: Optional[asyncio.Task] = None
+
+    def table(self, name: str) -> TableBuilder:
+        return TableBuilder(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> QueryBuilder:
+        return QueryBuilder(self, Request("POST", f"rpc/{fn}", body=params or {}))
+
+    async def _open(self) -> None:
+        pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=self.statement_cache_size,
+            command_timeout=self.timeout,
+            # Timestamps render in UTC, as they do through PostgREST
+            server_settings={"timezone": "UTC", "application_name": "event-planner"},
+        )
+        async with pool.acquire() as conn:
+            self.compiler = Compiler(await introspect(conn, self.schema))
+        self.pool = pool
+
+    async def reload_schema(self) -> None:
+        """Re-read the catalog, e.g. after a migration (cf. NOTIFY pgrst)."""
+        async with self.pool.acquire() as conn:
+            self.compiler = Compiler(await introspect(conn, self.schema))
+
+    async def send(self, request: Request) -> APIResponse:
+        record_query()
+        if self.pool is None:
+            # Concurrent first requests share one pool
+            if self._opening is None:
+                self._opening = asyncio.ensure_future(self._open())
+            try:
+                await asyncio.shield(self._opening)
+            except Exception:
+                self._opening = None
+                raise
+        statement = self.compiler.compile(request)
+        try:
+            body, count = await self.pool.fetchrow(statement.sql, *statement.args)
+        except asyncpg.PostgresError as exc:
+            raise _api_error(exc) from exc
+        data = json.loads(body) if body is not None else None
+        return APIResponse(data, count if statement.counted else None)
+
+    async def aclose(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+
+def create_pg_client(dsn: str, **options: Any) -> PgClient:
+    return PgClient(dsn, **options)
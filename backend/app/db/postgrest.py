@@ -0,0 +1,343 @@
+"""Async PostgREST client with the same chained query surface as supabase-py.
+
+``db.table("events").select("*").eq("id", event_id).maybe_single().execute()``
+reads exactly as it does with the synchronous supabase ``Client``; the only
+difference is that ``execute()`` is a coroutine running over a pooled
+``httpx.AsyncClient``, so a PostgREST round trip no longer blocks the event
+loop.
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .query import quote
+from .stats import record_query
+
+
+class APIError(Exception):
+    def __init__(self, error: Dict[str, Any]):
+        self.code = error.get("code")
+        self.message = error.get("message")
+        self.details = error.get("details")
+        self.hint = error.get("hint")
+        super().__init__(self.message or str(error))
+
+
+class APIResponse:
+    def __init__(self, data: Any = None, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self) -> str:
+        return f"APIResponse(data={self.data!r}, count={self.count!r})"
+
+
+class Request:
+    """Backend-neutral description of one PostgREST call."""
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        params: Optional[List[Tuple[str, str]]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        body: Any = None,
+    ):
+        self.method = method
+        self.path = path
+        self.params = params or []
+        self.headers = headers or {}
+        self.body = body
+
+    @property
+    def table(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    @property
+    def is_rpc(self) -> bool:
+        return self.path.startswith("rpc/")
+
+    def prefer(self, value: str) -> None:
+        existing = self.headers.get("Prefer")
+        self.headers["Prefer"] = f"{existing},{value}" if existing else value
+
+
+class QueryBuilder:
+    def __init__(self, client: "AsyncClient", request: Request):
+        self._client = client
+        self._request = request
+        self._single = False
+        self._maybe_single = False
+
+    # Filters -----------------------------------------------------------
+
+    def filter(self, column: str, operator: str, criteria: Any) -> "QueryBuilder":
+        self._request.params.append((column, f"{operator}.{criteria}"))
+        return self
+
+    def eq(self, column: str, value: Any) -> "QueryBuilder":
+        return self.filter(column, "eq", _literal(value))
+
+    def neq(self, column: str, value: Any) -> "QueryBuilder":
+        return self.filter(column, "neq", _literal(value))
+
+    def gt(self, column: str, value: Any) -> "QueryBuilder":
+        return self.filter(column, "gt", _literal(value))
+
+    def gte(self, column: str, value: Any) -> "QueryBuilder":
+        return self.filter(column, "gte", _literal(value))
+
+    def lt(self, column: str, value: Any) -> "QueryBuilder":
+        return self.filter(column, "lt", _literal(value))
+
+    def lte(self, column: str, value: Any) -> "QueryBuilder":
+        return self.filter(column, "lte", _literal(value))
+
+    def like(self, column: str, pattern: str) -> "QueryBuilder":
+        return self.filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "QueryBuilder":
+        return self.filter(column, "ilike", pattern)
+
+    def is_(self, column: str, value: Any) -> "QueryBuilder":
+        return self.filter(column, "is", _literal(value))
+
+    def in_(self, column: str, values) -> "QueryBuilder":
+        joined = ",".join(quote(v) for v in values)
+        return self.filter(column, "in", f"({joined})")
+
+    def or_(self, filters: str) -> "QueryBuilder":
+        self._request.params.append(("or", f"({filters})"))
+        return self
+
+    def and_(self, filters: str) -> "QueryBuilder":
+        self._request.params.append(("and", f"({filters})"))
+        return self
+
+    # Modifiers ---------------------------------------------------------
+
+    def order(
+        self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None
+    ) -> "QueryBuilder":
+        term = f"{column}.{'desc' if desc else 'asc'}"
+        if nullsfirst is not None:
+            term += ".nullsfirst" if nullsfirst else ".nullslast"
+        params = self._request.params
+        for i, (key, value) in enumerate(params):
+            if key == "order":
+                params[i] = ("order", f"{value},{term}")
+                return self
+        params.append(("order", term))
+        return self
+
+    def limit(self, size: int) -> "QueryBuilder":
+        self._set_param("limit", str(size))
+        return self
+
+    def offset(self, size: int) -> "QueryBuilder":
+        self._set_param("offset", str(size))
+        return self
+
+    def range(self, start: int, end: int) -> "QueryBuilder":
+        self._set_param("offset", str(start))
+        self._set_param("limit", str(end - start + 1))
+        return self
+
+    def select(self, *columns: str) -> "QueryBuilder":
+        """Columns returned by an insert, update or delete."""
+        self._set_param("select", ",".join(columns) or "*")
+        return self
+
+    def single(self) -> "QueryBuilder":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "QueryBuilder":
+        self._maybe_single = True
+        return self
+
+    def _set_param(self, key: str, value: str) -> None:
+        params = [(k, v) for k, v in self._request.params if k != key]
+        params.append((key, value))
+        self._request.params = params
+
+    async def execute(self) -> APIResponse:
+        response = await self._client.send(self._request)
+        if not (self._single or self._maybe_single):
+            return response
+        rows = response.data or []
+        if isinstance(rows, dict):
+            rows = [rows]
+        if len(rows) > 1:
+            raise APIError(
+                {
+                    "code": "PGRST116",
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "details": f"The result contains {len(rows)} rows",
+                }
+            )
+        if not rows:
+            if self._single:
+                raise APIError(
+                    {
+                        "code": "PGRST116",
+                        "message": "JSON object requested, multiple (or no) rows returned",
+                        "details": "The result contains 0 rows",
+                    }
+                )
+            return APIResponse(None, response.count)
+        return APIResponse(rows[0], response.count)
+
+
+class TableBuilder:
+    def __init__(self, client: "AsyncClient", table: str):
+        self._client = client
+        self._table = table
+
+    def _query(self, method: str, body: Any = None, **prefer: str) -> QueryBuilder:
+        request = Request(method, self._table, body=body)
+        for key, value in prefer.items():
+            if value:
+                request.prefer(f"{key}={value}")
+        return QueryBuilder(self._client, request)
+
+    def select(self, *columns: str, count: Optional[str] = None) -> QueryBuilder:
+        query = self._query("GET", count=count)
+        query._request.params.append(("select", ",".join(columns) or "*"))
+        return query
+
+    def insert(
+        self,
+        json: Any,
+        *,
+        count: Optional[str] = None,
+        returning: str = "representation",
+        upsert: bool = False,
+        on_conflict: Optional[str] = None,
+    ) -> QueryBuilder:
+        query = self._query(
+            "POST",
+            body=json,
+            **{"return": returning, "count": count},
+        )
+        if upsert:
+            query._request.prefer("resolution=merge-duplicates")
+        if on_conflict:
+            query._request.params.append(("on_conflict", on_conflict))
+        return query
+
+    def upsert(
+        self,
+        json: Any,
+        *,
+        count: Optional[str] = None,
+        returning: str = "representation",
+        ignore_duplicates: bool = False,
+        on_conflict: Optional[str] = None,
+    ) -> QueryBuilder:
+        query = self.insert(
+            json, count=count, returning=returning, on_conflict=on_conflict
+        )
+        resolution = "ignore-duplicates" if ignore_duplicates else "merge-duplicates"
+        query._request.prefer(f"resolution={resolution}")
+        return query
+
+    def update(
+        self, json: Any, *, count: Optional[str] = None, returning: str = "representation"
+    ) -> QueryBuilder:
+        return self._query("PATCH", body=json, **{"return": returning, "count": count})
+
+    def delete(
+        self, *, count: Optional[str] = None, returning: str = "representation"
+    ) -> QueryBuilder:
+        return self._query("DELETE", **{"return": returning, "count": count})
+
+
+class AsyncClient:
+    def __init__(
+        self,
+        rest_url: str,
+        key: str,
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.rest_url = rest_url.rstrip("/")
+        self.http = httpx.AsyncClient(
+            base_url=self.rest_url,
+            headers={
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+            transport=transport,
+        )
+
+    def table(self, name: str) -> TableBuilder:
+        return TableBuilder(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> QueryBuilder:
+        return QueryBuilder(self, Request("POST", f"rpc/{fn}", body=params or {}))
+
+    async def send(self, request: Request) -> APIResponse:
+        record_query()
+        content = None
+        if request.body is not None:
+            content = json.dumps(request.body, default=str)
+        response = await self.http.request(
+            request.method,
+            "/" + request.path,
+            params=request.params,
+            headers=request.headers,
+            content=content,
+        )
+        if response.status_code >= 400:
+            try:
+                error = response.json()
+            except ValueError:
+                error = {"message": response.text}
+            if not isinstance(error, dict):
+                error = {"message": str(error)}
+            error.setdefault("code", str(response.status_code))
+            raise APIError(error)
+        data = response.json() if response.content else None
+        return APIResponse(data, _parse_count(response.headers.get("content-range")))
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+
+def _literal(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _parse_count(content_range: Optional[str]) -> Optional[int]:
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+def create_async_client(
+    supabase_url: str, supabase_key: str, **options: Any
+) -> AsyncClient:
+    return AsyncClient(f"{supabase_url.rstrip('/')}/rest/v1", supabase_key, **options)
@@ -0,0 +1,194 @@
+"""Parsing helpers for the PostgREST query-string dialect.
+
+The async client builds requests in this dialect, and anything that has to
+execute them without a real PostgREST server (the offline fake in
+``benchmarks/``) parses them back with the helpers below.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+
+LOGIC_KEYS = ("or", "and", "not.or", "not.and")
+RESERVED_PARAMS = ("select", "order", "limit", "offset", "on_conflict", "columns")
+
+
+@dataclass
+class Filter:
+    column: str
+    op: str
+    value: Union[str, List[str]]
+    negate: bool = False
+
+
+@dataclass
+class Logic:
+    op: str  # "or" | "and"
+    children: List[Union["Logic", Filter]]
+    negate: bool = False
+
+
+@dataclass
+class Embed:
+    alias: str
+    table: str
+    hint: Optional[str] = None
+    inner: bool = False
+    columns: List[Union[str, "Embed"]] = field(default_factory=list)
+
+
+@dataclass
+class Order:
+    column: str
+    desc: bool = False
+    nullsfirst: Optional[bool] = None
+
+
+def quote(value) -> str:
+    """Render a literal the way PostgREST expects it inside lists."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    text = str(value)
+    if any(c in text for c in ',.:()" '):
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return text
+
+
+def split_top_level(text: str) -> List[str]:
+    parts, depth, quoted, current = [], 0, False, []
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if quoted:
+            if c == "\\" and i + 1 < len(text):
+                current.append(text[i : i + 2])
+                i += 2
+                continue
+            if c == '"':
+                quoted = False
+            current.append(c)
+        elif c == '"':
+            quoted = True
+            current.append(c)
+        elif c == "(":
+            depth += 1
+            current.append(c)
+        elif c == ")":
+            depth -= 1
+            current.append(c)
+        elif c == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(c)
+        i += 1
+    if current:
+        parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+def unquote(text: str) -> str:
+    if len(text) >= 2 and text[0] == '"' and text[-1] == '"':
+        return text[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return text
+
+
+def _strip_parens(text: str) -> str:
+    text = text.strip()
+    if not (text.startswith("(") and text.endswith(")")):
+        raise ValueError(f"expected a parenthesised list: {text!r}")
+    return text[1:-1]
+
+
+def parse_list(text: str) -> List[str]:
+    return [unquote(p) for p in split_top_level(_strip_parens(text))]
+
+
+def parse_operation(column: str, expr: str) -> Filter:
+    negate = False
+    if expr.startswith("not."):
+        negate, expr = True, expr[4:]
+    op, _, value = expr.partition(".")
+    if op == "in":
+        return Filter(column, op, parse_list(value), negate)
+    return Filter(column, op, unquote(value), negate)
+
+
+def _parse_logic_item(item: str) -> Union[Logic, Filter]:
+    negate = False
+    if item.startswith("not."):
+        rest = item[4:]
+        if rest.startswith(("or(", "and(")):
+            negate, item = True, rest
+    for op in ("or", "and"):
+        if item.startswith(op + "("):
+            node = parse_logic(op, item[len(op):])
+            node.negate = negate
+            return node
+    column, _, expr = item.partition(".")
+    return parse_operation(column, expr)
+
+
+def parse_logic(op: str, text: str) -> Logic:
+    negate = False
+    if op.startswith("not."):
+        negate, op = True, op[4:]
+    items = split_top_level(_strip_parens(text))
+    return Logic(op, [_parse_logic_item(i) for i in items], negate)
+
+
+def parse_params(params: List[Tuple[str, str]]) -> Tuple[List[Union[Logic, Filter]], dict]:
+    """Split query params into a list of (implicitly AND-ed) filters and the
+    reserved modifiers (select/order/limit/offset/...)."""
+    filters: List[Union[Logic, Filter]] = []
+    modifiers: dict = {}
+    for key, value in params:
+        if key in RESERVED_PARAMS:
+            modifiers[key] = value
+        elif key in LOGIC_KEYS:
+            filters.append(parse_logic(key, value))
+        else:
+            filters.append(parse_operation(key, value))
+    return filters, modifiers
+
+
+def parse_select(text: str) -> List[Union[str, Embed]]:
+    items: List[Union[str, Embed]] = []
+    for part in split_top_level(text or "*"):
+        if "(" not in part:
+            items.append(part)
+            continue
+        head, _, body = part.partition("(")
+        alias, _, target = head.rpartition(":")
+        target, _, hint = target.partition("!")
+        inner = hint == "inner"
+        if inner:
+            hint = ""
+        elif hint.endswith("!inner"):
+            hint, inner = hint[: -len("!inner")], True
+        items.append(
+            Embed(
+                alias=alias or target,
+                table=target,
+                hint=hint or None,
+                inner=inner,
+                columns=parse_select(body[:-1]),
+            )
+        )
+    return items
+
+
+def parse_order(text: str) -> List[Order]:
+    orders = []
+    for part in split_top_level(text):
+        bits = part.split(".")
+        order = Order(bits[0])
+        for bit in bits[1:]:
+            if bit == "desc":
+                order.desc = True
+            elif bit == "nullsfirst":
+                order.nullsfirst = True
+            elif bit == "nullslast":
+                order.nullsfirst = False
+        orders.append(order)
+    return orders
@@ -0,0 +1,445 @@
+"""Compile PostgREST requests into parameterized SQL.
+
+The direct Postgres backend (``app.db.pg``) runs the same ``Request`` objects
+the services build for PostgREST. As PostgREST does, every statement makes
+Postgres build the response as one JSON document, so embedded resources,
+timestamps and numbers come back exactly as the HTTP API returns them.
+
+Values are always bound as text parameters and cast to the column type in
+SQL (``in`` lists as one array parameter, limits as integers). The SQL text
+therefore depends only on the shape of a query, not on its values, and the
+driver can keep one prepared statement per shape.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .postgrest import APIError, Request
+from .query import Embed, Filter, Logic, parse_order, parse_params, parse_select
+
+OPERATORS = {
+    "eq": "=",
+    "neq": "<>",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+    "like": "like",
+    "ilike": "ilike",
+}
+IS_VALUES = {"null": "null", "true": "true", "false": "false", "unknown": "unknown"}
+
+
+@dataclass
+class ForeignKey:
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+    ref_table: str
+    ref_columns: Tuple[str, ...]
+
+
+@dataclass
+class Function:
+    name: str
+    # Input arguments in declaration order: name -> SQL type
+    args: Dict[str, str]
+    required: int
+    returns_set: bool
+    returns_row: bool
+    returns_void: bool
+
+
+@dataclass
+class Schema:
+    # table -> column -> SQL type
+    columns: Dict[str, Dict[str, str]]
+    # table -> column tuples of its primary key and unique indexes, pk first
+    keys: Dict[str, List[Tuple[str, ...]]] = field(default_factory=dict)
+    foreign_keys: List[ForeignKey] = field(default_factory=list)
+    functions: Dict[str, List[Function]] = field(default_factory=dict)
+
+    def primary_key(self, table: str) -> Tuple[str, ...]:
+        keys = self.keys.get(table)
+        return keys[0] if keys else ()
+
+    def is_unique(self, table: str, columns: Sequence[str]) -> bool:
+        return any(set(key) <= set(columns) for key in self.keys.get(table, ()))
+
+
+@dataclass
+class Statement:
+    sql: str
+    args: List[Any]
+    # The statement returns (json body, count); count is reported only when
+    # the request asked for it
+    counted: bool = False
+
+
+def ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _error(code: str, message: str, details: Optional[str] = None) -> APIError:
+    return APIError({"code": code, "message": message, "details": details})
+
+
+class _Query:
+    """Parameter list and alias counter for one statement being compiled."""
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.args: List[Any] = []
+        self.aliases = 0
+
+    def alias(self) -> str:
+        self.aliases += 1
+        return f"_t{self.aliases}"
+
+    def param(self, value: Any, cast: Optional[str] = None) -> str:
+        self.args.append(value)
+        placeholder = f"${len(self.args)}"
+        return f"{placeholder}::{cast}" if cast else placeholder
+
+    def json(self, value: Any) -> str:
+        return self.param(json.dumps(value, default=str), "json")
+
+    def value(self, value: str, sql_type: str) -> str:
+        if sql_type == "text":
+            return self.param(value, "text")
+        return f"{self.param(value, 'text')}::{sql_type}"
+
+    def values(self, values: List[str], sql_type: str) -> str:
+        if sql_type == "text":
+            return self.param(values, "text[]")
+        return f"{self.param(values, 'text[]')}::{sql_type}[]"
+
+    def column_type(self, table: str, column: str) -> str:
+        try:
+            return self.schema.columns[table][column]
+        except KeyError:
+            raise _error(
+                "42703", f"column {table}.{column} does not exist"
+            ) from None
+
+    # Filters -----------------------------------------------------------
+
+    def condition(self, table: str, alias: str, node: Union[Filter, Logic]) -> str:
+        if isinstance(node, Logic):
+            joiner = f" {node.op} "
+            sql = "(" + joiner.join(
+                self.condition(table, alias, child) for child in node.children
+            ) + ")"
+        else:
+            sql = self._filter(table, alias, node)
+        return f"not {sql}" if node.negate else sql
+
+    def _filter(self, table: str, alias: str, node: Filter) -> str:
+        if "." in node.column or "->" in node.column:
+            raise _error(
+                "PGRST100", f"filters on {node.column!r} are not supported here"
+            )
+        sql_type = self.column_type(table, node.column)
+        column = f"{alias}.{ident(node.column)}"
+        if node.op in OPERATORS:
+            value = node.value
+            if node.op in ("like", "ilike"):
+                value = value.replace("*", "%")
+                sql_type = "text"
+                column += "::text"
+            return f"({column} {OPERATORS[node.op]} {self.value(value, sql_type)})"
+        if node.op == "in":
+            return f"({column} = any({self.values(node.value, sql_type)}))"
+        if node.op == "is" and node.value.lower() in IS_VALUES:
+            return f"({column} is {IS_VALUES[node.value.lower()]})"
+        raise _error("PGRST100", f"unsupported filter {node.op!r} on {node.column!r}")
+
+    def where(self, table: str, alias: str, filters: List[Union[Filter, Logic]]) -> str:
+        if not filters:
+            return ""
+        return " where " + " and ".join(
+            self.condition(table, alias, node) for node in filters
+        )
+
+    # Select lists ------------------------------------------------------
+
+    def columns(self, table: str, alias: str, items) -> str:
+        parts = []
+        for item in items:
+            if isinstance(item, Embed):
+                parts.append(self.embed(table, alias, item))
+            elif item == "*":
+                parts.append(f"{alias}.*")
+            else:
+                name, _, cast = item.partition("::")
+                label, _, column = name.rpartition(":")
+                label = label or column
+                self.column_type(table, column)
+                sql = f"{alias}.{ident(column)}"
+                if cast:
+                    sql = f"{sql}::{ident(cast)}"
+                parts.append(f"{sql} as {ident(label)}")
+        return ", ".join(parts) or f"{alias}.*"
+
+    def relation(self, table: str, embed: Embed) -> Tuple[ForeignKey, bool, bool]:
+        """The foreign key linking ``table`` to ``embed``; (fk, forward, to_one)."""
+        found = []
+        for fk in self.schema.foreign_keys:
+            if embed.hint and embed.hint != fk.name and (embed.hint,) != fk.columns:
+                continue
+            if fk.table == table and fk.ref_table == embed.table:
+                found.append((fk, True, True))
+            elif fk.table == embed.table and fk.ref_table == table:
+                found.append(
+                    (fk, False, self.schema.is_unique(embed.table, fk.columns))
+                )
+        if not found:
+            raise _error(
+                "PGRST200",
+                f"Could not find a relationship between '{table}' and "
+                f"'{embed.table}' in the schema cache",
+            )
+        if len(found) > 1:
+            raise _error(
+                "PGRST201",
+                f"Could not embed because more than one relationship was found "
+                f"for '{table}' and '{embed.table}'",
+            )
+        return found[0]
+
+    def join(self, table: str, alias: str, embed: Embed, inner_alias: str) -> str:
+        fk, forward, _ = self.relation(table, embed)
+        if forward:
+            pairs = zip(fk.ref_columns, fk.columns)
+        else:
+            pairs = zip(fk.columns, fk.ref_columns)
+        return " and ".join(
+            f"{inner_alias}.{ident(theirs)} = {alias}.{ident(ours)}"
+            for theirs, ours in pairs
+        )
+
+    def embed(self, table: str, alias: str, embed: Embed) -> str:
+        _, _, to_one = self.relation(table, embed)
+        inner = self.alias()
+        rows = (
+            f"select {self.columns(embed.table, inner, embed.columns)} "
+            f"from {ident(embed.table)} {inner} "
+            f"where {self.join(table, alias, embed, inner)}"
+        )
+        row = self.alias()
+        if to_one:
+            sql = f"(select row_to_json({row}) from ({rows}) {row})"
+        else:
+            sql = f"coalesce((select json_agg({row}) from ({rows}) {row}), '[]')"
+        return f"{sql} as {ident(embed.alias)}"
+
+    def inner_joins(self, table: str, alias: str, items) -> List[str]:
+        conditions = []
+        for item in items:
+            if isinstance(item, Embed) and item.inner:
+                inner = self.alias()
+                conditions.append(
+                    f"exists (select 1 from {ident(item.table)} {inner} "
+                    f"where {self.join(table, alias, item, inner)})"
+                )
+        return conditions
+
+
+class Compiler:
+    def __init__(self, schema: Schema):
+        self.schema = schema
+
+    def compile(self, request: Request) -> Statement:
+        if request.is_rpc:
+            return self._rpc(request)
+        if request.table not in self.schema.columns:
+            raise _error(
+                "42P01", f'relation "public.{request.table}" does not exist'
+            )
+        if request.method == "GET":
+            return self._select(request)
+        if request.method == "POST":
+            return self._insert(request)
+        if request.method == "PATCH":
+            return self._update(request)
+        if request.method == "DELETE":
+            return self._delete(request)
+        raise _error("PGRST117", f"Unsupported HTTP method: {request.method}")
+
+    @staticmethod
+    def _wants(request: Request, preference: str) -> bool:
+        return preference in request.headers.get("Prefer", "").split(",")
+
+    def _select(self, request: Request) -> Statement:
+        query = _Query(self.schema)
+        table = request.table
+        filters, modifiers = parse_params(request.params)
+        items = parse_select(modifiers.get("select", "*"))
+        alias = query.alias()
+
+        columns = query.columns(table, alias, items)
+        where = query.where(table, alias, filters)
+        joins = query.inner_joins(table, alias, items)
+        if joins:
+            where += (" and " if where else " where ") + " and ".join(joins)
+        sql = f"select {columns} from {ident(table)} {alias}{where}"
+        counted = self._wants(request, "count=exact")
+        count_sql = f"select count(*) from {ident(table)} {alias}{where}"
+
+        orders = []
+        for order in parse_order(modifiers.get("order", "")):
+            query.column_type(table, order.column)
+            term = f"{alias}.{ident(order.column)} {'desc' if order.desc else 'asc'}"
+            if order.nullsfirst is not None:
+                term += " nulls first" if order.nullsfirst else " nulls last"
+            orders.append(term)
+        if orders:
+            sql += " order by " + ", ".join(orders)
+        if "limit" in modifiers:
+            sql += f" limit {query.param(int(modifiers['limit']))}"
+        if "offset" in modifiers:
+            sql += f" offset {query.param(int(modifiers['offset']))}"
+
+        count = f"({count_sql})" if counted else "null::bigint"
+        return Statement(
+            f"select coalesce(json_agg(_r), '[]')::text, {count} from ({sql}) _r",
+            query.args,
+            counted,
+        )
+
+    def _returning(self, request: Request, query: _Query, write: str) -> Statement:
+        counted = self._wants(request, "count=exact")
+        if self._wants(request, "return=minimal"):
+            return Statement(
+                f"with _w as ({write} returning 1) select null::text, count(*) from _w",
+                query.args,
+                counted,
+            )
+        _, modifiers = parse_params(request.params)
+        if modifiers.get("select", "*") == "*":
+            return Statement(
+                f"with _w as ({write} returning *) "
+                f"select coalesce(json_agg(_w), '[]')::text, count(*) from _w",
+                query.args,
+                counted,
+            )
+        alias = query.alias()
+        columns = query.columns(request.table, alias, parse_select(modifiers["select"]))
+        return Statement(
+            f"with _w as ({write} returning *) "
+            f"select coalesce(json_agg(_r), '[]')::text, count(*) "
+            f"from (select {columns} from _w {alias}) _r",
+            query.args,
+            counted,
+        )
+
+    def _body_columns(self, table: str, rows: List[dict], query: _Query) -> List[str]:
+        columns: Dict[str, None] = {}
+        for row in rows:
+            for column in row:
+                query.column_type(table, column)
+                columns.setdefault(column)
+        return list(columns)
+
+    def _insert(self, request: Request) -> Statement:
+        query = _Query(self.schema)
+        table = request.table
+        rows = request.body if isinstance(request.body, list) else [request.body]
+        columns = self._body_columns(table, rows, query)
+        if not columns:
+            raise _error("PGRST102", "Empty or invalid json")
+        names = ", ".join(ident(c) for c in columns)
+        write = (
+            f"insert into {ident(table)} ({names}) select {names} "
+            f"from json_populate_recordset(null::{ident(table)}, "
+            f"{query.json(rows)})"
+        )
+        prefer = request.headers.get("Prefer", "")
+        if "resolution=" in prefer:
+            _, modifiers = parse_params(request.params)
+            target = (
+                tuple(c.strip() for c in modifiers["on_conflict"].split(","))
+                if "on_conflict" in modifiers
+                else self.schema.primary_key(table)
+            )
+            write += f" on conflict ({', '.join(ident(c) for c in target)})"
+            if "resolution=ignore-duplicates" in prefer:
+                write += " do nothing"
+            else:
+                write += " do update set " + ", ".join(
+                    f"{ident(c)} = excluded.{ident(c)}" for c in columns
+                )
+        return self._returning(request, query, write)
+
+    def _update(self, request: Request) -> Statement:
+        query = _Query(self.schema)
+        table = request.table
+        body = request.body or {}
+        columns = self._body_columns(table, [body], query)
+        if not columns:
+            raise _error("PGRST102", "Empty or invalid json")
+        filters, _ = parse_params(request.params)
+        alias = query.alias()
+        names = ", ".join(ident(c) for c in columns)
+        write = (
+            f"update {ident(table)} {alias} set ({names}) = (select {names} "
+            f"from json_populate_record(null::{ident(table)}, "
+            f"{query.json(body)}))"
+            + query.where(table, alias, filters)
+        )
+        return self._returning(request, query, write)
+
+    def _delete(self, request: Request) -> Statement:
+        query = _Query(self.schema)
+        table = request.table
+        filters, _ = parse_params(request.params)
+        alias = query.alias()
+        write = f"delete from {ident(table)} {alias}" + query.where(
+            table, alias, filters
+        )
+        return self._returning(request, query, write)
+
+    def _function(self, name: str, given: Sequence[str]) -> Function:
+        for function in self.schema.functions.get(name, ()):
+            names = list(function.args)
+            if set(given) <= set(names) and set(names[: function.required]) <= set(
+                given
+            ):
+                return function
+        raise _error(
+            "PGRST202",
+            f"Could not find the function public.{name}"
+            f"({', '.join(sorted(given))}) in the schema cache",
+        )
+
+    def _rpc(self, request: Request) -> Statement:
+        query = _Query(self.schema)
+        name = request.path[len("rpc/"):]
+        body = request.body or {}
+        function = self._function(name, list(body))
+        given = [arg for arg in function.args if arg in body]
+        if given:
+            record = ", ".join(f"{ident(a)} {function.args[a]}" for a in given)
+            source = (
+                f"json_to_record({query.json(body)}) as _a({record})"
+            )
+            call_args = ", ".join(f"{ident(a)} => _a.{ident(a)}" for a in given)
+        else:
+            source, call_args = None, ""
+        call = f"{ident(name)}({call_args})"
+        sources = f"{source} cross join lateral " if source else ""
+
+        if function.returns_set:
+            value = "_f" if function.returns_row else "_f._v"
+            alias = "_f" if function.returns_row else "_f(_v)"
+            sql = (
+                f"select coalesce(json_agg({value}), '[]')::text, null::bigint "
+                f"from {sources}{call} {alias}"
+            )
+        elif function.returns_void:
+            sql = f"select null::text, null::bigint from {sources}(select {call}) _v"
+        else:
+            sql = f"select to_json({call})::text, null::bigint"
+            if source:
+                sql += f" from {source}"
+        return Statement(sql, query.args)
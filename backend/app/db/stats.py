@@ -0,0 +1,23 @@
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        # Summed over the request's queries, so overlapping ones count twice
+        self.db_seconds = 0.0
+
+
+# Set per HTTP request by QueryCountMiddleware; None outside a request
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def record_query() -> None:
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.queries += 1
@@ -1,12 +1,75 @@
+import time
+
+_import_started = time.perf_counter()
+
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from . import database
 from .config import settings
-from .routes import auth_router, users_router, events_router, rsvps_router
+from .routes import (
+    auth_router,
+    users_router,
+    events_router,
+    rsvps_router,
+    series_router,
+    calendar_router,
+)
+from .services import live, rate_limit, reminders, rsvp_queue
+from .services.auth import password_pool, token_subject
+from .utils.metrics import REGISTRY, gauge
+from .utils.middleware import MetricsMiddleware, QueryCountMiddleware
+from .utils.ratelimit import RateLimitMiddleware
+
+
+logger = logging.getLogger("app.startup")
+
+startup_seconds = gauge(
+    "app_startup_seconds", "Time spent in each startup phase of this process"
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cold start = importing the app + warming the database pool; both are
+    # reported so scale-to-zero wake-ups can be tracked
+    warmup = await database.startup()
+    # Replays RSVPs journaled but not applied before the last shutdown
+    await rsvp_queue.queue.start()
+    await reminders.scheduler.start()
+    startup_seconds.set(_import_seconds, phase="import")
+    startup_seconds.set(warmup, phase="db_warmup")
+    logger.info(
+        "startup import_ms=%.1f db_warmup_ms=%.1f pid=%d",
+        _import_seconds * 1000,
+        warmup * 1000,
+        os.getpid(),
+    )
+    yield
+    await reminders.scheduler.stop()
+    await rsvp_queue.queue.stop()
+    await live.hub.stop()
+    password_pool.shutdown(wait=False)
+    await database.shutdown()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description="API for managing community events",
+    lifespan=lifespan,
+)
+
+# Added before CORS so that 429 responses still carry CORS headers
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=rate_limit.limiter,
+    subject=token_subject,
+    prefix=settings.API_V1_STR,
+    trusted_hops=settings.RATE_LIMIT_TRUSTED_HOPS,
 )
 
 # CORS (dev-friendly)
@@ -16,6 +79,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
+)
+
+# Added first so it runs inside QueryCountMiddleware and sees its stats
+app.add_middleware(
+    MetricsMiddleware,
+    profile_sample_rate=settings.PROFILE_SAMPLE_RATE,
+    profile_slow_ms=settings.PROFILE_SLOW_MS,
+)
+app.add_middleware(
+    QueryCountMiddleware, warn_threshold=settings.DB_QUERY_WARN_THRESHOLD
 )
 
 # Mount routers (they already include their own prefixes)
@@ -23,6 +97,8 @@ app.include_router(auth_router, prefix=settings.API_V1_STR, tags=["Auth"])
 app.include_router(users_router, prefix=settings.API_V1_STR, tags=["Users"])
 app.include_router(events_router, prefix=settings.API_V1_STR, tags=["Events"])
 app.include_router(rsvps_router, prefix=settings.API_V1_STR, tags=["RSVPs"])
+app.include_router(series_router, prefix=settings.API_V1_STR, tags=["Series"])
+app.include_router(calendar_router, prefix=settings.API_V1_STR, tags=["Calendar"])
 
 
 @app.get("/")
@@ -33,3 +109,13 @@ async def root():
         "redoc": "/redoc",
         "apiBase": settings.API_V1_STR,
     }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+_import_seconds = time.perf_counter() - _import_started
@@ -2,5 +2,14 @@ from .auth import router as auth_router
 from .users import router as users_router
 from .events import router as events_router
 from .rsvps import router as rsvps_router
+from .series import router as series_router
+from .calendar import router as calendar_router
 
-__all__ = ["auth_router", "users_router", "events_router", "rsvps_router"]
+__all__ = [
+    "auth_router",
+    "users_router",
+    "events_router",
+    "rsvps_router",
+    "series_router",
+    "calendar_router",
+]
@@ -0,0 +1,74 @@
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Request, Response, status
+from ..schemas.calendar import CalendarFeedToken, CalendarSync
+from ..services import calendar as calendar_service
+from ..services.auth import get_current_active_user
+from ..utils.ical import to_utc, render_calendar
+
+router = APIRouter(prefix="/calendar", tags=["calendar"])
+
+
+def _http_date(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+@router.post(
+    "/token", response_model=CalendarFeedToken, status_code=status.HTTP_201_CREATED
+)
+async def create_feed_token(
+    request: Request,
+    current_user: dict = Depends(get_current_active_user),
+):
+    token = await calendar_service.create_feed_token(current_user["id"])
+    return {"token": token, "url": str(request.url_for("calendar_feed", token=token))}
+
+
+@router.delete("/token", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_feed_token(current_user: dict = Depends(get_current_active_user)):
+    await calendar_service.revoke_feed_token(current_user["id"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/sync", response_model=CalendarSync)
+async def sync_calendar(
+    sync_token: Optional[str] = None,
+    current_user: dict = Depends(get_current_active_user),
+):
+    # Without a token this is a full sync. Keep the returned sync_token and
+    # pass it back; 304 means nothing changed and the old token stays valid.
+    changes = await calendar_service.get_changes(current_user["id"], sync_token)
+    if changes is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    return changes
+
+
+# Calendar apps cannot send a bearer token, so the unguessable URL token
+# is the credential
+@router.get("/{token}.ics", name="calendar_feed")
+async def calendar_feed(
+    token: str,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+    version = calendar_service.etag_version(if_none_match)
+    modified_since = None if if_none_match else _http_date(if_modified_since)
+    feed = await calendar_service.get_feed(token, version, modified_since)
+    headers = {
+        "ETag": calendar_service.feed_etag(feed["version"]),
+        "Last-Modified": format_datetime(to_utc(feed["changed_at"]), usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if not feed["modified"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        render_calendar(feed["entries"]),
+        media_type="text/calendar",
+        headers=headers,
+    )
@@ -1,12 +1,49 @@
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from ..schemas.event import EventCreate, EventUpdate, EventResponse
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from ..config import settings
+from ..schemas.bulk import BulkResult
+from ..schemas.event import (
+    EventCreate,
+    EventUpdate,
+    EventResponse,
+    EventSearchResponse,
+    LiveStreamToken,
+    NearbyEvent,
+)
 from ..services import event as event_service
-from ..services.auth import get_current_active_user
+from ..services import event_cache, live
+from ..services.auth import (
+    create_stream_token,
+    get_current_active_user,
+    get_current_user,
+    get_principal,
+    optional_oauth2_scheme,
+    stream_token_subject,
+)
+from ..services.loaders import Loaders, get_loaders
+from ..utils.ndjson import iter_json_items
+from ..utils.serialization import list_response, model_response
 
 router = APIRouter(prefix="/events", tags=["events"])
 
 
+def _cache_headers(etag: str) -> dict:
+    # Bodies carry the caller's own current_user_rsvp, so only private
+    # caches may store them, and they must revalidate with If-None-Match.
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+
 @router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
 async def create_event(
     event: EventCreate,
@@ -15,46 +52,234 @@ async def create_event(
     return await event_service.create_event(event, current_user["id"])
 
 
+@router.post("/bulk", response_model=BulkResult)
+async def create_events_bulk(
+    request: Request,
+    current_user: dict = Depends(get_current_active_user),
+):
+    # Body is a JSON array of events or an application/x-ndjson stream
+    return await event_service.create_events_bulk(
+        iter_json_items(request), current_user["id"]
+    )
+
+
 @router.get("/", response_model=List[EventResponse])
 async def list_events(
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
     is_public: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_active_user),
 ):
-    return await event_service.get_events(
-        skip=skip, limit=limit, is_public=is_public, user_id=current_user["id"]
+    # Events are ordered by (start_time, id). Pass the X-Next-Cursor header
+    # back as ?cursor= to fetch the next page; skip is ignored with a cursor.
+    params = {
+        "skip": skip,
+        "limit": limit,
+        "cursor": cursor,
+        "starts_after": starts_after,
+        "starts_before": starts_before,
+    }
+    # Only the public-only listing is the same for every viewer
+    entry = event_cache.get_list(params) if is_public else None
+    events = None
+    if entry is None:
+        events = await event_service.get_events(
+            is_public=is_public, user_id=current_user["id"], **params
+        )
+        next_cursor = None
+        if len(events) == limit:
+            next_cursor = event_service.event_cursor(events[-1])
+        if is_public:
+            entry = event_cache.put_list(params, events, next_cursor)
+        else:
+            entry = {"etag": event_cache.make_etag(events), "next_cursor": next_cursor}
+
+    headers = _cache_headers(entry["etag"])
+    if entry["next_cursor"]:
+        headers["X-Next-Cursor"] = entry["next_cursor"]
+    if event_cache.etag_matches(if_none_match, entry["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if events is None:
+        events = [dict(event) for event in entry["data"]]
+        await event_service.attach_user_rsvps(events, current_user["id"])
+    return list_response(EventResponse, events, headers)
+
+
+@router.get("/search", response_model=EventSearchResponse)
+async def search_events(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    starts_after: Optional[datetime] = Query(None, alias="from"),
+    starts_before: Optional[datetime] = Query(None, alias="to"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_active_user),
+):
+    # Ranked by text relevance, then start_time; facets count matches per
+    # category regardless of the category filter.
+    found = await event_service.search_events(
+        q=q,
+        category=category,
+        starts_after=starts_after,
+        starts_before=starts_before,
+        user_id=current_user["id"],
+        skip=skip,
+        limit=limit,
     )
+    return model_response(EventSearchResponse, found)
+
+
+@router.get("/nearby", response_model=List[NearbyEvent])
+async def list_nearby_events(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=500),
+    starts_after: Optional[datetime] = Query(None, alias="from"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_active_user),
+):
+    # Nearest first; events without coordinates never match
+    events = await event_service.get_nearby_events(
+        lat,
+        lon,
+        radius_km,
+        user_id=current_user["id"],
+        starts_after=starts_after,
+        limit=limit,
+    )
+    return list_response(NearbyEvent, events)
 
 
 @router.get("/{event_id}", response_model=EventResponse)
 async def get_event(
     event_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_active_user),
 ):
-    event = await event_service.get_event(event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not event["is_public"] and event["created_by"] != current_user["id"]:
-        raise HTTPException(status_code=403, detail="Not authorized to view this event")
+    # Cached entries are public events only, so no visibility check is needed
+    entry = event_cache.get_event(event_id)
+    event = None
+    if entry is None:
+        event = await event_service.get_event(event_id, user_id=current_user["id"])
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        if not event["is_public"] and event["created_by"] != current_user["id"]:
+            raise HTTPException(
+                status_code=403, detail="Not authorized to view this event"
+            )
+        entry = event_cache.put_event(event) or {
+            "etag": event_cache.make_etag([event])
+        }
+
+    headers = _cache_headers(entry["etag"])
+    if event_cache.etag_matches(if_none_match, entry["etag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if event is None:
+        event = dict(entry["data"])
+        await event_service.attach_user_rsvps([event], current_user["id"])
+    response.headers.update(headers)
     return event
 
 
+def _live_scope(event_id: str) -> str:
+    return f"live:{event_id}"
+
+
+async def _live_user(
+    event_id: str,
+    token: Optional[str] = Query(None),
+    bearer: Optional[str] = Depends(optional_oauth2_scheme),
+):
+    # The bearer header as everywhere else, or for EventSource, which
+    # cannot set headers, a ?token= from POST /events/{event_id}/live/token
+    if bearer:
+        user = await get_current_user(bearer)
+    else:
+        email = stream_token_subject(token, _live_scope(event_id)) if token else None
+        user = await get_principal(email) if email else None
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    return await get_current_active_user(user)
+
+
+@router.post("/{event_id}/live/token", response_model=LiveStreamToken)
+async def live_event_token(
+    event_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_active_user),
+):
+    token = create_stream_token(current_user["email"], _live_scope(event_id))
+    url = request.url_for("live_event", event_id=event_id).include_query_params(
+        token=token
+    )
+    return {
+        "token": token,
+        "url": str(url),
+        "expires_in": settings.STREAM_TOKEN_TTL_SECONDS,
+    }
+
+
+@router.get("/{event_id}/live")
+async def live_event(
+    event_id: str,
+    current_user: dict = Depends(_live_user),
+):
+    # Server-sent events: a "snapshot" of the counters, then "update"
+    # messages with fresh counters and the RSVP changes since the last one,
+    # and "deleted" if the event goes away. Subscribe before reading the
+    # snapshot so no change falls between the two.
+    subscriber = live.hub.subscribe(event_id)
+    try:
+        entry = event_cache.get_event(event_id)
+        if entry is not None:
+            event = entry["data"]
+        else:
+            event = await event_service.get_event(event_id)
+            if not event:
+                raise HTTPException(status_code=404, detail="Event not found")
+            if not event["is_public"] and event["created_by"] != current_user["id"]:
+                raise HTTPException(
+                    status_code=403, detail="Not authorized to view this event"
+                )
+    except BaseException:
+        live.hub.unsubscribe(subscriber)
+        raise
+    snapshot = {"event_id": event_id, "counts": event.get("rsvp_counts") or {}}
+    return StreamingResponse(
+        live.stream(subscriber, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.put("/{event_id}", response_model=EventResponse)
 async def update_event(
     event_id: str,
     event: EventUpdate,
     current_user: dict = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders),
 ):
-    return await event_service.update_event(event_id, event, current_user["id"])
+    return await event_service.update_event(
+        event_id, event, current_user["id"], loaders
+    )
 
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_event(
     event_id: str,
     current_user: dict = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders),
 ):
-    success = await event_service.delete_event(event_id, current_user["id"])
+    success = await event_service.delete_event(event_id, current_user["id"], loaders)
     if not success:
         raise HTTPException(status_code=404, detail="Event not found")
     return None
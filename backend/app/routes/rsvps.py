@@ -1,50 +1,178 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from ..schemas.rsvp import RSVPCreate, RSVPUpdate, RSVPResponse
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from ..schemas.bulk import BulkResult
+from ..schemas.rsvp import (
+    RSVPConflict,
+    RSVPCreate,
+    RSVPResponse,
+    RSVPTicket,
+    RSVPUpdate,
+)
 from ..services import rsvp as rsvp_service
+from ..services import rsvp_queue
 from ..services.auth import get_current_active_user
-from ..services import event as event_service
+from ..services.loaders import Loaders, get_loaders
+from ..utils.export import EXPORT_FORMATS, encode_rows
+from ..utils.ndjson import iter_json_items
+from ..utils.serialization import list_response
 
 router = APIRouter(prefix="/rsvps", tags=["rsvps"])
 
 
-@router.post("/", response_model=RSVPResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=RSVPResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": RSVPTicket}},
+)
 async def create_rsvp(
     rsvp: RSVPCreate,
+    request: Request,
+    check_conflicts: bool = False,
     current_user: dict = Depends(get_current_active_user),
 ):
-    return await rsvp_service.create_rsvp(rsvp.event_id, current_user["id"], rsvp.status or "maybe")
+    # check_conflicts: refuse (409) a 'going' RSVP that overlaps another
+    # event the user is going to
+    if rsvp_queue.queue.enabled:
+        if check_conflicts and rsvp.status == "going":
+            await rsvp_service.ensure_no_conflicts(rsvp.event_id, current_user["id"])
+        # Write-behind: journaled now, applied by the drainer shortly
+        ticket = await rsvp_queue.submit(
+            rsvp.event_id, current_user["id"], rsvp.status or "maybe"
+        )
+        location = request.url_for("get_rsvp_ticket", ticket=ticket["ticket"])
+        return JSONResponse(
+            jsonable_encoder(RSVPTicket(**ticket)),
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Location": str(location)},
+        )
+    return await rsvp_service.create_rsvp(
+        rsvp.event_id, current_user["id"], rsvp.status or "maybe", check_conflicts
+    )
+
+
+@router.get("/tickets/{ticket}", response_model=RSVPTicket)
+async def get_rsvp_ticket(
+    ticket: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    return await rsvp_queue.get_ticket(ticket, current_user["id"])
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def create_rsvps_bulk(
+    request: Request,
+    current_user: dict = Depends(get_current_active_user),
+):
+    # Organizer import: a JSON array or application/x-ndjson stream of
+    # {event_id, user_id | email, status} for events the caller created
+    return await rsvp_service.upsert_rsvps_bulk(
+        iter_json_items(request), current_user["id"]
+    )
 
 
 @router.put("/{rsvp_id}", response_model=RSVPResponse)
 async def update_rsvp(
     rsvp_id: str,
     rsvp: RSVPUpdate,
+    check_conflicts: bool = False,
     current_user: dict = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders),
 ):
-    return await rsvp_service.update_rsvp(rsvp_id, rsvp, current_user["id"])
+    return await rsvp_service.update_rsvp(
+        rsvp_id, rsvp, current_user["id"], loaders, check_conflicts
+    )
 
 
-@router.get("/event/{event_id}", response_model=List[RSVPResponse])
-async def list_event_rsvps(
-    event_id: str,
-    status: str = None,
+@router.delete("/{rsvp_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_rsvp(
+    rsvp_id: str,
     current_user: dict = Depends(get_current_active_user),
 ):
+    await rsvp_service.delete_rsvp(rsvp_id, current_user["id"])
+    return None
+
+
+async def _check_event_access(event_id: str, current_user: dict, loaders: Loaders):
     # Verify user has access to the event
-    event = await event_service.get_event(event_id)
+    event = await loaders.events.load(event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     if not event["is_public"] and event["created_by"] != current_user["id"]:
         raise HTTPException(
             status_code=403, detail="Not authorized to view RSVPs for this event"
         )
+    return event
+
+
+@router.get("/event/{event_id}", response_model=List[RSVPResponse])
+async def list_event_rsvps(
+    event_id: str,
+    status: str = None,
+    current_user: dict = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders),
+):
+    await _check_event_access(event_id, current_user, loaders)
+    rsvps = await rsvp_service.get_event_rsvps(event_id, status)
+    return list_response(RSVPResponse, rsvps)
+
+
+EXPORT_CSV_COLUMNS = [
+    "id",
+    "user_id",
+    "user_email",
+    "user_full_name",
+    "status",
+    "waitlist_position",
+    "created_at",
+    "updated_at",
+]
+
+
+@router.get("/event/{event_id}/export")
+async def export_event_rsvps(
+    event_id: str,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[str] = None,
+    current_user: dict = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders),
+):
+    # Streamed straight from keyset pages; the full list is never built
+    await _check_event_access(event_id, current_user, loaders)
+    rows = rsvp_service.iter_event_rsvps(event_id, status)
+    return StreamingResponse(
+        encode_rows(rows, format, EXPORT_CSV_COLUMNS),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="rsvps-{event_id}.{format}"'
+        },
+    )
+
+
+@router.get("/event/{event_id}/waitlist", response_model=List[RSVPResponse])
+async def list_event_waitlist(
+    event_id: str,
+    current_user: dict = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders),
+):
+    # Ordered by waitlist_position; the first entry is promoted next
+    await _check_event_access(event_id, current_user, loaders)
+    return await rsvp_service.get_event_waitlist(event_id)
+
 
-    return await rsvp_service.get_event_rsvps(event_id, status)
+@router.get("/user/me/conflicts", response_model=List[RSVPConflict])
+async def list_my_conflicts(
+    current_user: dict = Depends(get_current_active_user),
+):
+    # Overlapping pairs among the events the user is going to
+    return await rsvp_service.get_conflicts(current_user["id"])
 
 
 @router.get("/user/me", response_model=List[RSVPResponse])
 async def list_my_rsvps(
     current_user: dict = Depends(get_current_active_user),
 ):
-    return await rsvp_service.get_user_rsvps(current_user["id"])
+    rsvps = await rsvp_service.get_user_rsvps(current_user["id"])
+    return list_response(RSVPResponse, rsvps)
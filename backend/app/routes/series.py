@@ -0,0 +1,129 @@
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from ..schemas.rsvp import RSVPUpdate
+from ..schemas.series import (
+    OccurrenceResponse,
+    OccurrenceUpdate,
+    SeriesCreate,
+    SeriesResponse,
+    SeriesRSVPResponse,
+    SeriesUpdate,
+)
+from ..services import series as series_service
+from ..services.auth import get_current_active_user
+from ..utils.serialization import list_response
+
+router = APIRouter(prefix="/series", tags=["series"])
+
+
+@router.post("/", response_model=SeriesResponse, status_code=status.HTTP_201_CREATED)
+async def create_series(
+    series: SeriesCreate,
+    current_user: dict = Depends(get_current_active_user),
+):
+    return await series_service.create_series(series, current_user["id"])
+
+
+@router.get("/occurrences", response_model=List[OccurrenceResponse])
+async def list_occurrences(
+    window_start: datetime = Query(..., alias="from"),
+    window_end: datetime = Query(..., alias="to"),
+    current_user: dict = Depends(get_current_active_user),
+):
+    # Occurrences of every visible series starting in [from, to)
+    occurrences = await series_service.list_occurrences(
+        window_start, window_end, user_id=current_user["id"]
+    )
+    return list_response(OccurrenceResponse, occurrences)
+
+
+@router.get("/{series_id}", response_model=SeriesResponse)
+async def get_series(
+    series_id: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    series = await series_service.get_series(series_id)
+    if not series or not (
+        series["is_public"] or series["created_by"] == current_user["id"]
+    ):
+        raise HTTPException(status_code=404, detail="Series not found")
+    return series
+
+
+@router.put("/{series_id}", response_model=SeriesResponse)
+async def update_series(
+    series_id: str,
+    series: SeriesUpdate,
+    current_user: dict = Depends(get_current_active_user),
+):
+    return await series_service.update_series(series_id, series, current_user["id"])
+
+
+@router.delete("/{series_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_series(
+    series_id: str,
+    current_user: dict = Depends(get_current_active_user),
+):
+    await series_service.delete_series(series_id, current_user["id"])
+    return None
+
+
+@router.get("/{series_id}/occurrences", response_model=List[OccurrenceResponse])
+async def list_series_occurrences(
+    series_id: str,
+    window_start: datetime = Query(..., alias="from"),
+    window_end: datetime = Query(..., alias="to"),
+    current_user: dict = Depends(get_current_active_user),
+):
+    occurrences = await series_service.list_occurrences(
+        window_start, window_end, user_id=current_user["id"], series_id=series_id
+    )
+    return list_response(OccurrenceResponse, occurrences)
+
+
+@router.put(
+    "/{series_id}/occurrences/{occurrence_start}", response_model=OccurrenceResponse
+)
+async def update_occurrence(
+    series_id: str,
+    occurrence_start: datetime,
+    changes: OccurrenceUpdate,
+    current_user: dict = Depends(get_current_active_user),
+):
+    # Edit or cancel one occurrence without touching the rest of the series
+    return await series_service.update_occurrence(
+        series_id, occurrence_start, changes, current_user["id"]
+    )
+
+
+@router.put(
+    "/{series_id}/occurrences/{occurrence_start}/rsvp",
+    response_model=SeriesRSVPResponse,
+)
+async def rsvp_occurrence(
+    series_id: str,
+    occurrence_start: datetime,
+    rsvp: RSVPUpdate,
+    current_user: dict = Depends(get_current_active_user),
+):
+    return await series_service.rsvp_occurrence(
+        series_id, occurrence_start, current_user["id"], rsvp.status
+    )
+
+
+@router.delete(
+    "/{series_id}/occurrences/{occurrence_start}/rsvp",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def cancel_occurrence_rsvp(
+    series_id: str,
+    occurrence_start: datetime,
+    current_user: dict = Depends(get_current_active_user),
+):
+    deleted = await series_service.cancel_occurrence_rsvp(
+        series_id, occurrence_start, current_user["id"]
+    )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="RSVP not found")
+    return None
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from ..schemas.user import UserResponse, UserUpdate
 from ..services import user as user_service
 from ..services.auth import get_current_active_user
+from ..services.loaders import Loaders, get_loaders
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -19,20 +20,22 @@ async def update_current_user(
     return await user_service.update_user(
         user_id=current_user["id"],
         user=user_update,
-        current_user_id=current_user["id"]
+        current_user_id=current_user["id"],
+        current_email=current_user["email"],
     )
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: str,
     current_user: dict = Depends(get_current_active_user),
+    loaders: Loaders = Depends(get_loaders),
 ):
     if user_id != current_user["id"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this user"
         )
-    user = await user_service.get_user(user_id)
+    user = await loaders.users.load(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -7,8 +7,47 @@ from .user import (
     Token,
     TokenData,
 )
-from .event import EventBase, EventCreate, EventUpdate, EventInDB, EventResponse
-from .rsvp import RSVPBase, RSVPCreate, RSVPUpdate, RSVPInDB, RSVPResponse
+from .event import (
+    EventBase,
+    EventCreate,
+    EventUpdate,
+    EventInDB,
+    EventResponse,
+    RSVPCounts,
+    EventSearchResult,
+    CategoryFacet,
+    EventSearchResponse,
+    NearbyEvent,
+    LiveStreamToken,
+)
+from .rsvp import (
+    RSVPBase,
+    RSVPCreate,
+    RSVPBulkItem,
+    RSVPUpdate,
+    RSVPInDB,
+    RSVPResponse,
+    RSVPTicket,
+    ScheduledEvent,
+    RSVPConflict,
+)
+from .bulk import BulkItemResult, BulkResult
+from .series import (
+    SeriesBase,
+    SeriesCreate,
+    SeriesUpdate,
+    SeriesInDB,
+    SeriesResponse,
+    OccurrenceUpdate,
+    OccurrenceResponse,
+    SeriesRSVPResponse,
+)
+from .calendar import (
+    CalendarFeedToken,
+    CalendarEntry,
+    CalendarTombstone,
+    CalendarSync,
+)
 
 __all__ = [
     "UserBase",
@@ -23,9 +62,33 @@ __all__ = [
     "EventUpdate",
     "EventInDB",
     "EventResponse",
+    "RSVPCounts",
+    "EventSearchResult",
+    "CategoryFacet",
+    "EventSearchResponse",
+    "NearbyEvent",
+    "LiveStreamToken",
     "RSVPBase",
     "RSVPCreate",
+    "RSVPBulkItem",
     "RSVPUpdate",
     "RSVPInDB",
     "RSVPResponse",
+    "RSVPTicket",
+    "ScheduledEvent",
+    "RSVPConflict",
+    "BulkItemResult",
+    "BulkResult",
+    "SeriesBase",
+    "SeriesCreate",
+    "SeriesUpdate",
+    "SeriesInDB",
+    "SeriesResponse",
+    "OccurrenceUpdate",
+    "OccurrenceResponse",
+    "SeriesRSVPResponse",
+    "CalendarFeedToken",
+    "CalendarEntry",
+    "CalendarTombstone",
+    "CalendarSync",
 ]
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[str] = None
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    succeeded: int = 0
+    failed: int = 0
+    results: List[BulkItemResult] = []
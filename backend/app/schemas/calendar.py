@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Literal, Optional
+
+
+class CalendarFeedToken(BaseModel):
+    # Shown once; only its hash is stored
+    token: str
+    url: str
+
+
+class CalendarEntry(BaseModel):
+    rsvp_id: str
+    status: Literal['going', 'not_going', 'maybe', 'waitlisted']
+    event_id: str
+    title: str
+    description: Optional[str] = None
+    location: Optional[str] = None
+    start_time: datetime
+    end_time: datetime
+    updated_at: datetime
+
+
+class CalendarTombstone(BaseModel):
+    rsvp_id: str
+    event_id: str
+    deleted_at: datetime
+
+
+class CalendarSync(BaseModel):
+    sync_token: str
+    # True when entries is the whole calendar rather than a delta
+    full: bool
+    entries: List[CalendarEntry]
+    deleted: List[CalendarTombstone] = []
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 from typing import Optional, List
 from .user import UserResponse
@@ -12,6 +12,14 @@ class EventBase(BaseModel):
     is_public: bool = True
     category: Optional[str] = None
     max_attendees: Optional[int] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def check_coordinates(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be given together")
+        return self
 
 class EventCreate(EventBase):
     pass
@@ -30,7 +38,36 @@ class EventInDB(EventBase):
     class Config:
         from_attributes = True
 
+class RSVPCounts(BaseModel):
+    going: int = 0
+    maybe: int = 0
+    not_going: int = 0
+    waitlisted: int = 0
+
 class EventResponse(EventInDB):
     creator: Optional[UserResponse] = None
     attendees_count: int = 0
     current_user_rsvp: Optional[str] = None
+    rsvp_counts: Optional[RSVPCounts] = None
+
+class EventSearchResult(EventResponse):
+    rank: float = 0
+
+class CategoryFacet(BaseModel):
+    category: Optional[str] = None
+    count: int
+
+class EventSearchResponse(BaseModel):
+    total: int
+    results: List[EventSearchResult]
+    facets: List[CategoryFacet]
+
+class NearbyEvent(EventResponse):
+    distance_km: float
+
+class LiveStreamToken(BaseModel):
+    # For EventSource, which cannot send an Authorization header: open
+    # ``url`` (it carries the token) within ``expires_in`` seconds
+    token: str
+    url: str
+    expires_in: int
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, EmailStr, model_validator
 from datetime import datetime
 from typing import Optional, Literal
 from .user import UserResponse
@@ -14,11 +14,27 @@ class RSVPCreate(BaseModel):
     status: Optional[Literal['going', 'not_going', 'maybe']] = 'maybe'
 
 
+class RSVPBulkItem(RSVPCreate):
+    # Organizer imports name the attendee by id or by account email
+    user_id: Optional[str] = None
+    email: Optional[EmailStr] = None
+
+    @model_validator(mode="after")
+    def check_attendee(self):
+        if not self.user_id and not self.email:
+            raise ValueError("user_id or email is required")
+        return self
+
+
 class RSVPUpdate(RSVPBase):
     pass
 
 
 class RSVPInDB(RSVPBase):
+    # 'waitlisted' is assigned by the database when a 'going' RSVP arrives
+    # for a full event; clients cannot request it directly.
+    status: Literal['going', 'not_going', 'maybe', 'waitlisted']
+    waitlist_position: Optional[int] = None
     id: str
     user_id: str
     event_id: str
@@ -32,3 +48,28 @@ class RSVPInDB(RSVPBase):
 class RSVPResponse(RSVPInDB):
     user: Optional[UserResponse] = None
     event: Optional[EventResponse] = None
+
+
+class RSVPTicket(BaseModel):
+    # RSVP_INGEST_MODE=queue: POST /rsvps/ answers 202 with a ticket whose
+    # state moves from 'pending' to 'done' (with the RSVP) or 'failed'
+    ticket: str
+    state: Literal['pending', 'done', 'failed']
+    event_id: str
+    status: Literal['going', 'not_going', 'maybe']
+    created_at: datetime
+    rsvp: Optional[RSVPInDB] = None
+    error: Optional[str] = None
+
+
+class ScheduledEvent(BaseModel):
+    id: str
+    title: str
+    start_time: datetime
+    end_time: datetime
+
+
+class RSVPConflict(BaseModel):
+    # Two events the user is going to whose times overlap
+    event: ScheduledEvent
+    conflicts_with: ScheduledEvent
@@ -0,0 +1,105 @@
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime
+from typing import Optional, Literal
+from .event import RSVPCounts
+from ..utils.recurrence import MAX_UNTIL, InvalidRule, Recurrence
+
+RRULE_DESCRIPTION = (
+    "RRULE subset, e.g. FREQ=WEEKLY;BYDAY=MO,WE;COUNT=20. Occurrences are "
+    "expanded in UTC from start_time, so a series kept at a local wall-clock "
+    "time moves by an hour across daylight saving changes; TZID is not "
+    "supported."
+)
+
+
+class SeriesBase(BaseModel):
+    title: str = Field(..., min_length=3, max_length=100)
+    description: Optional[str] = None
+    location: Optional[str] = None
+    category: Optional[str] = None
+    is_public: bool = True
+    max_attendees: Optional[int] = None
+    # First occurrence; every occurrence has the same duration
+    start_time: datetime
+    end_time: datetime
+    rrule: str = Field(..., description=RRULE_DESCRIPTION)
+
+    @field_validator("rrule")
+    @classmethod
+    def check_rrule(cls, value):
+        if value is None:
+            return value
+        try:
+            rule = Recurrence.parse(value)
+        except InvalidRule as exc:
+            raise ValueError(str(exc))
+        # COUNT is capped by Recurrence itself
+        if rule.until is not None and rule.until >= MAX_UNTIL:
+            raise ValueError(f"UNTIL must be before {MAX_UNTIL.date().isoformat()}")
+        return str(rule)
+
+
+class SeriesCreate(SeriesBase):
+    pass
+
+
+class SeriesUpdate(SeriesBase):
+    title: Optional[str] = Field(None, min_length=3, max_length=100)
+    is_public: Optional[bool] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    rrule: Optional[str] = Field(None, description=RRULE_DESCRIPTION)
+
+
+class SeriesInDB(SeriesBase):
+    id: str
+    created_by: str
+    until: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SeriesResponse(SeriesInDB):
+    pass
+
+
+class OccurrenceUpdate(BaseModel):
+    # Stored as a sparse exception; unset fields keep following the series
+    cancelled: Optional[bool] = None
+    title: Optional[str] = Field(None, min_length=3, max_length=100)
+    description: Optional[str] = None
+    location: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+
+class OccurrenceResponse(BaseModel):
+    series_id: str
+    # Identifies the occurrence, even when an exception moved start_time
+    occurrence_start: datetime
+    title: str
+    description: Optional[str] = None
+    location: Optional[str] = None
+    category: Optional[str] = None
+    is_public: bool = True
+    max_attendees: Optional[int] = None
+    start_time: datetime
+    end_time: datetime
+    cancelled: bool = False
+    created_by: str
+    rsvp_counts: Optional[RSVPCounts] = None
+    attendees_count: int = 0
+    current_user_rsvp: Optional[str] = None
+
+
+class SeriesRSVPResponse(BaseModel):
+    id: str
+    series_id: str
+    occurrence_start: datetime
+    user_id: str
+    status: Literal['going', 'not_going', 'maybe']
+    created_at: datetime
+    updated_at: datetime
@@ -4,17 +4,52 @@ from .auth import (
     create_access_token,
     get_current_user,
     get_current_active_user,
+    invalidate_principal,
+)
+from .user import (
+    create_user,
+    get_user,
+    get_user_by_email,
+    update_user,
+)
+from .event import (
+    create_event,
+    create_events_bulk,
+    get_events,
+    search_events,
+    get_nearby_events,
+    get_event,
+    update_event,
+    delete_event,
 )
-from .user import create_user, get_user, get_user_by_email, update_user
-from .event import create_event, get_events, get_event, update_event, delete_event
 from .rsvp import (
     create_rsvp,
     update_rsvp,
+    upsert_rsvps_bulk,
+    delete_rsvp,
     get_rsvp,
     get_user_rsvp_for_event,
     get_event_rsvps,
+    get_event_waitlist,
     get_user_rsvps,
 )
+from .series import (
+    create_series,
+    get_series,
+    update_series,
+    delete_series,
+    list_occurrences,
+    update_occurrence,
+    rsvp_occurrence,
+    cancel_occurrence_rsvp,
+)
+from .calendar import (
+    create_feed_token,
+    revoke_feed_token,
+    get_feed,
+    get_changes,
+)
+from .loaders import Loaders, get_loaders
 
 __all__ = [
     "get_password_hash",
@@ -22,19 +57,40 @@ __all__ = [
     "create_access_token",
     "get_current_user",
     "get_current_active_user",
+    "invalidate_principal",
     "create_user",
     "get_user",
     "get_user_by_email",
     "update_user",
     "create_event",
+    "create_events_bulk",
     "get_events",
+    "search_events",
+    "get_nearby_events",
     "get_event",
     "update_event",
     "delete_event",
     "create_rsvp",
     "update_rsvp",
+    "upsert_rsvps_bulk",
+    "delete_rsvp",
     "get_rsvp",
     "get_user_rsvp_for_event",
     "get_event_rsvps",
+    "get_event_waitlist",
     "get_user_rsvps",
+    "create_series",
+    "get_series",
+    "update_series",
+    "delete_series",
+    "list_occurrences",
+    "update_occurrence",
+    "rsvp_occurrence",
+    "cancel_occurrence_rsvp",
+    "create_feed_token",
+    "revoke_feed_token",
+    "get_feed",
+    "get_changes",
+    "Loaders",
+    "get_loaders",
 ]
@@ -1,28 +1,91 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from ..config import settings
 from ..database import get_db
 from ..schemas.user import TokenData, UserInDB
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from ..utils.cache import TTLCache
+from ..utils.metrics import REGISTRY, Gauge, cache_collector, counter, histogram
+from ..utils.passwords import check_password, hash_password, pwd_context
+from ..utils.pool import BoundedExecutor, PoolSaturated
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/token", auto_error=False
+)
+
+# Users resolved from a token subject (email). Entries are dropped on profile
+# changes made through this process; the TTL bounds staleness
+# for changes made elsewhere (other workers, the database directly).
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+REGISTRY.register_collector(cache_collector("principal", principal_cache))
+
+
+# bcrypt costs 100-300 ms of CPU per call, so it runs off the event loop.
+password_pool = BoundedExecutor(
+    max_workers=settings.PASSWORD_POOL_SIZE,
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+    kind=settings.PASSWORD_POOL_KIND,
+)
+password_seconds = histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying a password, including queueing",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+password_rejections = counter(
+    "password_pool_rejections_total", "Password jobs rejected because the pool was full"
+)
+
+
+def _password_pool_metrics():
+    depth = Gauge("password_pool_queue_depth", "Password jobs waiting for a worker")
+    depth.set(password_pool.queue_depth)
+    in_flight = Gauge("password_pool_in_flight", "Password jobs queued or running")
+    in_flight.set(password_pool.in_flight)
+    return [depth, in_flight]
+
+
+REGISTRY.register_collector(_password_pool_metrics)
+
+
+async def _run_password_job(op: str, fn, *args):
+    started = time.perf_counter()
+    try:
+        result = await password_pool.run(fn, *args)
+    except PoolSaturated:
+        password_rejections.inc(op=op)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    password_seconds.observe(time.perf_counter() - started, op=op)
+    return result
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job(
+        "verify", check_password, plain_password, hashed_password
+    )
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await _run_password_job("hash", hash_password, password)
 
 
 async def get_user(email: str):
     db = next(get_db())
-    result = db.table("users").select("*").eq("email", email).maybe_single().execute()
+    result = await (
+        db.table("users")
+        .select("*")
+        .eq("email", email)
+        .maybe_single()
+        .execute()
+    )
     return result.data if hasattr(result, "data") else None
 
 
@@ -30,11 +93,16 @@ async def authenticate_user(email: str, password: str):
     user = await get_user(email)
     if not user:
         return False
-    if not verify_password(password, user["hashed_password"]):
+    if not await verify_password(password, user["hashed_password"]):
         return False
     return user
 
 
+def invalidate_principal(email: Optional[str]):
+    if email:
+        principal_cache.delete(email)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -46,27 +114,64 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def _claims(token: str) -> Optional[dict]:
+    try:
+        return jwt.decode(token, settings.SUPABASE_JWT_SECRET, algorithms=["HS256"])
+    except JWTError:
+        return None
+
+
+def token_subject(token: str) -> Optional[str]:
+    # Verified "sub" claim, or None; never touches the database. Stream
+    # tokens carry a scope and are only good for their own stream.
+    claims = _claims(token)
+    if not claims or claims.get("scope"):
+        return None
+    return claims.get("sub")
+
+
+def create_stream_token(email: str, scope: str) -> str:
+    """Short-lived token for one streaming endpoint, for clients such as
+    the browser's EventSource that cannot send an Authorization header
+    and pass it in the query string instead."""
+    return create_access_token(
+        {"sub": email, "scope": scope},
+        timedelta(seconds=settings.STREAM_TOKEN_TTL_SECONDS),
+    )
+
+
+def stream_token_subject(token: str, scope: str) -> Optional[str]:
+    claims = _claims(token)
+    if not claims or claims.get("scope") != scope:
+        return None
+    return claims.get("sub")
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SUPABASE_JWT_SECRET, algorithms=["HS256"])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
+    email = token_subject(token)
+    if email is None:
         raise credentials_exception
-
-    user = await get_user(email=token_data.email)
+    user = await get_principal(email)
     if user is None:
         raise credentials_exception
     return user
 
 
+async def get_principal(email: str) -> Optional[dict]:
+    token_data = TokenData(email=email)
+    user = principal_cache.get(token_data.email)
+    if user is None:
+        user = await get_user(email=token_data.email)
+        if user:
+            principal_cache.set(token_data.email, user)
+    return user
+
+
 async def get_current_active_user(current_user: UserInDB = Depends(get_current_user)):
     if not current_user.get("is_active", True):
         raise HTTPException(status_code=400, detail="Inactive user")
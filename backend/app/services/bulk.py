@@ -0,0 +1,67 @@
+from typing import Any, AsyncIterator, List, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from ..config import settings
+from ..utils.ndjson import InvalidBody, InvalidItem
+
+
+class BulkReport:
+    """Per-item outcome of a bulk request, keyed by the item's input index."""
+
+    def __init__(self):
+        self.results: List[dict] = []
+        self.succeeded = 0
+        self.failed = 0
+
+    def ok(self, index: int, id: str, status: str = None) -> None:
+        self.succeeded += 1
+        self.results.append({"index": index, "ok": True, "id": id, "status": status})
+
+    def fail(self, index: int, error: str) -> None:
+        self.failed += 1
+        self.results.append({"index": index, "ok": False, "error": error})
+
+    def as_dict(self) -> dict:
+        return {
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "results": sorted(self.results, key=lambda result: result["index"]),
+        }
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+async def validated_chunks(
+    items: AsyncIterator[Any], schema: Type[BaseModel], report: BulkReport
+) -> AsyncIterator[List[Tuple[int, BaseModel]]]:
+    """Validate streamed items against ``schema`` and group the valid ones
+    into chunks of ``BULK_CHUNK_SIZE``; invalid items go straight to the
+    report."""
+    chunk = []
+    index = 0
+    try:
+        async for item in items:
+            if isinstance(item, InvalidItem):
+                report.fail(index, item.error)
+            else:
+                try:
+                    chunk.append((index, schema.model_validate(item)))
+                except ValidationError as exc:
+                    report.fail(index, _describe(exc))
+            index += 1
+            if len(chunk) >= settings.BULK_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+    except InvalidBody as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)
+        )
+    if chunk:
+        yield chunk
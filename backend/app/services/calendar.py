@@ -0,0 +1,123 @@
+import hashlib
+import re
+import secrets
+from typing import Optional
+from fastapi import HTTPException, status
+from ..config import settings
+from ..database import get_db
+from ..db import APIError
+from ..utils.cursor import InvalidCursor, decode_cursor, encode_cursor
+
+SYNC_ERRORS = {
+    "PT403": (status.HTTP_403_FORBIDDEN, "Not authorized to sync this calendar"),
+    "PT410": (status.HTTP_410_GONE, "Sync token expired, start a full sync"),
+    "22007": (status.HTTP_400_BAD_REQUEST, "Invalid sync token"),
+}
+
+_VERSION_ETAG = re.compile(r'^"(\d+)"$')
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def feed_etag(version: int) -> str:
+    # Strong: the .ics body is a pure function of the feed version
+    return f'"{version}"'
+
+
+def etag_version(if_none_match: Optional[str]) -> Optional[int]:
+    """Feed version named by an If-None-Match header, if it names one."""
+    if not if_none_match:
+        return None
+    for candidate in if_none_match.split(","):
+        match = _VERSION_ETAG.match(candidate.strip())
+        if match:
+            return int(match.group(1))
+    return None
+
+
+async def create_feed_token(user_id: str) -> str:
+    # Issuing a new token revokes the previous feed URL
+    db = next(get_db())
+    token = secrets.token_urlsafe(24)
+    await (
+        db.table("calendar_feeds")
+        .upsert(
+            {"user_id": user_id, "token_hash": hash_token(token)},
+            on_conflict="user_id",
+            returning="minimal",
+        )
+        .execute()
+    )
+    return token
+
+
+async def revoke_feed_token(user_id: str) -> None:
+    db = next(get_db())
+    await (
+        db.table("calendar_feeds")
+        .update({"token_hash": None}, returning="minimal")
+        .eq("user_id", user_id)
+        .execute()
+    )
+
+
+async def get_feed(
+    token: str, version: Optional[int] = None, modified_since: Optional[str] = None
+) -> dict:
+    # One lookup on calendar_feeds.token_hash; entries are only read when
+    # the caller's copy is stale (db/migrations/011_calendar_sync.sql)
+    db = next(get_db())
+    result = await db.rpc(
+        "calendar_feed",
+        {
+            "p_token_hash": hash_token(token),
+            "p_version": version,
+            "p_modified_since": modified_since,
+        },
+    ).execute()
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Calendar feed not found")
+    return result.data
+
+
+async def get_changes(user_id: str, sync_token: Optional[str] = None) -> dict:
+    """Calendar entries changed since ``sync_token``, or all of them.
+
+    Returns ``None`` when nothing changed since the token was issued.
+    """
+    version = since = None
+    if sync_token:
+        try:
+            version, since = decode_cursor(sync_token, 2)
+        except InvalidCursor:
+            version = None
+        if not isinstance(version, int) or not isinstance(since, str):
+            raise HTTPException(status_code=400, detail="Invalid sync token")
+
+    db = next(get_db())
+    try:
+        result = await db.rpc(
+            "calendar_changes",
+            {
+                "p_user_id": user_id,
+                "p_since": since,
+                "p_version": version,
+                "p_retention_days": settings.CALENDAR_SYNC_RETENTION_DAYS,
+            },
+        ).execute()
+    except APIError as exc:
+        if exc.code in SYNC_ERRORS:
+            code, detail = SYNC_ERRORS[exc.code]
+            raise HTTPException(status_code=code, detail=detail)
+        raise
+    changes = result.data
+    if not changes["modified"]:
+        return None
+    return {
+        "sync_token": encode_cursor(changes["version"], changes["as_of"]),
+        "full": since is None,
+        "entries": changes["entries"],
+        "deleted": changes["deleted"],
+    }
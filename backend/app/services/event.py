@@ -1,8 +1,13 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from fastapi import Depends, HTTPException, status
 from ..database import get_db
+from ..db import APIError
+from ..db.query import quote
 from ..schemas.event import EventCreate, EventUpdate, EventInDB
+from ..utils.cursor import InvalidCursor, decode_cursor, encode_cursor
+from . import event_cache, live, reminders
+from .bulk import BulkReport, validated_chunks
 
 
 async def create_event(event: EventCreate, user_id: str):
@@ -10,40 +15,228 @@ async def create_event(event: EventCreate, user_id: str):
     # Use JSON-friendly dump to serialize datetime fields
     event_data = event.model_dump(mode="json")
     event_data["created_by"] = user_id
-    result = db.table("events").insert(event_data).execute()
+    result = await db.table("events").insert(event_data).select(EVENT_FIELDS).execute()
+    event_cache.invalidate_lists()
+    await reminders.events_changed(result.data or [])
     return result.data[0] if result.data else None
 
 
+async def create_events(events: List[EventCreate], user_id: str) -> List[dict]:
+    # One multi-row INSERT; PostgREST returns the rows in input order
+    db = next(get_db())
+    rows = [dict(event.model_dump(mode="json"), created_by=user_id) for event in events]
+    result = await db.table("events").insert(rows).select(EVENT_FIELDS).execute()
+    event_cache.invalidate_lists()
+    await reminders.events_changed(result.data or [])
+    return result.data or []
+
+
+async def create_events_bulk(items, user_id: str) -> dict:
+    report = BulkReport()
+    async for chunk in validated_chunks(items, EventCreate, report):
+        valid = []
+        for index, event in chunk:
+            if event.end_time <= event.start_time:
+                report.fail(index, "end_time must be after start_time")
+            else:
+                valid.append((index, event))
+        if not valid:
+            continue
+        try:
+            created = await create_events([event for _, event in valid], user_id)
+        except APIError:
+            # The statement is all-or-nothing; retry row by row so only the
+            # offending items are reported as failed.
+            for index, event in valid:
+                try:
+                    row = await create_event(event, user_id)
+                except APIError as exc:
+                    report.fail(index, exc.message)
+                else:
+                    report.ok(index, row["id"])
+            continue
+        for (index, _), row in zip(valid, created):
+            report.ok(index, row["id"])
+    return report.as_dict()
+
+
+# Listed rather than "*" so the stored search_vector (008_event_search.sql)
+# never leaves the database.
+EVENT_FIELDS = (
+    "id,title,description,location,start_time,end_time,is_public,category,"
+    "max_attendees,latitude,longitude,created_by,created_at,updated_at"
+)
+# Counters come from the trigger-maintained event_rsvp_counts table, embedded
+# in the same PostgREST request as the events themselves.
+COUNT_COLUMNS = "rsvp_counts:event_rsvp_counts(going,maybe,not_going,waitlisted)"
+EVENT_COLUMNS = f"{EVENT_FIELDS},{COUNT_COLUMNS}"
+
+
+def with_counts(event: Optional[dict]) -> Optional[dict]:
+    if event:
+        counts = event.get("rsvp_counts") or {}
+        event["attendees_count"] = counts.get("going", 0)
+    return event
+
+
+async def attach_user_rsvps(events: List[dict], user_id: Optional[str]) -> List[dict]:
+    # One query for the whole page rather than one per event
+    if not events or not user_id:
+        return events
+    db = next(get_db())
+    result = await (
+        db.table("rsvps")
+        .select("event_id,status")
+        .eq("user_id", user_id)
+        .in_("event_id", [event["id"] for event in events])
+        .execute()
+    )
+    statuses = {row["event_id"]: row["status"] for row in result.data or []}
+    for event in events:
+        event["current_user_rsvp"] = statuses.get(event["id"])
+    return events
+
+
+def event_cursor(event: dict) -> str:
+    return encode_cursor(event["start_time"], event["id"])
+
+
 async def get_events(
     skip: int = 0,
     limit: int = 100,
     is_public: Optional[bool] = None,
     user_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
 ) -> List[EventInDB]:
     db = next(get_db())
-    query = db.table("events").select("*")
+    query = db.table("events").select(EVENT_COLUMNS)
 
     if is_public is not None:
         query = query.eq("is_public", is_public)
     if user_id:
         query = query.or_(f"is_public.eq.true,created_by.eq.{user_id}")
+    if starts_after:
+        query = query.gte("start_time", starts_after)
+    if starts_before:
+        query = query.lt("start_time", starts_before)
+
+    # Always order by (start_time, id) so pages are stable; with a cursor we
+    # seek past the last row seen instead of counting rows with OFFSET.
+    query = query.order("start_time").order("id")
+    if cursor:
+        try:
+            start_time, last_id = decode_cursor(cursor, 2)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        start_time = quote(start_time)
+        query = query.and_(
+            f"start_time.gte.{start_time},"
+            f"or(start_time.gt.{start_time},id.gt.{quote(last_id)})"
+        )
+        query = query.limit(limit)
+    else:
+        query = query.range(skip, skip + limit - 1)
 
-    result = query.range(skip, skip + limit - 1).execute()
-    return result.data if result.data else []
+    result = await query.execute()
+    events = [with_counts(event) for event in result.data or []]
+    return await attach_user_rsvps(events, user_id)
 
 
-async def get_event(event_id: str) -> Optional[EventInDB]:
+async def search_events(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    starts_after: Optional[datetime] = None,
+    starts_before: Optional[datetime] = None,
+    user_id: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> dict:
+    # Ranking, paging, the total and category facets all come from one
+    # search_events call (db/migrations/008_event_search.sql).
+    db = next(get_db())
+    result = await db.rpc(
+        "search_events",
+        {
+            "p_query": q,
+            "p_category": category,
+            "p_from": starts_after.isoformat() if starts_after else None,
+            "p_to": starts_before.isoformat() if starts_before else None,
+            "p_user_id": user_id,
+            "p_limit": limit,
+            "p_offset": skip,
+        },
+    ).execute()
+    found = result.data or {"total": 0, "results": [], "facets": []}
+    found["results"] = [with_counts(event) for event in found["results"]]
+    await attach_user_rsvps(found["results"], user_id)
+    return found
+
+
+async def get_nearby_events(
+    lat: float,
+    lon: float,
+    radius_km: float,
+    user_id: Optional[str] = None,
+    starts_after: Optional[datetime] = None,
+    limit: int = 50,
+) -> List[dict]:
+    # Bounding-box index scan plus exact distance sort inside events_nearby
+    # (db/migrations/009_event_location.sql); results carry distance_km.
     db = next(get_db())
-    result = db.table("events").select("*").eq("id", event_id).maybe_single().execute()
-    return result.data if hasattr(result, "data") else None
+    result = await db.rpc(
+        "events_nearby",
+        {
+            "p_lat": lat,
+            "p_lon": lon,
+            "p_radius_km": radius_km,
+            "p_user_id": user_id,
+            "p_from": starts_after.isoformat() if starts_after else None,
+            "p_limit": limit,
+        },
+    ).execute()
+    events = [with_counts(event) for event in result.data or []]
+    return await attach_user_rsvps(events, user_id)
+
+
+async def get_event(
+    event_id: str, user_id: Optional[str] = None
+) -> Optional[EventInDB]:
+    db = next(get_db())
+    result = await (
+        db.table("events")
+        .select(EVENT_COLUMNS)
+        .eq("id", event_id)
+        .maybe_single()
+        .execute()
+    )
+    event = with_counts(result.data if hasattr(result, "data") else None)
+    if event and user_id:
+        await attach_user_rsvps([event], user_id)
+    return event
+
+
+async def get_events_by_ids(event_ids: List[str]) -> Dict[str, dict]:
+    db = next(get_db())
+    result = (
+        await db.table("events").select(EVENT_COLUMNS).in_("id", event_ids).execute()
+    )
+    return {event["id"]: with_counts(event) for event in result.data or []}
+
+
+async def _load_event(event_id: str, loaders=None) -> Optional[dict]:
+    if loaders is not None:
+        return await loaders.events.load(event_id)
+    return await get_event(event_id)
 
 
 async def update_event(
-    event_id: str, event: EventUpdate, user_id: str
+    event_id: str, event: EventUpdate, user_id: str, loaders=None
 ) -> Optional[EventInDB]:
     db = next(get_db())
     # Verify event exists and user is the creator
-    existing = await get_event(event_id)
+    existing = await _load_event(event_id, loaders)
     if not existing:
         raise HTTPException(status_code=404, detail="Event not found")
     if existing["created_by"] != user_id:
@@ -56,14 +249,29 @@ async def update_event(
     if not update_data:
         return existing
 
-    result = db.table("events").update(update_data).eq("id", event_id).execute()
+    result = await (
+        db.table("events")
+        .update(update_data)
+        .eq("id", event_id)
+        .select(EVENT_FIELDS)
+        .execute()
+    )
+    if loaders is not None:
+        loaders.events.clear(event_id)
+    event_cache.invalidate_event(event_id)
+    event_cache.invalidate_lists()
+    if "max_attendees" in update_data:
+        # Raising capacity promotes waitlisted RSVPs inside the database
+        await live.publish_rsvps(event_id, [])
+    if "start_time" in update_data:
+        await reminders.events_changed(result.data or [])
     return result.data[0] if result.data else None
 
 
-async def delete_event(event_id: str, user_id: str) -> bool:
+async def delete_event(event_id: str, user_id: str, loaders=None) -> bool:
     db = next(get_db())
     # Verify event exists and user is the creator
-    existing = await get_event(event_id)
+    existing = await _load_event(event_id, loaders)
     if not existing:
         raise HTTPException(status_code=404, detail="Event not found")
     if existing["created_by"] != user_id:
@@ -71,5 +279,11 @@ async def delete_event(event_id: str, user_id: str) -> bool:
             status_code=403, detail="Not authorized to delete this event"
         )
 
-    result = db.table("events").delete().eq("id", event_id).execute()
+    result = await db.table("events").delete().eq("id", event_id).select("id").execute()
+    if loaders is not None:
+        loaders.events.clear(event_id)
+    event_cache.invalidate_event(event_id)
+    event_cache.invalidate_lists()
+    await live.publish_event_deleted(event_id)
+    await reminders.event_deleted(event_id)
     return len(result.data) > 0 if result.data else False
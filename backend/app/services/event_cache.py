@@ -0,0 +1,102 @@
+"""Cache of public event payloads for GET /events and GET /events/{id}.
+
+Only data that is identical for every viewer is cached: public events with
+their RSVP counters. The per-user ``current_user_rsvp`` is overlaid by the
+caller after a hit. Event writes and RSVP writes drop the affected detail
+entry and bump the list generation, which orphans every cached page. With
+a per-process backend, EVENT_CACHE_TTL_SECONDS bounds how long another
+worker's writes can go unnoticed.
+"""
+import hashlib
+from typing import Iterable, List, Optional
+
+from ..config import settings
+from ..utils.cache import CacheBackend, MemoryCacheBackend
+from ..utils.metrics import REGISTRY, cache_collector
+
+LIST_GENERATION = "events:list:generation"
+
+backend: CacheBackend = MemoryCacheBackend(
+    maxsize=settings.EVENT_CACHE_SIZE, ttl=settings.EVENT_CACHE_TTL_SECONDS
+)
+REGISTRY.register_collector(cache_collector("events", backend))
+
+
+def set_backend(new_backend: CacheBackend) -> None:
+    global backend
+    backend = new_backend
+
+
+def make_etag(events: Iterable[dict]) -> str:
+    digest = hashlib.sha1()
+    for event in events:
+        counts = event.get("rsvp_counts") or {}
+        digest.update(
+            "{}|{}|{}|{}|{}|{};".format(
+                event["id"],
+                event.get("updated_at"),
+                counts.get("going"),
+                counts.get("maybe"),
+                counts.get("not_going"),
+                counts.get("waitlisted"),
+            ).encode()
+        )
+    return f'W/"{digest.hexdigest()[:24]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" match
+    wanted = _opaque(etag)
+    return any(_opaque(c.strip()) == wanted for c in if_none_match.split(","))
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _strip_user_fields(event: dict) -> dict:
+    return {**event, "current_user_rsvp": None}
+
+
+def get_event(event_id: str) -> Optional[dict]:
+    return backend.get(f"events:detail:{event_id}")
+
+
+def put_event(event: dict) -> Optional[dict]:
+    if not event.get("is_public"):
+        return None
+    entry = {"etag": make_etag([event]), "data": _strip_user_fields(event)}
+    backend.set(f"events:detail:{event['id']}", entry)
+    return entry
+
+
+def invalidate_event(event_id: str) -> None:
+    backend.delete(f"events:detail:{event_id}")
+
+
+def _list_key(params: dict) -> str:
+    generation = backend.generation(LIST_GENERATION)
+    rendered = "&".join(f"{k}={params[k]}" for k in sorted(params))
+    return f"events:list:{generation}:{rendered}"
+
+
+def get_list(params: dict) -> Optional[dict]:
+    return backend.get(_list_key(params))
+
+
+def put_list(params: dict, events: List[dict], next_cursor: Optional[str]) -> dict:
+    entry = {
+        "etag": make_etag(events),
+        "data": [_strip_user_fields(event) for event in events],
+        "next_cursor": next_cursor,
+    }
+    backend.set(_list_key(params), entry)
+    return entry
+
+
+def invalidate_lists() -> None:
+    backend.incr(LIST_GENERATION)
@@ -0,0 +1,260 @@
+"""Live RSVP updates for GET /events/{id}/live.
+
+RSVP writes publish a compact delta through the broker. Every worker's hub
+listens, and at most LIVE_MAX_UPDATES_PER_SECOND times a second sends each
+subscriber of a changed event one message: its counters (one query for all
+changed events) plus the RSVP changes since the previous message. A
+subscriber holds at most one unsent message; while a slow client catches
+up, newer changes are merged into it instead of queueing behind it.
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Set
+
+from fastapi import HTTPException, status
+
+from ..config import settings
+from ..database import get_db
+from ..db import current_request_stats
+from ..utils.broker import Broker, MemoryBroker
+
+logger = logging.getLogger(__name__)
+
+COUNT_FIELDS = ("going", "maybe", "not_going", "waitlisted")
+RSVP_FIELDS = ("id", "user_id", "status", "waitlist_position")
+
+
+def rsvp_change(rsvp: dict, deleted: bool = False) -> dict:
+    if deleted:
+        return {"id": rsvp["id"], "deleted": True}
+    return {field: rsvp.get(field) for field in RSVP_FIELDS}
+
+
+def merge_changes(changes: List[dict], newer: List[dict]) -> List[dict]:
+    # Latest change per RSVP wins
+    merged = {change["id"]: change for change in changes}
+    for change in newer:
+        merged.pop(change["id"], None)
+        merged[change["id"]] = change
+    return list(merged.values())
+
+
+class Subscriber:
+    def __init__(self, event_id: str, max_changes: int):
+        self.event_id = event_id
+        self.max_changes = max_changes
+        self.pending: Optional[dict] = None
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def offer(self, message: dict) -> None:
+        pending = self.pending
+        if pending is not None and "changes" in message:
+            changes = merge_changes(pending.get("changes", []), message["changes"])
+            message = dict(message, changes=changes)
+            if pending.get("truncated"):
+                message["truncated"] = True
+        if len(message.get("changes", ())) > self.max_changes:
+            # Too far behind to replay; the client should refetch the list
+            message = dict(message, changes=[], truncated=True)
+        self.pending = message
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[dict]:
+        """The merged unsent message, or None after ``timeout`` seconds."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        message, self.pending = self.pending, None
+        return message
+
+
+class LiveHub:
+    def __init__(
+        self,
+        broker: Broker,
+        max_updates_per_second: float,
+        max_changes: int,
+        max_subscribers: int,
+    ):
+        self.broker = broker
+        self.interval = 1.0 / max_updates_per_second
+        self.max_changes = max_changes
+        self.max_subscribers = max_subscribers
+        self.subscribers: Dict[str, Set[Subscriber]] = {}
+        self.seq = 0
+        self._changes: Dict[str, List[dict]] = {}
+        self._deleted: Set[str] = set()
+        self._dirty: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subs) for subs in self.subscribers.values())
+
+    async def publish(self, message: dict) -> None:
+        try:
+            await self.broker.publish(message)
+        except Exception:
+            # Live updates are best effort; never fail the write over them
+            logger.exception("live update publish failed")
+
+    def subscribe(self, event_id: str) -> Subscriber:
+        if self.subscriber_count >= self.max_subscribers:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many live connections, please retry shortly",
+            )
+        self._ensure_started()
+        subscriber = Subscriber(event_id, self.max_changes)
+        self.subscribers.setdefault(event_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subs = self.subscribers.get(subscriber.event_id)
+        if subs is not None:
+            subs.discard(subscriber)
+            if not subs:
+                del self.subscribers[subscriber.event_id]
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and all(not task.done() for task in self._tasks):
+            return
+        self._loop = loop
+        self._dirty = asyncio.Event()
+        self._tasks = [
+            loop.create_task(self._listen()),
+            loop.create_task(self._flush_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for subs in self.subscribers.values():
+            for subscriber in subs:
+                subscriber.close()
+        self.subscribers.clear()
+        await self.broker.close()
+
+    async def _listen(self) -> None:
+        async for message in self.broker.listen():
+            event_id = message.get("event_id")
+            if event_id not in self.subscribers:
+                continue
+            if message.get("deleted"):
+                self._deleted.add(event_id)
+            else:
+                self._changes[event_id] = merge_changes(
+                    self._changes.get(event_id, []), message.get("changes", [])
+                )
+            self._dirty.set()
+
+    async def _flush_loop(self) -> None:
+        # Not a request: keep the flush queries out of any request's stats
+        current_request_stats.set(None)
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            try:
+                await self._flush()
+            except Exception:
+                logger.exception("live update flush failed")
+            # Rate limit: at most one message per event per interval
+            await asyncio.sleep(self.interval)
+
+    async def _flush(self) -> None:
+        changes, self._changes = self._changes, {}
+        deleted, self._deleted = self._deleted, set()
+        for event_id in deleted:
+            changes.pop(event_id, None)
+            for subscriber in self.subscribers.pop(event_id, ()):
+                subscriber.offer({"event_id": event_id, "deleted": True})
+                subscriber.close()
+        live = [event_id for event_id in changes if event_id in self.subscribers]
+        if not live:
+            return
+        counts = await get_counts(live)
+        for event_id in live:
+            self.seq += 1
+            message = {
+                "event_id": event_id,
+                "seq": self.seq,
+                "counts": counts.get(event_id, dict.fromkeys(COUNT_FIELDS, 0)),
+                "changes": changes[event_id],
+            }
+            for subscriber in self.subscribers.get(event_id, ()):
+                subscriber.offer(message)
+
+
+async def get_counts(event_ids: List[str]) -> Dict[str, dict]:
+    db = next(get_db())
+    result = await (
+        db.table("event_rsvp_counts")
+        .select("event_id," + ",".join(COUNT_FIELDS))
+        .in_("event_id", event_ids)
+        .execute()
+    )
+    return {
+        row["event_id"]: {field: row[field] for field in COUNT_FIELDS}
+        for row in result.data or []
+    }
+
+
+hub = LiveHub(
+    MemoryBroker(),
+    max_updates_per_second=settings.LIVE_MAX_UPDATES_PER_SECOND,
+    max_changes=settings.LIVE_MAX_CHANGES,
+    max_subscribers=settings.LIVE_MAX_SUBSCRIBERS,
+)
+
+
+def set_broker(broker: Broker) -> None:
+    # Call before the first subscriber connects (e.g. at startup)
+    hub.broker = broker
+
+
+async def publish_rsvps(event_id: str, changes: List[dict]) -> None:
+    await hub.publish({"event_id": event_id, "changes": changes})
+
+
+async def publish_event_deleted(event_id: str) -> None:
+    await hub.publish({"event_id": event_id, "deleted": True})
+
+
+def format_sse(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":"), default=str))
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+async def stream(subscriber: Subscriber, snapshot: dict):
+    """Server-sent events for one subscriber, starting with ``snapshot``."""
+    try:
+        yield format_sse("snapshot", snapshot)
+        while True:
+            message = await subscriber.next(settings.LIVE_HEARTBEAT_SECONDS)
+            if message is None:
+                if subscriber.closed:
+                    return
+                # Keeps proxies from closing an idle stream
+                yield b": keep-alive\n\n"
+            elif message.get("deleted"):
+                yield format_sse("deleted", message)
+                return
+            else:
+                yield format_sse("update", message, message["seq"])
+    finally:
+        hub.unsubscribe(subscriber)
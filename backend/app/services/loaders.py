@@ -0,0 +1,30 @@
+from fastapi import Depends
+
+from ..utils.dataloader import DataLoader
+from . import event as event_service
+from . import rsvp as rsvp_service
+from . import user as user_service
+from .auth import get_current_active_user
+
+
+class Loaders:
+    """Per-request batching loaders for users, events and RSVPs by id.
+
+    Concurrent loads of the same kind are coalesced into one ``in (...)``
+    query and results are memoized until the request ends.
+    """
+
+    def __init__(self):
+        self.users = DataLoader(user_service.get_users_by_ids)
+        self.events = DataLoader(event_service.get_events_by_ids)
+        self.rsvps = DataLoader(rsvp_service.get_rsvps_by_ids)
+
+
+async def get_loaders(
+    current_user: dict = Depends(get_current_active_user),
+) -> Loaders:
+    # FastAPI resolves a dependency once per request, so every Depends
+    # (get_loaders) in one request shares this instance.
+    loaders = Loaders()
+    loaders.users.prime(current_user["id"], current_user)
+    return loaders
@@ -0,0 +1,43 @@
+"""The API's rate limiter, configured from settings.
+
+Buckets live in this process by default; ``set_store`` swaps in a shared
+``RateLimitStore`` so that all workers draw from the same buckets.
+"""
+from ..config import settings
+from ..utils.metrics import REGISTRY, Gauge
+from ..utils.ratelimit import (
+    Limit,
+    MemoryRateLimitStore,
+    RateLimiter,
+    RateLimitStore,
+    parse_rules,
+)
+
+# Keyed by client IP even when a bearer token is sent
+IP_KEYED_PATHS = (
+    f"{settings.API_V1_STR}/auth/token",
+    f"{settings.API_V1_STR}/auth/register",
+)
+
+limiter = RateLimiter(
+    MemoryRateLimitStore(max_buckets=settings.RATE_LIMIT_MAX_BUCKETS),
+    default=Limit.parse(settings.RATE_LIMIT_DEFAULT)
+    if settings.RATE_LIMIT_DEFAULT
+    else None,
+    rules=parse_rules(settings.RATE_LIMIT_RULES, by_ip=IP_KEYED_PATHS),
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+
+
+def set_store(store: RateLimitStore) -> None:
+    limiter.store = store
+
+
+def _bucket_metrics():
+    if isinstance(limiter.store, MemoryRateLimitStore):
+        buckets = Gauge("rate_limit_buckets", "Token buckets held in this process")
+        buckets.set(len(limiter.store))
+        yield buckets
+
+
+REGISTRY.register_collector(_bucket_metrics)
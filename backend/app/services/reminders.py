@@ -0,0 +1,302 @@
+"""Event reminders: "your event starts in an hour" for every 'going' RSVP.
+
+The scheduler runs as a lifespan task in the process with
+REMINDERS_ENABLED (one per deployment). It only holds the events whose
+reminder falls due within the next REMINDER_HORIZON_MINUTES, in a timer
+heap keyed by event id, and extends that window every half horizon with a
+keyset scan over (start_time, id), which idx_events_start_time serves.
+
+Event writes publish the new start_time, or the deletion, through the
+broker, and the scheduler moves or drops the timers it already holds;
+events that start beyond the loaded window are picked up by a later scan.
+Due events are re-read before anything is sent, so a lost message never
+produces a reminder for a deleted or moved event.
+
+Events that fall due together are handled together, IDS_PER_QUERY at a
+time: one query for the events, then their 'going' attendees in keyset
+pages of REMINDER_BATCH_SIZE, each page handed to the sink as one batch.
+Reminders that fell due while no scheduler was running are not sent late.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional
+
+from ..config import settings
+from ..database import get_db
+from ..db import current_request_stats
+from ..db.query import quote
+from ..utils.broker import Broker, MemoryBroker
+from ..utils.delivery import FileSink, LogSink, Sink
+from ..utils.metrics import REGISTRY, Gauge, counter, histogram
+from ..utils.timers import TimerHeap
+
+logger = logging.getLogger(__name__)
+
+RETRY_SECONDS = 5.0
+# Event ids per in.() filter; they travel in the PostgREST query string
+IDS_PER_QUERY = 100
+
+reminders_total = counter(
+    "reminders_total", "Event reminders handed to the sink, by outcome"
+)
+reminder_lag = histogram(
+    "reminder_lag_seconds", "Delay between a reminder falling due and its sending"
+)
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def reminder(event: dict, rsvp: dict) -> dict:
+    user = rsvp.get("user") or {}
+    return {
+        "kind": "event_reminder",
+        "event_id": event["id"],
+        "title": event["title"],
+        "start_time": event["start_time"],
+        "location": event.get("location"),
+        "user_id": rsvp["user_id"],
+        "email": user.get("email"),
+        "full_name": user.get("full_name"),
+    }
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        sink: Sink,
+        broker: Broker,
+        lead: float,
+        horizon: float,
+        page_size: int,
+        batch_size: int,
+        enabled: bool = False,
+        clock=time.time,
+    ):
+        self.sink = sink
+        self.broker = broker
+        self.lead = lead
+        self.horizon = horizon
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.enabled = enabled
+        self._clock = clock
+        self.timers = TimerHeap()
+        # Events already reminded, with the start_time they were reminded of
+        self.sent: Dict[str, float] = {}
+        # Every event starting up to here has been scanned
+        self.loaded_until = 0.0
+        self._cursor: Optional[tuple] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if not self.enabled or self._tasks:
+            return
+        self.timers.clear()
+        self.sent.clear()
+        self.loaded_until = self._clock() + self.lead
+        self._cursor = (_isoformat(self.loaded_until), None)
+        self._wake = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._listen()),
+            loop.create_task(self._run()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.sink.close()
+
+    async def _listen(self) -> None:
+        async for message in self.broker.listen():
+            for event in message.get("events", ()):
+                self.reschedule(event["id"], event.get("start_time"))
+            self._wake.set()
+
+    def reschedule(self, event_id: str, start_time: Optional[str]) -> None:
+        """Apply an event write: a new start_time, or None once deleted."""
+        now = self._clock()
+        start = _timestamp(start_time) if start_time else None
+        if start is None or start <= now or start > self.loaded_until:
+            # Gone, already started, or for a later scan to find
+            self.timers.cancel(event_id)
+        elif self.sent.get(event_id) != start:
+            # Moved inside the reminder lead: remind right away
+            self.timers.schedule(event_id, max(start - self.lead, now))
+
+    async def _run(self) -> None:
+        # Not a request: keep the scheduler's queries out of request stats
+        current_request_stats.set(None)
+        while True:
+            self._wake.clear()
+            now = self._clock()
+            try:
+                if now + self.lead + self.horizon / 2 >= self.loaded_until:
+                    await self._load(now + self.lead + self.horizon)
+                await self._fire(now)
+            except Exception:
+                logger.exception("reminder scheduler failed")
+                await asyncio.sleep(RETRY_SECONDS)
+                continue
+            refill_at = self.loaded_until - self.lead - self.horizon / 2
+            next_due = self.timers.next_due()
+            wake_at = refill_at if next_due is None else min(next_due, refill_at)
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), max(0.0, wake_at - self._clock())
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _load(self, until: float) -> None:
+        db = next(get_db())
+        while True:
+            after, after_id = self._cursor
+            query = db.table("events").select("id,start_time")
+            if after_id is None:
+                query = query.gte("start_time", after)
+            else:
+                query = query.and_(
+                    f"start_time.gte.{quote(after)},"
+                    f"or(start_time.gt.{quote(after)},id.gt.{quote(after_id)})"
+                )
+            result = await (
+                query.lte("start_time", _isoformat(until))
+                .order("start_time")
+                .order("id")
+                .limit(self.page_size)
+                .execute()
+            )
+            rows = result.data or []
+            for row in rows:
+                start = _timestamp(row["start_time"])
+                if self.sent.get(row["id"]) != start:
+                    self.timers.schedule(row["id"], start - self.lead)
+            if rows:
+                self._cursor = (rows[-1]["start_time"], rows[-1]["id"])
+            if len(rows) < self.page_size:
+                break
+        self.loaded_until = until
+
+    async def _fire(self, now: float) -> None:
+        due = self.timers.pop_due(now)
+        for start in range(0, len(due), IDS_PER_QUERY):
+            await self._fire_events(due[start : start + IDS_PER_QUERY], now)
+        self.sent = {key: start for key, start in self.sent.items() if start > now}
+
+    async def _fire_events(self, due: List[tuple], now: float) -> None:
+        db = next(get_db())
+        result = await (
+            db.table("events")
+            .select("id,title,start_time,location")
+            .in_("id", [event_id for event_id, _ in due])
+            .execute()
+        )
+        events = {}
+        for event in result.data or []:
+            start = _timestamp(event["start_time"])
+            if start <= now:
+                continue
+            if start - self.lead > now + 1:
+                # Moved later since it was scheduled
+                self.timers.schedule(event["id"], start - self.lead)
+                continue
+            self.sent[event["id"]] = start
+            events[event["id"]] = event
+        for event_id, due_at in due:
+            if event_id in events:
+                reminder_lag.observe(max(0.0, now - due_at))
+        if not events:
+            return
+        async for batch in self._reminders(events):
+            try:
+                await self.sink.deliver(batch)
+            except Exception:
+                logger.exception("reminder delivery failed")
+                reminders_total.inc(len(batch), outcome="failed")
+            else:
+                reminders_total.inc(len(batch), outcome="sent")
+
+    async def _reminders(self, events: Dict[str, dict]) -> AsyncIterator[List[dict]]:
+        db = next(get_db())
+        last = None
+        while True:
+            query = (
+                db.table("rsvps")
+                .select("id,event_id,user_id,user:users(email,full_name)")
+                .in_("event_id", list(events))
+                .eq("status", "going")
+            )
+            if last:
+                query = query.gt("id", last)
+            result = await query.order("id").limit(self.batch_size).execute()
+            rows = result.data or []
+            if rows:
+                yield [reminder(events[row["event_id"]], row) for row in rows]
+            if len(rows) < self.batch_size:
+                return
+            last = rows[-1]["id"]
+
+
+scheduler = ReminderScheduler(
+    FileSink(settings.REMINDER_SINK_PATH)
+    if settings.REMINDER_SINK_PATH
+    else LogSink("app.reminders"),
+    MemoryBroker(),
+    lead=settings.REMINDER_LEAD_MINUTES * 60,
+    horizon=settings.REMINDER_HORIZON_MINUTES * 60,
+    page_size=settings.REMINDER_PAGE_SIZE,
+    batch_size=settings.REMINDER_BATCH_SIZE,
+    enabled=settings.REMINDERS_ENABLED,
+)
+
+
+def set_sink(sink: Sink) -> None:
+    scheduler.sink = sink
+
+
+def set_broker(broker: Broker) -> None:
+    # Call before startup; share one broker between all workers
+    scheduler.broker = broker
+
+
+async def events_changed(events: List[dict]) -> None:
+    """Publish new start_times of created or updated events."""
+    await _publish(
+        [{"id": event["id"], "start_time": event["start_time"]} for event in events]
+    )
+
+
+async def event_deleted(event_id: str) -> None:
+    await _publish([{"id": event_id, "start_time": None}])
+
+
+async def _publish(events: List[dict]) -> None:
+    if not events:
+        return
+    try:
+        await scheduler.broker.publish({"events": events})
+    except Exception:
+        # Reminders are best effort; never fail the write over them
+        logger.exception("reminder reschedule publish failed")
+
+
+def _scheduler_metrics():
+    if scheduler.enabled:
+        scheduled = Gauge("reminders_scheduled", "Event reminders held in memory")
+        scheduled.set(len(scheduler.timers))
+        yield scheduled
+
+
+REGISTRY.register_collector(_scheduler_metrics)
@@ -1,28 +1,190 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import Depends, HTTPException, status
 from ..database import get_db
+from ..config import settings
+from ..db import APIError
+from ..db.query import quote
 from ..services import event as event_service
-from ..schemas.rsvp import RSVPUpdate
+from ..services import event_cache
+from ..services import live
+from ..services import user as user_service
+from ..schemas.rsvp import RSVPBulkItem, RSVPUpdate
+from .bulk import BulkReport, validated_chunks
 
 
-async def create_rsvp(event_id: str, user_id: str, status_value: str = "maybe"):
+RSVP_ERRORS = {
+    "PT403": (status.HTTP_403_FORBIDDEN, "Not authorized to RSVP for this user"),
+    "PT404": (status.HTTP_404_NOT_FOUND, "Event not found"),
+    "PT409": (status.HTTP_409_CONFLICT, "Event is full"),
+}
+
+
+# Per-row errors reported by rsvp_upsert_many (006_rsvp_bulk.sql)
+BULK_RSVP_ERRORS = {
+    "PT403": "Not the organizer of this event",
+    "PT404": "Event not found",
+    "23503": "User not found",
+    "22P02": "Invalid id",
+}
+
+
+def _invalidate_event_caches(event_id: str) -> None:
+    # Counters (and, through waitlist promotion, other users' RSVPs) changed
+    event_cache.invalidate_event(event_id)
+    event_cache.invalidate_lists()
+
+
+async def _call_rsvp_function(fn: str, params: dict, not_found: str = None):
     db = next(get_db())
-    # Check if RSVP already exists
-    existing = await get_user_rsvp_for_event(event_id, user_id)
-    if existing:
+    try:
+        result = await db.rpc(fn, params).execute()
+    except APIError as exc:
+        if exc.code in RSVP_ERRORS:
+            code, detail = RSVP_ERRORS[exc.code]
+            if exc.code == "PT404" and not_found:
+                detail = not_found
+            raise HTTPException(status_code=code, detail=detail)
+        raise
+    return result.data
+
+
+async def upsert_rsvp(event_id: str, user_id: str, status_value: str):
+    # Insert-or-update plus the max_attendees check happen inside one
+    # database function (db/migrations/005_rsvp_waitlist.sql), so there is a
+    # single round trip and no check-then-insert race. A 'going' RSVP for a
+    # full event comes back as 'waitlisted' with its waitlist_position.
+    rsvp = await _call_rsvp_function(
+        "rsvp_upsert",
+        {"p_event_id": event_id, "p_user_id": user_id, "p_status": status_value},
+    )
+    _invalidate_event_caches(event_id)
+    await live.publish_rsvps(event_id, [live.rsvp_change(rsvp)])
+    return rsvp
+
+
+async def delete_rsvp(rsvp_id: str, user_id: str):
+    # Freed 'going' seats are handed to the head of the waitlist in the
+    # same transaction by the rsvps_promote_waitlist trigger.
+    rsvp = await _call_rsvp_function(
+        "rsvp_cancel",
+        {"p_rsvp_id": rsvp_id, "p_user_id": user_id},
+        not_found="RSVP not found",
+    )
+    _invalidate_event_caches(rsvp["event_id"])
+    await live.publish_rsvps(rsvp["event_id"], [live.rsvp_change(rsvp, deleted=True)])
+    return rsvp
+
+
+async def upsert_rsvps_bulk(items, organizer_id: str) -> dict:
+    # Each chunk is one rsvp_upsert_many call, which applies the same
+    # capacity and waitlist rules as rsvp_upsert to every row.
+    report = BulkReport()
+    async for chunk in validated_chunks(items, RSVPBulkItem, report):
+        emails = list({item.email for _, item in chunk if not item.user_id})
+        user_ids = await user_service.get_user_ids_by_email(emails) if emails else {}
+        rows, indexes = [], []
+        for index, item in chunk:
+            user_id = item.user_id or user_ids.get(item.email)
+            if not user_id:
+                report.fail(index, "User not found")
+                continue
+            rows.append(
+                {
+                    "event_id": item.event_id,
+                    "user_id": user_id,
+                    "status": item.status or "maybe",
+                }
+            )
+            indexes.append(index)
+        if not rows:
+            continue
+        outcome = await _call_rsvp_function(
+            "rsvp_upsert_many", {"p_organizer_id": organizer_id, "p_rsvps": rows}
+        )
+        touched: Dict[str, List[dict]] = {}
+        for entry in outcome:
+            index = indexes[entry["index"]]
+            rsvp = entry.get("rsvp")
+            if rsvp:
+                report.ok(index, rsvp["id"], rsvp["status"])
+                touched.setdefault(rsvp["event_id"], []).append(
+                    live.rsvp_change(rsvp)
+                )
+            else:
+                report.fail(
+                    index, BULK_RSVP_ERRORS.get(entry["code"], entry["message"])
+                )
+        for event_id, changes in touched.items():
+            event_cache.invalidate_event(event_id)
+            await live.publish_rsvps(event_id, changes)
+        if touched:
+            event_cache.invalidate_lists()
+    return report.as_dict()
+
+
+def _conflict(row: dict) -> dict:
+    return {
+        "event": {
+            "id": row["event_id"],
+            "title": row["title"],
+            "start_time": row["start_time"],
+            "end_time": row["end_time"],
+        },
+        "conflicts_with": {
+            "id": row["conflict_id"],
+            "title": row["conflict_title"],
+            "start_time": row["conflict_start_time"],
+            "end_time": row["conflict_end_time"],
+        },
+    }
+
+
+async def get_conflicts(user_id: str, event_id: Optional[str] = None) -> List[dict]:
+    # Served by the (user_id, period) GiST index on rsvp_schedule
+    # (db/migrations/013_rsvp_conflicts.sql): overlapping pairs of the
+    # user's 'going' events, or only those overlapping event_id
+    params = {"p_user_id": user_id}
+    if event_id:
+        params["p_event_id"] = event_id
+    rows = await _call_rsvp_function("rsvp_conflicts", params)
+    return [_conflict(row) for row in rows or []]
+
+
+async def ensure_no_conflicts(event_id: str, user_id: str) -> None:
+    conflicts = await get_conflicts(user_id, event_id)
+    if conflicts:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You have already RSVP'd to this event",
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Overlaps events you are going to",
+                "conflicts": [c["conflicts_with"] for c in conflicts],
+            },
         )
-    rsvp_data = {"event_id": event_id, "status": status_value, "user_id": user_id}
-    result = db.table("rsvps").insert(rsvp_data).execute()
-    return result.data[0] if result.data else None
 
 
-async def update_rsvp(rsvp_id: str, rsvp_data: RSVPUpdate, user_id: str):
-    db = next(get_db())
+async def create_rsvp(
+    event_id: str,
+    user_id: str,
+    status_value: str = "maybe",
+    check_conflicts: bool = False,
+):
+    if check_conflicts and status_value == "going":
+        await ensure_no_conflicts(event_id, user_id)
+    return await upsert_rsvp(event_id, user_id, status_value)
+
+
+async def update_rsvp(
+    rsvp_id: str,
+    rsvp_data: RSVPUpdate,
+    user_id: str,
+    loaders=None,
+    check_conflicts: bool = False,
+):
     # Verify RSVP exists and belongs to user
-    existing = await get_rsvp(rsvp_id)
+    if loaders is not None:
+        existing = await loaders.rsvps.load(rsvp_id)
+    else:
+        existing = await get_rsvp(rsvp_id)
     if not existing:
         raise HTTPException(status_code=404, detail="RSVP not found")
     if existing["user_id"] != user_id:
@@ -35,19 +197,36 @@ async def update_rsvp(rsvp_id: str, rsvp_data: RSVPUpdate, user_id: str):
     if not update_data:
         return existing
 
-    result = db.table("rsvps").update(update_data).eq("id", rsvp_id).execute()
-    return result.data[0] if result.data else None
+    if check_conflicts and update_data["status"] == "going":
+        await ensure_no_conflicts(existing["event_id"], user_id)
+
+    # Status changes go through the same capacity-checked path as creation
+    if loaders is not None:
+        loaders.rsvps.clear(rsvp_id)
+    return await upsert_rsvp(existing["event_id"], user_id, update_data["status"])
 
 
 async def get_rsvp(rsvp_id: str):
     db = next(get_db())
-    result = db.table("rsvps").select("*").eq("id", rsvp_id).maybe_single().execute()
+    result = await (
+        db.table("rsvps")
+        .select("*")
+        .eq("id", rsvp_id)
+        .maybe_single()
+        .execute()
+    )
     return result.data if hasattr(result, "data") else None
 
 
+async def get_rsvps_by_ids(rsvp_ids: List[str]) -> Dict[str, dict]:
+    db = next(get_db())
+    result = await db.table("rsvps").select("*").in_("id", rsvp_ids).execute()
+    return {rsvp["id"]: rsvp for rsvp in result.data or []}
+
+
 async def get_user_rsvp_for_event(event_id: str, user_id: str):
     db = next(get_db())
-    result = (
+    result = await (
         db.table("rsvps")
         .select("*")
         .eq("event_id", event_id)
@@ -63,16 +242,75 @@ async def get_event_rsvps(event_id: str, status: Optional[str] = None):
     query = db.table("rsvps").select("*, user:users(*)").eq("event_id", event_id)
     if status:
         query = query.eq("status", status)
-    result = query.execute()
+    result = await query.execute()
+    return result.data if result.data else []
+
+
+# Attendee exports never embed users(*): that would include hashed_password
+EXPORT_COLUMNS = (
+    "id,status,waitlist_position,created_at,updated_at,"
+    "user_id,user:users(email,full_name)"
+)
+
+
+async def iter_event_rsvps(
+    event_id: str, status: Optional[str] = None, page_size: int = None
+):
+    """Yield an event's RSVPs in signup order, one keyset page at a time.
+
+    Each page seeks past the last (created_at, id) seen, backed by
+    idx_rsvps_event_created, so only one page is ever held in memory.
+    """
+    db = next(get_db())
+    page_size = page_size or settings.EXPORT_PAGE_SIZE
+    last = None
+    while True:
+        query = db.table("rsvps").select(EXPORT_COLUMNS).eq("event_id", event_id)
+        if status:
+            query = query.eq("status", status)
+        if last:
+            created_at = quote(last["created_at"])
+            query = query.and_(
+                f"created_at.gte.{created_at},"
+                f"or(created_at.gt.{created_at},id.gt.{quote(last['id'])})"
+            )
+        result = await query.order("created_at").order("id").limit(page_size).execute()
+        rows = result.data or []
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        last = rows[-1]
+
+
+async def get_event_waitlist(event_id: str):
+    db = next(get_db())
+    result = await (
+        db.table("rsvps")
+        .select("*, user:users(*)")
+        .eq("event_id", event_id)
+        .eq("status", "waitlisted")
+        .order("waitlist_position")
+        .execute()
+    )
     return result.data if result.data else []
 
 
 async def get_user_rsvps(user_id: str):
     db = next(get_db())
-    result = (
+    result = await (
         db.table("rsvps")
-        .select("*, event:events(*, creator:users!events_created_by_fkey(*))")
+        .select(
+            f"*, event:events({event_service.EVENT_FIELDS}, "
+            "creator:users!events_created_by_fkey(*), "
+            f"{event_service.COUNT_COLUMNS})"
+        )
         .eq("user_id", user_id)
         .execute()
     )
-    return result.data if result.data else []
+    rsvps = result.data if result.data else []
+    for rsvp in rsvps:
+        event = event_service.with_counts(rsvp.get("event"))
+        if event:
+            event["current_user_rsvp"] = rsvp["status"]
+    return rsvps
@@ -0,0 +1,267 @@
+"""Write-behind RSVP ingestion (RSVP_INGEST_MODE=queue).
+
+POST /rsvps/ appends the RSVP to a local SQLite journal
+(app/utils/journal.py) and answers 202 with a ticket as soon as the append
+is committed. A drainer task applies journaled RSVPs in batches, one
+rsvp_apply_batch call (db/migrations/012_rsvp_ingest.sql) per batch, and
+GET /rsvps/tickets/{ticket} reports each RSVP's outcome. Appends arriving
+while a commit is in flight share the next one (group commit), so the
+journal does not become the bottleneck the database was.
+
+RSVPs still pending when a worker stops or crashes are replayed from the
+journal by the next drainer; rsvp_apply is an upsert, so applying one twice
+is harmless. Workers on one machine share the journal file, and with it
+the tickets; point RSVP_QUEUE_PATH at a persistent volume.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from ..config import settings
+from ..database import get_db
+from ..db import current_request_stats
+from ..utils.journal import Entry, Journal
+from ..utils.metrics import counter, histogram
+from . import event_cache, live
+
+logger = logging.getLogger(__name__)
+
+# Per-row errors reported by rsvp_apply_batch
+QUEUED_RSVP_ERRORS = {
+    "PT404": "Event not found",
+    "23503": "User not found",
+    "22P02": "Invalid id",
+}
+
+entries_total = counter(
+    "rsvp_queue_entries_total", "Queued RSVPs by outcome (queued, done, failed)"
+)
+batch_rows = histogram(
+    "rsvp_queue_batch_size",
+    "RSVPs per rsvp_apply_batch call",
+    buckets=(1, 5, 10, 25, 50, 100, 200, 500, 1000),
+)
+delay_seconds = histogram(
+    "rsvp_queue_delay_seconds", "Time from journaling an RSVP to applying it"
+)
+
+
+class RsvpQueue:
+    def __init__(
+        self,
+        path: str,
+        batch_size: int,
+        linger: float,
+        lease: float,
+        retention: float,
+        synchronous: str = "NORMAL",
+        enabled: bool = False,
+        poll_interval: float = 1.0,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.linger = linger
+        self.lease = lease
+        self.retention = retention
+        self.synchronous = synchronous
+        self.enabled = enabled
+        # Idle drainers still look for batches orphaned by other workers
+        self.poll_interval = poll_interval
+        self.journal: Optional[Journal] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._appends: List[Tuple[tuple, asyncio.Future]] = []
+        self._flushing: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop = None
+        self._pruned_at = 0.0
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        if self.journal is None:
+            # One thread owns the SQLite connection
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="rsvp-journal")
+            self.journal = Journal(self.path, self.synchronous)
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._wake.set()  # replay whatever an earlier run left pending
+        self._task = loop.create_task(self._drain_loop())
+
+    async def start(self) -> None:
+        if self.enabled:
+            self._ensure_started()
+
+    async def stop(self) -> None:
+        if self._flushing is not None:
+            await asyncio.gather(self._flushing, return_exceptions=True)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.journal is not None:
+            await self._run(self.journal.close)
+            self._executor.shutdown(wait=False)
+            self.journal = self._executor = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, fn, *args
+        )
+
+    async def submit(self, event_id: str, user_id: str, status_value: str) -> str:
+        """Journal an RSVP; returns its ticket once the append is durable."""
+        self._ensure_started()
+        ticket = uuid.uuid4().hex
+        payload = {"event_id": event_id, "user_id": user_id, "status": status_value}
+        future = self._loop.create_future()
+        self._appends.append(((ticket, user_id, payload), future))
+        if self._flushing is None:
+            self._flushing = self._loop.create_task(self._flush_appends())
+        await future
+        entries_total.inc(outcome="queued")
+        return ticket
+
+    async def _flush_appends(self) -> None:
+        try:
+            while self._appends:
+                batch, self._appends = self._appends, []
+                try:
+                    await self._run(self.journal.append, [entry for entry, _ in batch])
+                except Exception as exc:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+                self._wake.set()
+        finally:
+            self._flushing = None
+
+    async def get_ticket(self, ticket: str, user_id: str) -> dict:
+        if not self.enabled:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
+            )
+        self._ensure_started()
+        entry = await self._run(self.journal.get, ticket)
+        if entry is None or entry.owner != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
+            )
+        return ticket_response(entry)
+
+    async def _drain_loop(self) -> None:
+        # Not a request: keep the drainer's queries out of any request's stats
+        current_request_stats.set(None)
+        backoff = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                await asyncio.sleep(self.linger)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                while await self._drain_batch():
+                    pass
+                if time.monotonic() - self._pruned_at > 60:
+                    self._pruned_at = time.monotonic()
+                    await self._run(self.journal.prune, self.retention)
+                backoff = 0.0
+            except Exception:
+                logger.exception("applying queued RSVPs failed")
+                backoff = min(30.0, backoff * 2 or 0.5)
+                await asyncio.sleep(backoff)
+                self._wake.set()
+
+    async def _drain_batch(self) -> bool:
+        entries = await self._run(self.journal.claim, self.batch_size, self.lease)
+        if not entries:
+            return False
+        try:
+            outcomes = await self._apply(entries)
+        except Exception:
+            # Retry after the backoff instead of waiting out the lease
+            await self._run(self.journal.release, [entry.id for entry in entries])
+            raise
+        await self._run(self.journal.complete, outcomes)
+        return True
+
+    async def _apply(self, entries: List[Entry]) -> List[tuple]:
+        db = next(get_db())
+        result = await db.rpc(
+            "rsvp_apply_batch", {"p_rsvps": [entry.payload for entry in entries]}
+        ).execute()
+        batch_rows.observe(len(entries))
+        now = time.time()
+        outcomes = []
+        touched: Dict[str, List[dict]] = {}
+        for item in result.data:
+            entry = entries[item["index"]]
+            delay_seconds.observe(now - entry.created_at)
+            rsvp = item.get("rsvp")
+            if rsvp:
+                outcomes.append((entry.id, "done", rsvp))
+                touched.setdefault(rsvp["event_id"], []).append(
+                    live.rsvp_change(rsvp)
+                )
+                entries_total.inc(outcome="done")
+            else:
+                message = QUEUED_RSVP_ERRORS.get(item["code"], item["message"])
+                outcomes.append((entry.id, "failed", {"detail": message}))
+                entries_total.inc(outcome="failed")
+        for event_id, changes in touched.items():
+            event_cache.invalidate_event(event_id)
+            await live.publish_rsvps(event_id, changes)
+        if touched:
+            event_cache.invalidate_lists()
+        return outcomes
+
+
+def ticket_response(entry: Entry) -> dict:
+    done = entry.state == "done"
+    return {
+        "ticket": entry.ticket,
+        "state": entry.state,
+        "event_id": entry.payload["event_id"],
+        "status": entry.payload["status"],
+        "created_at": datetime.fromtimestamp(entry.created_at, timezone.utc),
+        "rsvp": entry.result if done else None,
+        "error": entry.result["detail"] if entry.state == "failed" else None,
+    }
+
+
+queue = RsvpQueue(
+    settings.RSVP_QUEUE_PATH,
+    batch_size=settings.RSVP_QUEUE_BATCH_SIZE,
+    linger=settings.RSVP_QUEUE_LINGER_MS / 1000,
+    lease=settings.RSVP_QUEUE_LEASE_SECONDS,
+    retention=settings.RSVP_QUEUE_RETENTION_SECONDS,
+    synchronous=settings.RSVP_QUEUE_SYNCHRONOUS,
+    enabled=settings.RSVP_INGEST_MODE == "queue",
+)
+
+
+async def submit(event_id: str, user_id: str, status_value: str) -> dict:
+    ticket = await queue.submit(event_id, user_id, status_value)
+    return {
+        "ticket": ticket,
+        "state": "pending",
+        "event_id": event_id,
+        "status": status_value,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+async def get_ticket(ticket: str, user_id: str) -> dict:
+    return await queue.get_ticket(ticket, user_id)
@@ -0,0 +1,306 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from ..config import settings
+from ..database import get_db
+from ..db import APIError
+from ..db.query import quote
+from ..schemas.series import OccurrenceUpdate, SeriesCreate, SeriesUpdate
+from ..utils.recurrence import Recurrence
+
+SERIES_RSVP_ERRORS = {
+    "PT403": (status.HTTP_403_FORBIDDEN, "Not authorized to RSVP for this user"),
+    "PT404": (status.HTTP_404_NOT_FOUND, "Occurrence not found"),
+    "PT409": (status.HTTP_409_CONFLICT, "Occurrence is full"),
+}
+
+# Fields an exception can override; anything left null follows the series
+OVERRIDE_FIELDS = ("title", "description", "location", "start_time", "end_time")
+
+
+def _timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _until(data: dict) -> Optional[str]:
+    last = Recurrence.parse(data["rrule"]).last(_timestamp(data["start_time"]))
+    return last.isoformat() if last else None
+
+
+def _check_times(data: dict) -> None:
+    if _timestamp(data["end_time"]) <= _timestamp(data["start_time"]):
+        raise HTTPException(
+            status_code=400, detail="end_time must be after start_time"
+        )
+
+
+def _check_window(window_start: datetime, window_end: datetime) -> None:
+    if window_end <= window_start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if window_end - window_start > timedelta(days=settings.SERIES_MAX_WINDOW_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Window is limited to {settings.SERIES_MAX_WINDOW_DAYS} days",
+        )
+
+
+async def create_series(series: SeriesCreate, user_id: str):
+    db = next(get_db())
+    series_data = series.model_dump(mode="json")
+    _check_times(series_data)
+    series_data["created_by"] = user_id
+    series_data["until"] = _until(series_data)
+    result = await db.table("event_series").insert(series_data).execute()
+    return result.data[0] if result.data else None
+
+
+async def get_series(series_id: str):
+    db = next(get_db())
+    result = await (
+        db.table("event_series")
+        .select("*")
+        .eq("id", series_id)
+        .maybe_single()
+        .execute()
+    )
+    return result.data if result.data else None
+
+
+async def _get_owned_series(series_id: str, user_id: str, action: str) -> dict:
+    existing = await get_series(series_id)
+    if not existing:
+        raise HTTPException(status_code=404, detail="Series not found")
+    if existing["created_by"] != user_id:
+        raise HTTPException(
+            status_code=403, detail=f"Not authorized to {action} this series"
+        )
+    return existing
+
+
+async def update_series(series_id: str, series: SeriesUpdate, user_id: str):
+    # One row, however many occurrences the series has. Exceptions and
+    # RSVPs stay keyed by their original occurrence start.
+    db = next(get_db())
+    existing = await _get_owned_series(series_id, user_id, "update")
+    update_data = series.model_dump(exclude_unset=True, mode="json")
+    if not update_data:
+        return existing
+    merged = {**existing, **update_data}
+    if "start_time" in update_data or "end_time" in update_data:
+        _check_times(merged)
+    if "rrule" in update_data or "start_time" in update_data:
+        update_data["until"] = _until(merged)
+    result = await (
+        db.table("event_series").update(update_data).eq("id", series_id).execute()
+    )
+    return result.data[0] if result.data else None
+
+
+async def delete_series(series_id: str, user_id: str) -> bool:
+    db = next(get_db())
+    await _get_owned_series(series_id, user_id, "delete")
+    result = await db.table("event_series").delete().eq("id", series_id).execute()
+    return bool(result.data)
+
+
+async def _visible_series(
+    window_start: datetime,
+    window_end: datetime,
+    user_id: Optional[str],
+    series_id: Optional[str] = None,
+) -> List[dict]:
+    # Series whose [start_time, until] overlaps the window (idx_event_series_window)
+    db = next(get_db())
+    visible = "is_public.eq.true"
+    if user_id:
+        visible += f",created_by.eq.{quote(user_id)}"
+    query = (
+        db.table("event_series")
+        .select("*")
+        .lt("start_time", window_end)
+        .and_(
+            f"or(until.is.null,until.gte.{quote(window_start.isoformat())}),"
+            f"or({visible})"
+        )
+    )
+    if series_id:
+        query = query.eq("id", series_id)
+    result = await query.execute()
+    return result.data or []
+
+
+def _occurrence(
+    series: dict,
+    start: datetime,
+    exception: Optional[dict],
+    counts: Optional[dict],
+    mine: Optional[str],
+) -> dict:
+    duration = _timestamp(series["end_time"]) - _timestamp(series["start_time"])
+    occurrence = {
+        "series_id": series["id"],
+        "occurrence_start": start.isoformat(),
+        "title": series["title"],
+        "description": series.get("description"),
+        "location": series.get("location"),
+        "category": series.get("category"),
+        "is_public": series.get("is_public", True),
+        "max_attendees": series.get("max_attendees"),
+        "start_time": start.isoformat(),
+        "end_time": (start + duration).isoformat(),
+        "cancelled": False,
+        "created_by": series["created_by"],
+        "current_user_rsvp": mine,
+    }
+    if exception:
+        occurrence["cancelled"] = bool(exception.get("cancelled"))
+        for field in OVERRIDE_FIELDS:
+            if exception.get(field) is not None:
+                occurrence[field] = exception[field]
+    counts = counts or {}
+    occurrence["rsvp_counts"] = {
+        "going": counts.get("going", 0),
+        "maybe": counts.get("maybe", 0),
+        "not_going": counts.get("not_going", 0),
+        "waitlisted": 0,
+    }
+    occurrence["attendees_count"] = occurrence["rsvp_counts"]["going"]
+    return occurrence
+
+
+async def list_occurrences(
+    window_start: datetime,
+    window_end: datetime,
+    user_id: Optional[str] = None,
+    series_id: Optional[str] = None,
+) -> List[dict]:
+    """Occurrences starting in ``[window_start, window_end)``, by start time.
+
+    Two queries whatever the window or number of occurrences: the series
+    overlapping the window, then series_window for their exceptions, RSVP
+    counts and the caller's RSVPs. Rules are expanded in memory, starting
+    at the window rather than at the first occurrence.
+    """
+    window_start, window_end = _timestamp(window_start), _timestamp(window_end)
+    _check_window(window_start, window_end)
+    series_rows = await _visible_series(window_start, window_end, user_id, series_id)
+    if not series_rows:
+        return []
+
+    db = next(get_db())
+    result = await db.rpc(
+        "series_window",
+        {
+            "p_series_ids": [series["id"] for series in series_rows],
+            "p_from": window_start.isoformat(),
+            "p_to": window_end.isoformat(),
+            "p_user_id": user_id,
+        },
+    ).execute()
+    sparse = result.data or {}
+
+    def keyed(rows) -> Dict[Tuple[str, datetime], dict]:
+        return {
+            (row["series_id"], _timestamp(row["occurrence_start"])): row
+            for row in rows or []
+        }
+
+    exceptions = keyed(sparse.get("exceptions"))
+    counts = keyed(sparse.get("counts"))
+    mine = keyed(sparse.get("mine"))
+
+    occurrences = []
+    for series in series_rows:
+        rule = Recurrence.parse(series["rrule"])
+        dtstart = _timestamp(series["start_time"])
+        for start in rule.between(dtstart, window_start, window_end):
+            key = (series["id"], start)
+            mine_row = mine.get(key)
+            occurrences.append(
+                _occurrence(
+                    series,
+                    start,
+                    exceptions.get(key),
+                    counts.get(key),
+                    mine_row["status"] if mine_row else None,
+                )
+            )
+    occurrences.sort(key=lambda o: (_timestamp(o["start_time"]), o["series_id"]))
+    return occurrences
+
+
+def _check_occurrence(series: dict, occurrence_start: datetime) -> datetime:
+    occurrence_start = _timestamp(occurrence_start)
+    rule = Recurrence.parse(series["rrule"])
+    if not rule.includes(_timestamp(series["start_time"]), occurrence_start):
+        raise HTTPException(status_code=404, detail="Occurrence not found")
+    return occurrence_start
+
+
+async def update_occurrence(
+    series_id: str,
+    occurrence_start: datetime,
+    changes: OccurrenceUpdate,
+    user_id: str,
+):
+    # Upserts the sparse exception row for this one occurrence
+    db = next(get_db())
+    series = await _get_owned_series(series_id, user_id, "update")
+    occurrence_start = _check_occurrence(series, occurrence_start)
+    exception = changes.model_dump(exclude_unset=True, mode="json")
+    exception.update(series_id=series_id, occurrence_start=occurrence_start.isoformat())
+    result = await (
+        db.table("event_series_exceptions")
+        .upsert(exception, on_conflict="series_id,occurrence_start")
+        .execute()
+    )
+    return _occurrence(
+        series, occurrence_start, result.data[0] if result.data else None, None, None
+    )
+
+
+async def rsvp_occurrence(
+    series_id: str, occurrence_start: datetime, user_id: str, status_value: str
+):
+    db = next(get_db())
+    series = await get_series(series_id)
+    if not series or not (series["is_public"] or series["created_by"] == user_id):
+        raise HTTPException(status_code=404, detail="Series not found")
+    occurrence_start = _check_occurrence(series, occurrence_start)
+    try:
+        result = await db.rpc(
+            "series_rsvp_upsert",
+            {
+                "p_series_id": series_id,
+                "p_occurrence_start": occurrence_start.isoformat(),
+                "p_user_id": user_id,
+                "p_status": status_value,
+            },
+        ).execute()
+    except APIError as exc:
+        if exc.code in SERIES_RSVP_ERRORS:
+            code, detail = SERIES_RSVP_ERRORS[exc.code]
+            raise HTTPException(status_code=code, detail=detail)
+        raise
+    return result.data
+
+
+async def cancel_occurrence_rsvp(
+    series_id: str, occurrence_start: datetime, user_id: str
+) -> bool:
+    db = next(get_db())
+    result = await (
+        db.table("series_rsvps")
+        .delete()
+        .eq("series_id", series_id)
+        .eq("occurrence_start", _timestamp(occurrence_start))
+        .eq("user_id", user_id)
+        .execute()
+    )
+    return bool(result.data)
@@ -1,8 +1,8 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from fastapi import Depends, HTTPException, status
 from ..database import get_db
 from ..schemas.user import UserCreate, UserUpdate, UserInDB
-from ..services.auth import get_password_hash
+from ..services.auth import get_password_hash, invalidate_principal
 
 
 async def create_user(user: UserCreate):
@@ -15,26 +15,49 @@ async def create_user(user: UserCreate):
         )
 
     user_data = user.dict()
-    user_data["hashed_password"] = get_password_hash(user.password)
+    user_data["hashed_password"] = await get_password_hash(user.password)
     del user_data["password"]
 
-    result = db.table("users").insert(user_data).execute()
+    result = await db.table("users").insert(user_data).execute()
     return result.data[0] if result.data else None
 
 
 async def get_user(user_id: str):
     db = next(get_db())
-    result = db.table("users").select("*").eq("id", user_id).single().execute()
+    result = await db.table("users").select("*").eq("id", user_id).single().execute()
     return result.data if hasattr(result, "data") else None
 
 
+async def get_users_by_ids(user_ids: List[str]) -> Dict[str, dict]:
+    db = next(get_db())
+    result = await db.table("users").select("*").in_("id", user_ids).execute()
+    return {user["id"]: user for user in result.data or []}
+
+
+async def get_user_ids_by_email(emails: List[str]) -> Dict[str, str]:
+    db = next(get_db())
+    result = await db.table("users").select("id,email").in_("email", emails).execute()
+    return {user["email"]: user["id"] for user in result.data or []}
+
+
 async def get_user_by_email(email: str):
     db = next(get_db())
-    result = db.table("users").select("*").eq("email", email).maybe_single().execute()
+    result = await (
+        db.table("users")
+        .select("*")
+        .eq("email", email)
+        .maybe_single()
+        .execute()
+    )
     return result.data if hasattr(result, "data") else None
 
 
-async def update_user(user_id: str, user: UserUpdate, current_user_id: str):
+async def update_user(
+    user_id: str,
+    user: UserUpdate,
+    current_user_id: str,
+    current_email: Optional[str] = None,
+):
     # Verify user exists and is updating their own profile
     if user_id != current_user_id:
         raise HTTPException(
@@ -46,10 +69,16 @@ async def update_user(user_id: str, user: UserUpdate, current_user_id: str):
     update_data = user.dict(exclude_unset=True)
 
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await get_password_hash(
+            update_data.pop("password")
+        )
 
     if not update_data:
         return await get_user(user_id)
 
-    result = db.table("users").update(update_data).eq("id", user_id).execute()
+    result = await db.table("users").update(update_data).eq("id", user_id).execute()
+    # Principals are cached by token subject, the email before the update
+    invalidate_principal(current_email)
+    if result.data:
+        invalidate_principal(result.data[0]["email"])
     return result.data[0] if result.data else None
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Any, AsyncIterator, List
+
+
+class Broker:
+    """Transport for live-update messages between worker processes.
+
+    Every message published by any worker must reach every ``listen()``
+    iterator in every worker. ``MemoryBroker`` covers a single process; a
+    multi-worker deployment can plug in Redis pub/sub, Postgres
+    LISTEN/NOTIFY, ... by implementing these methods with JSON-serialisable
+    messages.
+    """
+
+    async def publish(self, message: Any) -> None:
+        raise NotImplementedError
+
+    def listen(self) -> AsyncIterator[Any]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBroker(Broker):
+    def __init__(self):
+        self._listeners: List[asyncio.Queue] = []
+
+    async def publish(self, message: Any) -> None:
+        for queue in self._listeners:
+            queue.put_nowait(message)
+
+    async def listen(self) -> AsyncIterator[Any]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._listeners.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._listeners.remove(queue)
+
+    async def close(self) -> None:
+        self._listeners.clear()
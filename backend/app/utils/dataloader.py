@@ -0,0 +1,88 @@
+import asyncio
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Set,
+    TypeVar,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFn = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """Coalesces and memoizes keyed lookups for the lifetime of the loader.
+
+    Every ``load`` issued in the same event-loop tick is collected and
+    resolved by a single ``batch_fn(keys)`` call, which returns a mapping of
+    the keys it found. Later loads of a key return the memoized result
+    (``None`` when the key does not exist) without another query.
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch_size: int = 100):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        # Batches in flight; the loop itself only holds weak references
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: K):
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                # Run after every coroutine already scheduled this tick has
+                # had a chance to queue its keys.
+                loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> List:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value) -> None:
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: K) -> None:
+        self._futures.pop(key, None)
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self._max_batch_size):
+            batch = queue[start : start + self._max_batch_size]
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: List[K]) -> None:
+        try:
+            found = await self._batch_fn(keys)
+            for key in keys:
+                future = self._futures.get(key)
+                if future is not None and not future.done():
+                    future.set_result(found.get(key))
+        except Exception as exc:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+        finally:
+            # Cancelled mid-batch: cancel the waiters rather than leave them
+            # hanging, and forget the keys so a later load retries them
+            for key in keys:
+                future = self._futures.get(key)
+                if future is not None and not future.done():
+                    del self._futures[key]
+                    future.cancel()
@@ -0,0 +1,45 @@
+import asyncio
+import json
+import logging
+from typing import List
+
+
+class Sink:
+    """Destination for batches of outgoing notifications (JSON-able dicts).
+
+    ``LogSink`` and ``FileSink`` are for development and tests; production
+    plugs in an email or push provider by implementing ``deliver``, ideally
+    on top of the provider's batch API.
+    """
+
+    async def deliver(self, messages: List[dict]) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class LogSink(Sink):
+    def __init__(self, logger_name: str = "app.notifications"):
+        self.logger = logging.getLogger(logger_name)
+
+    async def deliver(self, messages: List[dict]) -> None:
+        for message in messages:
+            self.logger.info("notify %s", json.dumps(message, sort_keys=True))
+
+
+class FileSink(Sink):
+    """Appends one JSON line per message to ``path``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = asyncio.Lock()
+
+    def _write(self, lines: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+    async def deliver(self, messages: List[dict]) -> None:
+        lines = "".join(json.dumps(message) + "\n" for message in messages)
+        async with self._lock:
+            await asyncio.to_thread(self._write, lines)
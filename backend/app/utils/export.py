@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+# Rows are written to the response in chunks of roughly this many bytes
+CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Inline embedded objects as ``<name>_<field>`` columns."""
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            for inner, inner_value in value.items():
+                flat[f"{key}_{inner}"] = inner_value
+        else:
+            flat[key] = value
+    return flat
+
+
+async def ndjson_lines(rows: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    async for row in rows:
+        buffer.write(json.dumps(row, default=str))
+        buffer.write("\n")
+        if buffer.tell() >= CHUNK_SIZE:
+            yield _drain(buffer)
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+async def csv_lines(
+    rows: AsyncIterator[dict], columns: List[str]
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow(flatten(row))
+        if buffer.tell() >= CHUNK_SIZE:
+            yield _drain(buffer)
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def encode_rows(
+    rows: AsyncIterator[dict], format: str, columns: List[str]
+) -> AsyncIterator[bytes]:
+    if format == "csv":
+        return csv_lines(rows, columns)
+    return ndjson_lines(rows)
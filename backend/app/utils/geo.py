@@ -0,0 +1,53 @@
+"""Great-circle helpers mirroring the SQL in db/migrations/009_event_location.sql."""
+import math
+from typing import List, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+# (min_lon, min_lat, max_lon, max_lat)
+Box = Tuple[float, float, float, float]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_boxes(lat: float, lon: float, radius_km: float) -> List[Box]:
+    """Boxes that together contain every point within ``radius_km``.
+
+    One box normally, two when the circle crosses the antimeridian, and a
+    full-longitude band when it reaches a pole.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return [(-180.0, min_lat, 180.0, max_lat)]
+    ratio = math.sin(angular) / math.cos(math.radians(lat))
+    dlon = 180.0 if ratio >= 1.0 else math.degrees(math.asin(ratio))
+    if dlon >= 180.0:
+        return [(-180.0, min_lat, 180.0, max_lat)]
+    west, east = lon - dlon, lon + dlon
+    if west < -180.0:
+        return [
+            (west + 360.0, min_lat, 180.0, max_lat),
+            (-180.0, min_lat, east, max_lat),
+        ]
+    if east > 180.0:
+        return [
+            (west, min_lat, 180.0, max_lat),
+            (-180.0, min_lat, east - 360.0, max_lat),
+        ]
+    return [(west, min_lat, east, max_lat)]
+
+
+def in_box(lat: float, lon: float, box: Box) -> bool:
+    min_lon, min_lat, max_lon, max_lat = box
+    return min_lon <= lon <= max_lon and min_lat <= lat <= max_lat
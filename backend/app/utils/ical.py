@@ -0,0 +1,87 @@
+"""Minimal RFC 5545 writer for the personal calendar feed."""
+from datetime import datetime, timezone
+from typing import Iterable, List
+
+PRODID = "-//Event Planner//Calendar Feed//EN"
+UID_DOMAIN = "event-planner"
+
+# RSVP status -> VEVENT STATUS
+EVENT_STATUS = {
+    "going": "CONFIRMED",
+    "maybe": "TENTATIVE",
+    "waitlisted": "TENTATIVE",
+}
+
+
+def to_utc(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def format_datetime(value) -> str:
+    return to_utc(value).strftime("%Y%m%dT%H%M%SZ")
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Fold a content line into 75-octet pieces without splitting a character."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    pieces, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Back off to a UTF-8 character boundary
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        pieces.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return "\r\n ".join(pieces)
+
+
+def render_event(entry: dict) -> List[str]:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{entry['event_id']}@{UID_DOMAIN}",
+        # Derived from the data, not the clock, so the body (and its strong
+        # ETag) only changes when the entry does
+        f"DTSTAMP:{format_datetime(entry['updated_at'])}",
+        f"LAST-MODIFIED:{format_datetime(entry['updated_at'])}",
+        f"DTSTART:{format_datetime(entry['start_time'])}",
+        f"DTEND:{format_datetime(entry['end_time'])}",
+        f"SUMMARY:{escape_text(entry['title'])}",
+        f"STATUS:{EVENT_STATUS.get(entry['status'], 'TENTATIVE')}",
+    ]
+    if entry.get("description"):
+        lines.append(f"DESCRIPTION:{escape_text(entry['description'])}")
+    if entry.get("location"):
+        lines.append(f"LOCATION:{escape_text(entry['location'])}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def render_calendar(entries: Iterable[dict], name: str = "Event Planner") -> bytes:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ]
+    for entry in entries:
+        lines.extend(render_event(entry))
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(fold(line) for line in lines) + "\r\n").encode()
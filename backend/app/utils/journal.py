@@ -0,0 +1,183 @@
+"""Durable local work queue on SQLite in WAL mode.
+
+Producers ``append`` entries; a drainer ``claim``s them in batches and
+``complete``s them with a result that stays readable (``get``) until it is
+``prune``d. A claim is a lease: if the drainer dies (crash, redeploy)
+before completing its batch, the entries become claimable again once the
+lease runs out, so every entry is processed at least once. The file can be
+shared by several processes on one machine.
+
+All methods block. The caller runs them on one dedicated thread, off the
+event loop.
+"""
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+create table if not exists entries (
+  id integer primary key autoincrement,
+  ticket text not null unique,
+  owner text not null,
+  payload text not null,
+  -- pending | done | failed
+  state text not null default 'pending',
+  result text,
+  attempts integer not null default 0,
+  claimed_until real not null default 0,
+  created_at real not null,
+  finished_at real
+);
+create index if not exists entries_state on entries (state, id);
+"""
+
+
+@dataclass
+class Entry:
+    id: int
+    ticket: str
+    owner: str
+    payload: Any
+    state: str = "pending"
+    result: Any = None
+    attempts: int = 0
+    created_at: float = 0.0
+
+
+class Journal:
+    def __init__(
+        self,
+        path: str,
+        synchronous: str = "NORMAL",
+        clock: Callable[[], float] = time.time,
+    ):
+        # synchronous=NORMAL survives a process crash; FULL also survives
+        # power loss, at one fsync per commit
+        self._clock = clock
+        self.conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False, timeout=30
+        )
+        self.conn.execute("pragma journal_mode=wal")
+        self.conn.execute(f"pragma synchronous={synchronous}")
+        self.conn.executescript(SCHEMA)
+
+    def _transaction(self, statements: Callable[[sqlite3.Connection], Any]) -> Any:
+        self.conn.execute("begin immediate")
+        try:
+            result = statements(self.conn)
+        except BaseException:
+            self.conn.execute("rollback")
+            raise
+        self.conn.execute("commit")
+        return result
+
+    def append(self, entries: Iterable[Tuple[str, str, Any]]) -> None:
+        """Add (ticket, owner, payload) entries in one transaction."""
+        now = self._clock()
+        rows = [
+            (ticket, owner, json.dumps(payload), now)
+            for ticket, owner, payload in entries
+        ]
+        self._transaction(
+            lambda conn: conn.executemany(
+                "insert into entries (ticket, owner, payload, created_at) "
+                "values (?, ?, ?, ?)",
+                rows,
+            )
+        )
+
+    def claim(self, limit: int, lease: float) -> List[Entry]:
+        """Lease up to ``limit`` pending entries, oldest first.
+
+        Nothing is claimed while another claim's lease is live, so entries
+        are processed in order even with several drainers, and a batch
+        orphaned by a crash is replayed before anything journaled after it.
+        """
+        now = self._clock()
+
+        def statements(conn):
+            leased = conn.execute(
+                "select 1 from entries where state = 'pending' "
+                "and claimed_until >= ? limit 1",
+                (now,),
+            ).fetchone()
+            if leased:
+                return []
+            return conn.execute(
+                "update entries set claimed_until = ?, attempts = attempts + 1 "
+                "where id in (select id from entries where state = 'pending' "
+                "order by id limit ?) "
+                "returning id, ticket, owner, payload, attempts, created_at",
+                (now + lease, limit),
+            ).fetchall()
+
+        return sorted(
+            (
+                Entry(id, ticket, owner, json.loads(payload), "pending", None, n, at)
+                for id, ticket, owner, payload, n, at in self._transaction(statements)
+            ),
+            key=lambda entry: entry.id,
+        )
+
+    def release(self, ids: List[int]) -> None:
+        """Make claimed entries claimable again right away."""
+        self._transaction(
+            lambda conn: conn.executemany(
+                "update entries set claimed_until = 0 where id = ?",
+                [(id,) for id in ids],
+            )
+        )
+
+    def complete(self, outcomes: Iterable[Tuple[int, str, Any]]) -> None:
+        """Record (id, 'done' | 'failed', result) for claimed entries."""
+        now = self._clock()
+        rows = [
+            (state, json.dumps(result), now, id) for id, state, result in outcomes
+        ]
+        self._transaction(
+            lambda conn: conn.executemany(
+                "update entries set state = ?, result = ?, finished_at = ? "
+                "where id = ?",
+                rows,
+            )
+        )
+
+    def get(self, ticket: str) -> Optional[Entry]:
+        row = self.conn.execute(
+            "select id, ticket, owner, payload, state, result, attempts, created_at "
+            "from entries where ticket = ?",
+            (ticket,),
+        ).fetchone()
+        if row is None:
+            return None
+        id, ticket, owner, payload, state, result, attempts, created_at = row
+        return Entry(
+            id,
+            ticket,
+            owner,
+            json.loads(payload),
+            state,
+            json.loads(result) if result is not None else None,
+            attempts,
+            created_at,
+        )
+
+    def pending(self) -> int:
+        return self.conn.execute(
+            "select count(*) from entries where state = 'pending'"
+        ).fetchone()[0]
+
+    def prune(self, older_than: float) -> int:
+        """Delete finished entries completed more than ``older_than`` s ago."""
+        cutoff = self._clock() - older_than
+        return self._transaction(
+            lambda conn: conn.execute(
+                "delete from entries where state <> 'pending' and finished_at < ?",
+                (cutoff,),
+            ).rowcount
+        )
+
+    def close(self) -> None:
+        self.conn.close()
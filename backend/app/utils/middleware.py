@@ -0,0 +1,138 @@
+import logging
+import random
+import time
+from typing import Callable, Optional
+
+from ..db import RequestStats, current_request_stats
+from .metrics import gauge, histogram
+from .profiler import StackSampler
+
+logger = logging.getLogger("app.requests")
+profile_logger = logging.getLogger("app.profile")
+
+request_seconds = histogram(
+    "http_request_duration_seconds",
+    "Request latency by method, route template and status",
+)
+request_queries = histogram(
+    "http_request_db_queries",
+    "Database queries issued per request, by route template",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34),
+)
+requests_in_flight = gauge(
+    "http_requests_in_flight", "Requests currently being served, by method"
+)
+
+
+class QueryCountMiddleware:
+    """Log how many database queries each request issued.
+
+    Written as plain ASGI middleware so the context variable it sets is
+    visible to the route handler and everything it awaits.
+    """
+
+    def __init__(self, app, warn_threshold: int = 10):
+        self.app = app
+        self.warn_threshold = warn_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request_stats.reset(token)
+            level = logging.INFO
+            if stats.queries > self.warn_threshold:
+                level = logging.WARNING
+            logger.log(
+                level,
+                "%s %s db_queries=%d db_ms=%.1f duration_ms=%.1f",
+                scope["method"],
+                scope["path"],
+                stats.queries,
+                stats.db_seconds * 1000,
+                (time.perf_counter() - started) * 1000,
+            )
+
+
+def _log_profile(profile: dict) -> None:
+    profile_logger.warning("slow request profile %s", profile)
+
+
+class MetricsMiddleware:
+    """Per-route latency and query-count histograms plus an in-flight gauge.
+
+    Must run inside QueryCountMiddleware, whose per-request stats it reads.
+    Routes are labelled by their template (``/api/v1/events/{event_id}``),
+    so label cardinality stays bounded. With ``profile_sample_rate`` > 0,
+    that fraction of requests runs under a StackSampler, and the profile of
+    any sampled request slower than ``profile_slow_ms`` goes to
+    ``profile_sink`` (a warning log by default).
+    """
+
+    def __init__(
+        self,
+        app,
+        profile_sample_rate: float = 0.0,
+        profile_slow_ms: float = 500.0,
+        profile_sink: Optional[Callable[[dict], None]] = None,
+    ):
+        self.app = app
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_slow_ms = profile_slow_ms
+        self.profile_sink = profile_sink or _log_profile
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        sampler = None
+        if self.profile_sample_rate and random.random() < self.profile_sample_rate:
+            sampler = StackSampler()
+            sampler.start()
+        requests_in_flight.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            requests_in_flight.dec(method=method)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            request_seconds.observe(
+                elapsed, method=method, route=template, status=str(status_code)
+            )
+            stats = current_request_stats.get()
+            if stats is not None:
+                request_queries.observe(stats.queries, route=template)
+            if sampler is not None:
+                sampler.stop()
+                if elapsed * 1000 >= self.profile_slow_ms:
+                    self.profile_sink(
+                        {
+                            "method": method,
+                            "path": scope["path"],
+                            "route": template,
+                            "status": status_code,
+                            "duration_ms": round(elapsed * 1000, 1),
+                            "db_queries": stats.queries if stats else None,
+                            "db_ms": round(stats.db_seconds * 1000, 1)
+                            if stats
+                            else None,
+                            **sampler.summary(),
+                        }
+                    )
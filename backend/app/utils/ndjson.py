@@ -0,0 +1,56 @@
+import json
+from typing import Any, AsyncIterator
+
+from starlette.requests import Request
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+class InvalidBody(ValueError):
+    pass
+
+
+class InvalidItem:
+    """Placeholder for an NDJSON line that is not valid JSON."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+async def iter_json_items(request: Request) -> AsyncIterator[Any]:
+    """Yield the items of a JSON array body or of an NDJSON request stream.
+
+    NDJSON is decoded line by line as the body arrives, so the upload is
+    never buffered as a whole. Blank lines are skipped; a malformed line
+    yields an ``InvalidItem`` in its place.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type not in NDJSON_MEDIA_TYPES:
+        try:
+            items = json.loads(await request.body())
+        except ValueError as exc:
+            raise InvalidBody(f"Invalid JSON: {exc}")
+        if not isinstance(items, list):
+            raise InvalidBody("Expected a JSON array or an NDJSON stream")
+        for item in items:
+            yield item
+        return
+
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+    if pending.strip():
+        yield _decode_line(pending)
+
+
+def _decode_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return InvalidItem(f"Invalid JSON: {exc}")
@@ -0,0 +1,80 @@
+"""Wall-clock stack sampler for a single asyncio task.
+
+A daemon thread wakes every ``interval`` seconds and looks at the event
+loop thread's current stack. If the sampled task's coroutine is on it, the
+stack is recorded; otherwise the tick is counted as waiting (the task is
+suspended on I/O, or another task holds the loop). Only samplers that have
+been started cost anything, so requests that are not sampled are not
+slowed down.
+"""
+import asyncio
+import sys
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+Stack = Tuple[str, ...]
+
+
+def _describe(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_filename}:{code.co_name}:{frame.f_lineno}"
+
+
+class StackSampler:
+    def __init__(self, interval: float = 0.005, max_depth: int = 40):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.waiting = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target_frame = None
+        self._thread_id: Optional[int] = None
+
+    def start(self) -> None:
+        task = asyncio.current_task()
+        self._target_frame = task.get_coro().cr_frame if task else None
+        self._thread_id = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack: List[str] = []
+            owned = False
+            while frame is not None:
+                if frame is self._target_frame:
+                    owned = True
+                if len(stack) < self.max_depth:
+                    stack.append(_describe(frame))
+                frame = frame.f_back
+            if owned:
+                self.stacks[tuple(reversed(stack))] += 1
+            else:
+                self.waiting += 1
+
+    def summary(self, limit: int = 10) -> Dict[str, object]:
+        running = sum(self.stacks.values())
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack[-1]] += count
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": running + self.waiting,
+            "running": running,
+            "waiting": self.waiting,
+            "top_functions": leaves.most_common(limit),
+            "top_stacks": [
+                {"count": count, "stack": list(stack[-12:])}
+                for stack, count in self.stacks.most_common(3)
+            ],
+        }
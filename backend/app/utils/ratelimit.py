@@ -0,0 +1,287 @@
+"""Token-bucket rate limiting for the API.
+
+Every request under the API prefix takes one token from a bucket keyed by
+the rule it matches and by who sent it: the JWT subject when the request
+carries a valid bearer token, otherwise the client IP. The login and
+registration endpoints are always keyed by IP. A request that finds its
+bucket empty gets 429 with a Retry-After header.
+
+Limits are written ``<rate>/<unit>[:<burst>]``, e.g. ``20/s:40`` (20
+requests a second, bursts of up to 40) or ``10/m`` (burst defaults to the
+rate). Rules are ``<METHOD> <path>=<limit>`` separated by ``;``, where a
+path ending in ``*`` matches by prefix and ``*`` as method matches any.
+
+Behind a reverse proxy the socket peer is the proxy, so every anonymous
+caller would share one bucket. With ``trusted_hops`` set to the number of
+proxies in front of the app, the client IP is taken from X-Forwarded-For
+instead: the address that many entries from the right, which the
+outermost trusted proxy appended. Entries further left are client-supplied
+and never used.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from .metrics import counter
+
+UNITS = {"s": 1.0, "m": 60.0, "h": 3600.0, "d": 86400.0}
+
+rate_limited = counter("rate_limited_total", "Requests rejected with 429, by rule")
+
+
+@dataclass(frozen=True)
+class Limit:
+    rate: float  # tokens per second
+    burst: float
+
+    @classmethod
+    def parse(cls, text: str) -> "Limit":
+        amount, _, rest = text.strip().partition("/")
+        unit, _, burst = rest.partition(":")
+        try:
+            per = float(amount) / UNITS[unit.strip() or "s"]
+            burst = float(burst) if burst else float(amount)
+        except (KeyError, ValueError):
+            raise ValueError(f"invalid rate limit: {text!r}") from None
+        if per <= 0 or burst < 1:
+            raise ValueError(f"invalid rate limit: {text!r}")
+        return cls(per, burst)
+
+
+@dataclass(frozen=True)
+class Rule:
+    method: str
+    path: str
+    limit: Limit
+    by_ip: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.method not in ("*", method):
+            return False
+        if self.path.endswith("*"):
+            return path.startswith(self.path[:-1])
+        return path == self.path
+
+
+def parse_rules(text: str, by_ip: Tuple[str, ...] = ()) -> List[Rule]:
+    rules = []
+    for item in filter(None, (part.strip() for part in text.split(";"))):
+        target, _, limit = item.rpartition("=")
+        method, _, path = target.strip().partition(" ")
+        if not path:
+            raise ValueError(f"invalid rate limit rule: {item!r}")
+        rules.append(
+            Rule(
+                method.upper(),
+                path.strip(),
+                Limit.parse(limit),
+                by_ip=path.strip() in by_ip,
+            )
+        )
+    return rules
+
+
+class RateLimitStore:
+    """Bucket storage interface.
+
+    ``MemoryRateLimitStore`` keeps buckets per process, so with N workers a
+    client effectively gets N times the limit. A multi-worker deployment can
+    plug in a shared store (e.g. a Redis script doing the same arithmetic)
+    by implementing ``take``.
+    """
+
+    async def take(self, key: str, limit: Limit, cost: float = 1.0) -> float:
+        """Spend ``cost`` tokens; 0 if allowed, else seconds until it would be."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        pass
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Buckets in LRU order, split over ``shards`` independently locked maps.
+
+    A bucket left alone long enough to refill completely is the same as no
+    bucket, so each call drops at most a couple of such buckets from the
+    cold end of its shard, and never scans. ``max_buckets`` bounds memory
+    under a flood of distinct keys (spoofed IPs, say) by dropping the least
+    recently used bucket even if it is not full yet. Locks are only held
+    for the arithmetic, never across an await.
+    """
+
+    def __init__(
+        self,
+        shards: int = 16,
+        max_buckets: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._shards = [OrderedDict() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self.max_per_shard = max(1, max_buckets // shards)
+        self._clock = clock
+        self.evictions = 0
+
+    async def take(self, key: str, limit: Limit, cost: float = 1.0) -> float:
+        return self.take_now(key, limit, cost)
+
+    def take_now(self, key: str, limit: Limit, cost: float = 1.0) -> float:
+        index = hash(key) % len(self._shards)
+        shard = self._shards[index]
+        with self._locks[index]:
+            now = self._clock()
+            bucket = shard.pop(key, None)
+            if bucket is None:
+                tokens = limit.burst
+            else:
+                tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / limit.rate
+            # [tokens, updated at, full again at]
+            shard[key] = [tokens, now, now + (limit.burst - tokens) / limit.rate]
+            self._evict(shard, now)
+        return wait
+
+    def _evict(self, shard: OrderedDict, now: float) -> None:
+        for _ in range(2):
+            if not shard:
+                return
+            _, (_, _, full_at) = next(iter(shard.items()))
+            if full_at > now and len(shard) <= self.max_per_shard:
+                return
+            shard.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        store: RateLimitStore,
+        default: Optional[Limit],
+        rules: List[Rule],
+        enabled: bool = True,
+    ):
+        self.store = store
+        self.default = default
+        self.rules = rules
+        self.enabled = enabled
+
+    def rule_for(self, method: str, path: str) -> Optional[Rule]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    async def check(
+        self, method: str, path: str, subject: Optional[str], ip: str
+    ) -> Tuple[float, str]:
+        """(seconds to wait, rule name); 0 seconds means the request may pass."""
+        rule = self.rule_for(method, path)
+        if rule is not None:
+            name, limit = rule.name, rule.limit
+            identity = f"ip:{ip}" if rule.by_ip or not subject else f"sub:{subject}"
+        elif self.default is not None:
+            name, limit = "default", self.default
+            identity = f"sub:{subject}" if subject else f"ip:{ip}"
+        else:
+            return 0.0, ""
+        return await self.store.take(f"{name}|{identity}", limit), name
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token.strip()
+    return None
+
+
+def client_ip(scope, trusted_hops: int = 0) -> str:
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if trusted_hops <= 0:
+        return peer
+    forwarded = []
+    for key, value in scope["headers"]:
+        if key == b"x-forwarded-for":
+            forwarded.extend(
+                part.strip() for part in value.decode("latin-1").split(",")
+            )
+    forwarded = [part for part in forwarded if part]
+    if len(forwarded) < trusted_hops:
+        # Reached without passing through every proxy
+        return peer
+    return forwarded[-trusted_hops]
+
+
+class RateLimitMiddleware:
+    """Applies ``limiter`` to requests under ``prefix``.
+
+    ``subject`` maps a bearer token to its verified JWT subject (or None);
+    it must not touch the database, since it runs on every request.
+    ``trusted_hops`` is the number of reverse proxies in front of the app.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: RateLimiter,
+        subject: Callable[[str], Optional[str]],
+        prefix: str = "",
+        trusted_hops: int = 0,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.subject = subject
+        self.prefix = prefix
+        self.trusted_hops = trusted_hops
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self.limiter.enabled
+            or not scope["path"].startswith(self.prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+        token = _bearer_token(scope)
+        subject = self.subject(token) if token else None
+        ip = client_ip(scope, self.trusted_hops)
+        wait, rule = await self.limiter.check(
+            scope["method"], scope["path"], subject, ip
+        )
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+        rate_limited.inc(rule=rule)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", str(math.ceil(wait)).encode()),
+                ],
+            }
+        )
+        await send(
+            {"type": "http.response.body", "body": b'{"detail":"Too many requests"}'}
+        )
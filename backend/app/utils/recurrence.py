@@ -0,0 +1,277 @@
+"""A small RRULE (RFC 5545) subset for event series.
+
+Supported parts: ``FREQ`` (DAILY, WEEKLY, MONTHLY), ``INTERVAL``, ``BYDAY``
+(WEEKLY only, e.g. ``MO,WE``), ``COUNT`` and ``UNTIL``. Occurrences are
+generated on demand and only inside the requested window: DAILY and WEEKLY
+rules jump straight to the window start, so expanding a window costs the
+same however old the series is. All times are UTC, and DTSTART is an
+occurrence only when it matches the rule. Expansion ends at the last
+occurrence ``datetime`` can represent, and ``last`` is computed without
+expanding the rule.
+"""
+from bisect import bisect_right
+from calendar import monthrange
+from datetime import MAXYEAR, datetime, timedelta, timezone
+from math import gcd
+from typing import Iterator, List, Optional, Tuple
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+MAX_COUNT = 10000
+# Series may not be given an UNTIL beyond this (see schemas/series.py)
+MAX_UNTIL = datetime(2200, 1, 1, tzinfo=timezone.utc)
+# The Gregorian calendar repeats every 400 years
+CYCLE_MONTHS = 4800
+LATEST = datetime.max.replace(tzinfo=timezone.utc)
+
+
+class InvalidRule(ValueError):
+    pass
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _parse_until(value: str) -> datetime:
+    for fmt in ("%Y%m%dT%H%M%SZ", "%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    raise InvalidRule(f"invalid UNTIL: {value}")
+
+
+class Recurrence:
+    def __init__(
+        self,
+        freq: str,
+        interval: int = 1,
+        byday: Tuple[int, ...] = (),
+        count: Optional[int] = None,
+        until: Optional[datetime] = None,
+    ):
+        if freq not in FREQUENCIES:
+            raise InvalidRule(f"unsupported FREQ: {freq}")
+        if interval < 1:
+            raise InvalidRule("INTERVAL must be positive")
+        if byday and freq != "WEEKLY":
+            raise InvalidRule("BYDAY is only supported with FREQ=WEEKLY")
+        if count is not None and not 1 <= count <= MAX_COUNT:
+            raise InvalidRule(f"COUNT must be between 1 and {MAX_COUNT}")
+        if count is not None and until is not None:
+            raise InvalidRule("COUNT and UNTIL are mutually exclusive")
+        self.freq = freq
+        self.interval = interval
+        self.byday = tuple(sorted(set(byday)))
+        self.count = count
+        self.until = _utc(until) if until else None
+
+    @classmethod
+    def parse(cls, text: str) -> "Recurrence":
+        parts = {}
+        body = text.strip()
+        if body.upper().startswith("RRULE:"):
+            body = body[6:]
+        for part in filter(None, body.split(";")):
+            key, sep, value = part.partition("=")
+            if not sep or not value:
+                raise InvalidRule(f"invalid rule part: {part}")
+            parts[key.strip().upper()] = value.strip().upper()
+        unknown = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "COUNT", "UNTIL"}
+        if unknown:
+            names = ", ".join(sorted(unknown))
+            raise InvalidRule(f"unsupported rule parts: {names}")
+        if "FREQ" not in parts:
+            raise InvalidRule("FREQ is required")
+        try:
+            interval = int(parts.get("INTERVAL", "1"))
+            count = int(parts["COUNT"]) if "COUNT" in parts else None
+        except ValueError:
+            raise InvalidRule("INTERVAL and COUNT must be integers")
+        byday = ()
+        if "BYDAY" in parts:
+            try:
+                byday = tuple(WEEKDAYS.index(day) for day in parts["BYDAY"].split(","))
+            except ValueError:
+                raise InvalidRule(f"invalid BYDAY: {parts['BYDAY']}")
+        until = _parse_until(parts["UNTIL"]) if "UNTIL" in parts else None
+        return cls(parts["FREQ"], interval, byday, count, until)
+
+    def __str__(self) -> str:
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in self.byday))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%dT%H%M%SZ')}")
+        return ";".join(parts)
+
+    # Expansion ---------------------------------------------------------
+
+    def _from(
+        self, dtstart: datetime, after: datetime
+    ) -> Iterator[Tuple[int, datetime]]:
+        """(index, start) pairs in order, beginning near ``after``."""
+        if self.freq == "DAILY":
+            step = timedelta(days=self.interval)
+            index = 0
+            if after > dtstart:
+                index = -((dtstart - after) // step)
+            while True:
+                try:
+                    start = dtstart + index * step
+                except OverflowError:
+                    return
+                yield index, start
+                index += 1
+
+        elif self.freq == "WEEKLY":
+            days = self.byday or (dtstart.weekday(),)
+            week = timedelta(weeks=self.interval)
+            anchor = dtstart - timedelta(days=dtstart.weekday())
+            # Days of the first week that fall before DTSTART do not occur
+            skipped = sum(1 for day in days if day < dtstart.weekday())
+            period = 0
+            if after > anchor:
+                period = (after - anchor) // week
+            index = period * len(days) - (skipped if period else 0)
+            while True:
+                for day in days:
+                    try:
+                        start = anchor + period * week + timedelta(days=day)
+                    except OverflowError:
+                        return
+                    if start < dtstart:
+                        continue
+                    yield index, start
+                    index += 1
+                period += 1
+
+        else:
+            # Months without DTSTART's day of month are skipped, so MONTHLY
+            # walks from the beginning; that is at most 12 steps a year.
+            index = 0
+            month = 0
+            while True:
+                total = dtstart.month - 1 + month
+                year, month_of_year = dtstart.year + total // 12, total % 12 + 1
+                if year > MAXYEAR:
+                    return
+                try:
+                    start = dtstart.replace(year=year, month=month_of_year)
+                except ValueError:
+                    month += self.interval
+                    continue
+                yield index, start
+                index += 1
+                month += self.interval
+
+    def between(
+        self,
+        dtstart: datetime,
+        window_start: Optional[datetime] = None,
+        window_end: Optional[datetime] = None,
+    ) -> Iterator[datetime]:
+        """Occurrence starts in ``[window_start, window_end)``."""
+        dtstart = _utc(dtstart)
+        after = _utc(window_start) if window_start else dtstart
+        end = _utc(window_end) if window_end else None
+        for index, start in self._from(dtstart, after):
+            if self.count is not None and index >= self.count:
+                return
+            if self.until is not None and start > self.until:
+                return
+            if end is not None and start >= end:
+                return
+            if start >= after:
+                yield start
+
+    def last(self, dtstart: datetime) -> Optional[datetime]:
+        """Start of the final occurrence, or None for an endless rule."""
+        if self.count is None and self.until is None:
+            return None
+        dtstart = _utc(dtstart)
+        index = self._count_until(dtstart, self.until or LATEST) - 1
+        if self.count is not None:
+            index = min(index, self.count - 1)
+        return self._nth(dtstart, index) if index >= 0 else None
+
+    # Occurrence arithmetic for ``last``: the index of every occurrence up
+    # to a moment, and the start of the occurrence with a given index.
+
+    def _count_until(self, dtstart: datetime, limit: datetime) -> int:
+        """Number of occurrences starting at or before ``limit``."""
+        if limit < dtstart:
+            return 0
+        if self.freq == "DAILY":
+            return (limit - dtstart) // timedelta(days=self.interval) + 1
+
+        if self.freq == "WEEKLY":
+            days, skipped, anchor = self._weeks(dtstart)
+            week = timedelta(weeks=self.interval)
+            period, rest = divmod(limit - anchor, week)
+            within = sum(1 for day in days if timedelta(days=day) <= rest)
+            return period * len(days) + within - skipped
+
+        total = (limit.year - dtstart.year) * 12 + limit.month - dtstart.month
+        step = total // self.interval
+        start = self._month(dtstart, step)
+        if start is not None and start > limit:
+            step -= 1
+        months, valid = self._months(dtstart)
+        cycles, offset = divmod(step, months)
+        return cycles * len(valid) + bisect_right(valid, offset)
+
+    def _nth(self, dtstart: datetime, index: int) -> datetime:
+        if self.freq == "DAILY":
+            return dtstart + index * timedelta(days=self.interval)
+
+        if self.freq == "WEEKLY":
+            days, skipped, anchor = self._weeks(dtstart)
+            period, position = divmod(index + skipped, len(days))
+            week = timedelta(weeks=self.interval)
+            return anchor + period * week + timedelta(days=days[position])
+
+        months, valid = self._months(dtstart)
+        cycles, position = divmod(index, len(valid))
+        return self._month(dtstart, cycles * months + valid[position])
+
+    def _weeks(self, dtstart: datetime) -> Tuple[Tuple[int, ...], int, datetime]:
+        days = self.byday or (dtstart.weekday(),)
+        skipped = sum(1 for day in days if day < dtstart.weekday())
+        return days, skipped, dtstart - timedelta(days=dtstart.weekday())
+
+    def _months(self, dtstart: datetime) -> Tuple[int, List[int]]:
+        """Steps of INTERVAL months after which the months that have
+        DTSTART's day of month repeat, and those steps within one period."""
+        if dtstart.day <= 28:
+            return 1, [0]
+        months = CYCLE_MONTHS // gcd(self.interval, CYCLE_MONTHS)
+        valid = []
+        for step in range(months):
+            year, month = self._year_month(dtstart, step)
+            # Only the length of the month matters, and that repeats
+            if dtstart.day <= monthrange(2000 + (year - 2000) % 400, month)[1]:
+                valid.append(step)
+        return months, valid
+
+    def _month(self, dtstart: datetime, step: int) -> Optional[datetime]:
+        year, month = self._year_month(dtstart, step)
+        if dtstart.day > monthrange(year, month)[1]:
+            return None
+        return dtstart.replace(year=year, month=month)
+
+    def _year_month(self, dtstart: datetime, step: int) -> Tuple[int, int]:
+        total = dtstart.month - 1 + step * self.interval
+        return dtstart.year + total // 12, total % 12 + 1
+
+    def includes(self, dtstart: datetime, moment: datetime) -> bool:
+        moment = _utc(moment)
+        window_end = moment + timedelta(microseconds=1)
+        return next(self.between(dtstart, moment, window_end), None) == moment
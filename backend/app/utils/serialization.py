@@ -0,0 +1,101 @@
+"""Trusted-data fast path for list responses.
+
+Rows on the hot list endpoints come straight from our own database, already
+in the shape of the response schema. Re-validating every row (and every
+nested user's ``EmailStr``) only to dump it again dominates CPU on 100-row
+pages, so these endpoints project each row onto the schema's fields instead:
+unknown keys such as ``hashed_password`` are dropped, missing fields get
+their defaults, nested models are projected recursively, and the result is
+encoded with orjson. Set ``TRUSTED_RESPONSES=false`` to go back to full
+validation.
+"""
+import typing
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import PydanticUndefined
+
+from ..config import settings
+
+# (field name, nested model or None, is_list, default factory)
+_Field = Tuple[str, Optional[Type[BaseModel]], bool, Any]
+
+
+def _nested(annotation) -> Tuple[Optional[Type[BaseModel]], bool]:
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _nested(args[0]) if len(args) == 1 else (None, False)
+    if origin in (list, List):
+        model, _ = _nested(typing.get_args(annotation)[0])
+        return model, model is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def _plan(model: Type[BaseModel]) -> List[_Field]:
+    plan = []
+    for name, field in model.model_fields.items():
+        nested, is_list = _nested(field.annotation)
+        if field.default_factory is not None:
+            default = field.default_factory
+        elif field.default is PydanticUndefined:
+            default = None
+        else:
+            value = field.default
+            default = lambda value=value: value
+        plan.append((name, nested, is_list, default))
+    return plan
+
+
+def project(model: Type[BaseModel], data: Optional[Dict[str, Any]]):
+    """Shape ``data`` like ``model(**data).model_dump()`` without validating."""
+    if data is None:
+        return None
+    out = {}
+    for name, nested, is_list, default in _plan(model):
+        if name not in data:
+            out[name] = default() if default else None
+            continue
+        value = data[name]
+        if nested is not None and value is not None:
+            if is_list:
+                value = [project(nested, item) for item in value]
+            else:
+                value = project(nested, value)
+        out[name] = value
+    return out
+
+
+def model_response(
+    model: Type[BaseModel],
+    data: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None,
+) -> ORJSONResponse:
+    if settings.TRUSTED_RESPONSES:
+        content = project(model, data)
+    else:
+        content = model.model_validate(data).model_dump(mode="json")
+    return ORJSONResponse(content, headers=headers)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def list_response(
+    model: Type[BaseModel],
+    rows: Iterable[Dict[str, Any]],
+    headers: Optional[Dict[str, str]] = None,
+) -> ORJSONResponse:
+    if settings.TRUSTED_RESPONSES:
+        content = [project(model, row) for row in rows]
+    else:
+        adapter = _list_adapter(model)
+        content = adapter.dump_python(adapter.validate_python(list(rows)), mode="json")
+    return ORJSONResponse(content, headers=headers)
@@ -0,0 +1,68 @@
+"""Min-heap of timers keyed by id.
+
+``schedule`` on a key that already has a timer moves it, and ``cancel``
+drops it, both in O(log n): the old heap entry stays where it is, marked
+stale, and is discarded when it reaches the top. The heap is rebuilt once
+stale entries outnumber live ones, so heavy rescheduling cannot grow it
+without bound.
+"""
+import heapq
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+
+class TimerHeap:
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str]] = []
+        # key -> (due, seq) of its live heap entry
+        self._live: Dict[str, Tuple[float, int]] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._live
+
+    def due(self, key: str) -> Optional[float]:
+        entry = self._live.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key: str, due: float) -> None:
+        seq = next(self._seq)
+        self._live[key] = (due, seq)
+        heapq.heappush(self._heap, (due, seq, key))
+        self._compact()
+
+    def cancel(self, key: str) -> bool:
+        if self._live.pop(key, None) is None:
+            return False
+        self._compact()
+        return True
+
+    def next_due(self) -> Optional[float]:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[Tuple[str, float]]:
+        """Remove and return (key, due) for every timer due at ``now``."""
+        fired = []
+        while self.next_due() is not None and self._heap[0][0] <= now:
+            due, _, key = heapq.heappop(self._heap)
+            del self._live[key]
+            fired.append((key, due))
+        return fired
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._live.clear()
+
+    def _drop_stale(self) -> None:
+        heap = self._heap
+        while heap and self._live.get(heap[0][2], (None, None))[1] != heap[0][1]:
+            heapq.heappop(heap)
+
+    def _compact(self) -> None:
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._live):
+            self._heap = [(due, seq, key) for key, (due, seq) in self._live.items()]
+            heapq.heapify(self._heap)
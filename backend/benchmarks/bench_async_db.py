@@ -0,0 +1,112 @@
+"""Compare the blocking supabase client with the async PostgREST client.
+
+Starts the fake PostgREST server on localhost with an artificial round-trip
+latency and fires ``--concurrency`` simultaneous ``get_event``-style lookups
+from one event loop, first through the synchronous supabase ``Client`` (as the
+services used to) and then through ``app.db.AsyncClient``.
+
+    python -m benchmarks.bench_async_db --concurrency 50 --latency-ms 20
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import uvicorn
+
+from app.db import create_async_client
+from benchmarks.fake_postgrest import FakeStore, create_app
+
+FAKE_KEY = "bench.bench.bench"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(store: FakeStore) -> str:
+    port = _free_port()
+    config = uvicorn.Config(create_app(store), port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+def seed(store: FakeStore, count: int) -> list:
+    owner = store.seed("users", [{"email": "owner@example.com"}])[0]
+    start = datetime.now(timezone.utc)
+    rows = [
+        {
+            "title": f"Event {i}",
+            "start_time": (start + timedelta(hours=i)).isoformat(),
+            "end_time": (start + timedelta(hours=i + 1)).isoformat(),
+            "created_by": owner["id"],
+        }
+        for i in range(count)
+    ]
+    return [row["id"] for row in store.seed("events", rows)]
+
+
+def summarize(label: str, wall: float, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(
+        f"{label:<6} wall={wall * 1000:8.1f} ms  rps={len(latencies) / wall:8.1f}  "
+        f"p50={p(0.50):7.1f} ms  p99={p(0.99):7.1f} ms  "
+        f"mean={statistics.mean(latencies) * 1000:7.1f} ms"
+    )
+
+
+async def run_sync(url: str, ids: list) -> None:
+    from supabase import create_client
+
+    client = create_client(url, FAKE_KEY)
+
+    async def lookup(event_id):
+        started = time.perf_counter()
+        client.table("events").select("*").eq("id", event_id).maybe_single().execute()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(lookup(i) for i in ids))
+    summarize("sync", time.perf_counter() - started, latencies)
+
+
+async def run_async(url: str, ids: list) -> None:
+    client = create_async_client(url, FAKE_KEY)
+
+    async def lookup(event_id):
+        started = time.perf_counter()
+        await client.table("events").select("*").eq("id", event_id).maybe_single().execute()
+        return time.perf_counter() - started
+
+    await lookup(ids[0])  # open the pool before timing
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(lookup(i) for i in ids))
+    summarize("async", time.perf_counter() - started, latencies)
+    await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    store = FakeStore(latency=args.latency_ms / 1000)
+    ids = seed(store, args.concurrency)
+    url = start_server(store)
+    print(f"{args.concurrency} concurrent lookups, {args.latency_ms} ms round trip")
+    asyncio.run(run_sync(url, ids))
+    asyncio.run(run_async(url, ids))
+
+
+if __name__ == "__main__":
+    main()
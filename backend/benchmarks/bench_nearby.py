@@ -0,0 +1,201 @@
+"""Nearby-event queries over 1M synthetic events: bounding-box index vs scan.
+
+events_nearby (db/migrations/009_event_location.sql) narrows the search
+to the bounding box(es) of the circle through a GiST index, then computes
+exact distances for the candidates only. This benchmark reproduces that
+plan in memory, with a uniform grid standing in for the GiST index, and
+compares it with scanning every event. Results of both are checked to be
+identical.
+
+    python -m benchmarks.bench_nearby --events 1000000 --queries 200
+
+--emit-sql prints a script that loads the same kind of data into a real
+database and EXPLAIN ANALYZEs events_nearby, to confirm the index is used:
+
+    python -m benchmarks.bench_nearby --emit-sql | psql "$DATABASE_URL"
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from app.utils.geo import bounding_boxes, haversine_km
+
+# Events cluster around cities; the rest are spread over land and sea alike
+CITIES = 200
+CITY_SHARE = 0.9
+CITY_SPREAD_DEG = 0.3
+
+
+def synthesize(count: int, seed: int) -> Tuple[array, array, list]:
+    rng = random.Random(seed)
+    centres = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(CITIES)]
+    lats, lons = array("d"), array("d")
+    for _ in range(count):
+        if rng.random() < CITY_SHARE:
+            lat, lon = rng.choice(centres)
+            lat = max(-90.0, min(90.0, rng.gauss(lat, CITY_SPREAD_DEG)))
+            lon = (rng.gauss(lon, CITY_SPREAD_DEG) + 180.0) % 360.0 - 180.0
+        else:
+            lat = math.degrees(math.asin(rng.uniform(-1, 1)))
+            lon = rng.uniform(-180, 180)
+        lats.append(lat)
+        lons.append(lon)
+    return lats, lons, centres
+
+
+class GridIndex:
+    """Uniform lat/lon grid answering box queries, like the GiST <@ scan."""
+
+    def __init__(self, lats: array, lons: array, cell_deg: float):
+        self.lats, self.lons, self.cell = lats, lons, cell_deg
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i in range(len(lats)):
+            self.cells[self._key(lats[i], lons[i])].append(i)
+
+    def _key(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell)), int(math.floor(lon / self.cell))
+
+    def candidates(self, box) -> List[int]:
+        min_lon, min_lat, max_lon, max_lat = box
+        lat0, lon0 = self._key(min_lat, min_lon)
+        lat1, lon1 = self._key(max_lat, max_lon)
+        found = []
+        for y in range(lat0, lat1 + 1):
+            for x in range(lon0, lon1 + 1):
+                for i in self.cells.get((y, x), ()):
+                    lat, lon = self.lats[i], self.lons[i]
+                    if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
+                        found.append(i)
+        return found
+
+
+def nearby_indexed(index: GridIndex, lat, lon, radius_km, limit):
+    examined = 0
+    hits = []
+    for box in bounding_boxes(lat, lon, radius_km):
+        candidates = index.candidates(box)
+        examined += len(candidates)
+        for i in candidates:
+            distance = haversine_km(lat, lon, index.lats[i], index.lons[i])
+            if distance <= radius_km:
+                hits.append((distance, i))
+    hits.sort()
+    return hits[:limit], examined
+
+
+def nearby_scan(lats, lons, lat, lon, radius_km, limit):
+    hits = []
+    for i in range(len(lats)):
+        distance = haversine_km(lat, lon, lats[i], lons[i])
+        if distance <= radius_km:
+            hits.append((distance, i))
+    hits.sort()
+    return hits[:limit], len(lats)
+
+
+def _summary(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return (
+        f"p50={p(0.5):.2f}ms p95={p(0.95):.2f}ms p99={p(0.99):.2f}ms "
+        f"mean={statistics.mean(samples) * 1000:.2f}ms"
+    )
+
+
+EMIT_SQL = """\
+-- Synthetic events for events_nearby; run against a scratch database that
+-- already has at least one user to own them.
+begin;
+insert into events (title, start_time, end_time, created_by, latitude, longitude)
+select
+  'Synthetic event ' || g,
+  now() + (g % 365) * interval '1 day',
+  now() + (g % 365) * interval '1 day' + interval '2 hours',
+  (select id from users order by created_at limit 1),
+  greatest(-90, least(90, c.lat + (random() - 0.5) * 0.6)),
+  least(180, greatest(-180, c.lon + (random() - 0.5) * 0.6))
+from generate_series(1, {count}) g
+cross join lateral (
+  -- {cities} fixed city centres, picked round-robin
+  select -60 + 130 * ((g * 31) % {cities})::double precision / {cities} as lat,
+         -180 + 360 * ((g * 17) % {cities})::double precision / {cities} as lon
+) c;
+commit;
+
+analyze events;
+
+explain (analyze, buffers)
+select events_nearby(52.52, 13.405, 5);
+
+explain (analyze, buffers)
+select id from events
+where latitude is not null
+  and point(longitude, latitude) <@ box(point(13.33, 52.47), point(13.48, 52.57));
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=5)
+    parser.add_argument("--radius-km", type=float, default=5.0)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--cell-deg", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--emit-sql", action="store_true")
+    args = parser.parse_args()
+
+    if args.emit_sql:
+        print(EMIT_SQL.format(count=args.events, cities=CITIES))
+        return
+
+    started = time.perf_counter()
+    lats, lons, centres = synthesize(args.events, args.seed)
+    print(f"generated {len(lats)} events in {time.perf_counter() - started:.1f}s")
+    started = time.perf_counter()
+    index = GridIndex(lats, lons, args.cell_deg)
+    print(
+        f"built grid index ({len(index.cells)} cells of {args.cell_deg} deg) "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+    rng = random.Random(args.seed + 1)
+    points = []
+    for _ in range(args.queries):
+        lat, lon = rng.choice(centres)
+        points.append((lat + rng.uniform(-0.2, 0.2), lon + rng.uniform(-0.2, 0.2)))
+
+    timings, examined, results = [], [], []
+    for lat, lon in points:
+        started = time.perf_counter()
+        hits, seen = nearby_indexed(index, lat, lon, args.radius_km, args.limit)
+        timings.append(time.perf_counter() - started)
+        examined.append(seen)
+        results.append(hits)
+    print(
+        f"index  queries={len(points)} {_summary(timings)} "
+        f"rows_examined~{statistics.mean(examined):.0f} "
+        f"hits~{statistics.mean(len(r) for r in results):.1f}"
+    )
+
+    timings = []
+    for (lat, lon), expected in list(zip(points, results))[: args.scan_queries]:
+        started = time.perf_counter()
+        hits, seen = nearby_scan(lats, lons, lat, lon, args.radius_km, args.limit)
+        timings.append(time.perf_counter() - started)
+        if hits != expected:
+            raise SystemExit(f"index and scan disagree near ({lat}, {lon})")
+    print(
+        f"scan   queries={len(timings)} {_summary(timings)} "
+        f"rows_examined={len(lats)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
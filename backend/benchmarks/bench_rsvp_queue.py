@@ -0,0 +1,132 @@
+"""Sustained RSVP throughput: synchronous path versus the write-behind queue.
+
+``--clients`` attendees each keep one POST /rsvps/ in flight for
+``--duration`` seconds, spread over ``--events`` hot events, first with
+RSVP_INGEST_MODE=sync and then with queue. Requests/s and latency are what
+clients see; applied/s counts RSVPs written to the database until the
+queue has drained, so it is the throughput the system actually sustains.
+
+Besides the round-trip latency, the fake database models what limits RSVP
+writes on one event in Postgres: rsvp_apply holds the event's row lock
+until its transaction commits, so transactions on one event run one at a
+time, each paying ``--commit-ms`` plus ``--row-ms`` per RSVP.
+
+    python -m benchmarks.bench_rsvp_queue --clients 200 --duration 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.fake_postgrest import FakeStore
+from benchmarks.harness import Timer, api_client, build_app, seed_users
+
+
+def model_event_locks(store: FakeStore, commit: float, row: float) -> None:
+    locks = defaultdict(asyncio.Lock)
+    upsert, apply_batch = store.rpcs["rsvp_upsert"], store.rpcs["rsvp_apply_batch"]
+
+    async def locked(event_ids, rows):
+        # Locks taken in event_id order, as rsvp_apply_batch does
+        for event_id in sorted(event_ids):
+            await locks[event_id].acquire()
+        try:
+            await asyncio.sleep(commit + rows * row)
+        finally:
+            for event_id in event_ids:
+                locks[event_id].release()
+
+    async def rsvp_upsert(store, **params):
+        await locked({params["p_event_id"]}, 1)
+        return upsert(store, **params)
+
+    async def rsvp_apply_batch(store, p_rsvps):
+        await locked({item["event_id"] for item in p_rsvps}, len(p_rsvps))
+        return apply_batch(store, p_rsvps)
+
+    store.register_rpc("rsvp_upsert", rsvp_upsert)
+    store.register_rpc("rsvp_apply_batch", rsvp_apply_batch)
+
+
+async def run(mode: str, args) -> None:
+    from app.services import rate_limit, rsvp_queue
+
+    store = FakeStore(latency=args.latency_ms / 1000)
+    model_event_locks(store, args.commit_ms / 1000, args.row_ms / 1000)
+    app = build_app(store)
+    rate_limit.limiter.enabled = False
+    queue = rsvp_queue.queue
+    queue.enabled = mode == "queue"
+    queue.path = os.path.join(tempfile.mkdtemp(), "rsvp_queue.db")
+
+    (owner, _), *attendees = seed_users(store, args.clients + 1)
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    events = store.seed(
+        "events",
+        [
+            {
+                "title": f"Hot event {i}",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=2)).isoformat(),
+                "created_by": owner["id"],
+            }
+            for i in range(args.events)
+        ],
+    )
+    statuses = ("going", "maybe", "not_going")
+    timer = Timer()
+    errors = 0
+    async with api_client(app) as client:
+
+        async def attendee(n, headers):
+            nonlocal errors
+            i = n
+            while time.perf_counter() < deadline:
+                body = {
+                    "event_id": events[i % len(events)]["id"],
+                    "status": statuses[i % len(statuses)],
+                }
+                response = await timer.time(
+                    client.post("/api/v1/rsvps/", json=body, headers=headers)
+                )
+                errors += response.status_code not in (201, 202)
+                i += 1
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(attendee(n, h) for n, (_, h) in enumerate(attendees)))
+        wall = time.perf_counter() - started
+        if queue.enabled:
+            while await queue._run(queue.journal.pending):
+                await asyncio.sleep(0.01)
+            drained = time.perf_counter() - started
+            await queue.stop()
+        else:
+            drained = wall
+
+    applied = len(timer.samples) - errors
+    print(f"{mode:<6} {timer.summary(wall)} errors={errors}")
+    print(
+        f"{'':<6} applied={applied} in {drained:.3f}s "
+        f"applied/s={applied / drained:.1f} db calls={store.calls}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--events", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--commit-ms", type=float, default=2.0)
+    parser.add_argument("--row-ms", type=float, default=0.05)
+    args = parser.parse_args()
+    for mode in ("sync", "queue"):
+        asyncio.run(run(mode, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Per-page serialization cost: FastAPI's validating path vs the trusted path.
+
+Builds pages of raw rows shaped like the PostgREST responses behind
+list_events, list_event_rsvps and list_my_rsvps, then times turning one
+page into JSON bytes both ways:
+
+  validated  TypeAdapter(List[Model]).validate_python + dump_python(mode="json")
+             + json.dumps, which is what FastAPI does for a response_model
+  trusted    app.utils.serialization.project + orjson, as list_response does
+
+    python -m benchmarks.bench_serialization --rows 100 --repeat 200
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import orjson
+
+import benchmarks.harness  # noqa: F401  (sets the env app.config needs)
+from app.schemas.event import EventResponse
+from app.schemas.rsvp import RSVPResponse
+from app.utils.serialization import _list_adapter, project
+
+
+def _stamp(offset: int = 0) -> str:
+    moment = datetime(2030, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=offset)
+    return moment.isoformat()
+
+
+def _user(i: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "email": f"user{i}@example.com",
+        "full_name": f"User {i}",
+        "hashed_password": "$2b$12$" + "x" * 53,
+        "is_active": True,
+        "created_at": _stamp(),
+        "updated_at": _stamp(),
+    }
+
+
+def _event(i: int, creator: dict = None) -> dict:
+    event = {
+        "id": str(uuid.uuid4()),
+        "title": f"Event {i}",
+        "description": "A community meetup " * 4,
+        "location": "Main hall",
+        "start_time": _stamp(i * 60),
+        "end_time": _stamp(i * 60 + 90),
+        "is_public": True,
+        "category": "meetup",
+        "max_attendees": 100,
+        "created_by": str(uuid.uuid4()),
+        "created_at": _stamp(),
+        "updated_at": _stamp(),
+        "rsvp_counts": {"going": 40, "maybe": 5, "not_going": 2, "waitlisted": 0},
+        "attendees_count": 40,
+        "current_user_rsvp": "going",
+    }
+    if creator is not None:
+        event["creator"] = creator
+    return event
+
+
+def _rsvp(i: int, **embeds) -> dict:
+    return dict(
+        {
+            "id": str(uuid.uuid4()),
+            "event_id": str(uuid.uuid4()),
+            "user_id": str(uuid.uuid4()),
+            "status": "going",
+            "waitlist_position": None,
+            "created_at": _stamp(i),
+            "updated_at": _stamp(i),
+        },
+        **embeds,
+    )
+
+
+def pages(rows: int) -> dict:
+    return {
+        "list_events": (EventResponse, [_event(i) for i in range(rows)]),
+        "list_event_rsvps": (
+            RSVPResponse,
+            [_rsvp(i, user=_user(i)) for i in range(rows)],
+        ),
+        "list_my_rsvps": (
+            RSVPResponse,
+            [_rsvp(i, event=_event(i, creator=_user(i))) for i in range(rows)],
+        ),
+    }
+
+
+def validated(model, rows: List[dict]) -> bytes:
+    adapter = _list_adapter(model)
+    content = adapter.dump_python(adapter.validate_python(rows), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def trusted(model, rows: List[dict]) -> bytes:
+    return orjson.dumps([project(model, row) for row in rows])
+
+
+def bench(fn, model, rows, repeat: int) -> float:
+    fn(model, rows)  # warm up adapters and projection plans
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(model, rows)
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<18} {'validated_ms':>13} {'trusted_ms':>11} {'speedup':>8}")
+    for name, (model, rows) in pages(args.rows).items():
+        slow = bench(validated, model, rows, args.repeat)
+        fast = bench(trusted, model, rows, args.repeat)
+        print(
+            f"{name:<18} {slow * 1000:>13.3f} {fast * 1000:>11.3f} "
+            f"{slow / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
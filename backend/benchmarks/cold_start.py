@@ -0,0 +1,121 @@
+"""Measure cold start: a fresh process from spawn to its first response.
+
+Starts the fake PostgREST server on localhost, then ``--runs`` times spawns
+a new interpreter that imports ``app.main``, runs the lifespan startup (which
+warms the database pool over real TCP) and serves two requests through the
+ASGI app. Reports the median of each phase:
+
+    python -m benchmarks.cold_start --runs 5 --latency-ms 20
+
+``boot`` is interpreter start-up up to the first app import, ``import`` is
+``import app.main``, ``warmup`` is the pool warm-up in the lifespan, and
+``first``/``second`` are the first two requests, so the difference between
+them is what the warm-up did not cover.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.bench_async_db import FAKE_KEY, start_server
+from benchmarks.fake_postgrest import FakeStore
+
+CHILD = """
+import asyncio, json, sys, time
+from datetime import timedelta
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+import httpx
+from app.services.auth import create_access_token
+
+async def main():
+    asgi = app.main.app
+    async with asgi.router.lifespan_context(asgi):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=asgi)
+        headers = {"Authorization": "Bearer " + create_access_token(
+            {"sub": "owner@example.com"}, timedelta(minutes=5)
+        )}
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://c", headers=headers
+        ) as c:
+            t = time.perf_counter()
+            first = await c.get("/api/v1/events/", params={"limit": 5})
+            first_s = time.perf_counter() - t
+            t = time.perf_counter()
+            await c.get("/api/v1/events/", params={"limit": 5})
+            second_s = time.perf_counter() - t
+    print(json.dumps({
+        "import": imported - started,
+        "warmup": ready - imported,
+        "first": first_s,
+        "second": second_s,
+        "status": first.status_code,
+    }))
+
+asyncio.run(main())
+"""
+
+PHASES = ("boot", "import", "warmup", "first", "second", "total")
+
+
+def run_once(env: dict) -> dict:
+    spawned = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = time.perf_counter() - spawned
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["total"] = total
+    result["boot"] = total - sum(result[p] for p in PHASES[1:5])
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    store = FakeStore(latency=args.latency_ms / 1000)
+    (owner,) = store.seed("users", [{"email": "owner@example.com"}])
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    store.seed(
+        "events",
+        [
+            {
+                "title": f"Event {i}",
+                "start_time": (start + timedelta(hours=i)).isoformat(),
+                "end_time": (start + timedelta(hours=i + 2)).isoformat(),
+                "created_by": owner["id"],
+            }
+            for i in range(20)
+        ],
+    )
+    env = dict(
+        os.environ,
+        SUPABASE_URL=start_server(store),
+        SUPABASE_KEY=FAKE_KEY,
+        SUPABASE_JWT_SECRET="benchmark-secret",
+    )
+
+    runs = [run_once(env) for _ in range(args.runs)]
+    statuses = {run.pop("status") for run in runs}
+    print(f"cold start over {args.runs} runs, {args.latency_ms:.0f} ms db latency")
+    for phase in PHASES:
+        median = statistics.median(run[phase] for run in runs)
+        print(f"  {phase:<7} {median * 1000:8.1f} ms")
+    print(f"  first response status: {sorted(statuses)}")
+
+
+if __name__ == "__main__":
+    main()
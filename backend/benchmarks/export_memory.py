@@ -0,0 +1,158 @@
+"""Peak RSS of the attendee list endpoint vs the streaming export.
+
+Each (endpoint, size) pair runs in a fresh interpreter, because peak RSS
+(``ru_maxrss``) only ever grows within a process. The reported figure is
+how much the peak rose while serving the one request, after the fake
+store was seeded. The response body is drained and discarded by a bare
+ASGI driver, so the client never buffers it. Export totals include the
+fake store scanning and sorting the whole table for every page; against
+Postgres each page is an index seek on idx_rsvps_event_created.
+
+    python -m benchmarks.export_memory --sizes 1000 5000 20000
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from benchmarks.fake_postgrest import FakeStore
+from benchmarks.harness import build_app, seed_users
+
+MODES = {
+    "list": "/api/v1/rsvps/event/{event_id}",
+    "ndjson": "/api/v1/rsvps/event/{event_id}/export?format=ndjson",
+    "csv": "/api/v1/rsvps/event/{event_id}/export?format=csv",
+}
+
+
+def _peak_rss_mb() -> float:
+    # Linux reports kilobytes, macOS bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def drive(app, url: str, headers: dict) -> dict:
+    """Serve one GET through ``app`` and count the body without keeping it."""
+    parts = urlsplit(url)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "server": ("bench.local", 80),
+        "client": ("127.0.0.1", 1),
+    }
+    sent_request = False
+    never = asyncio.Event()
+    stats = {"status": None, "bytes": 0, "ttfb": None}
+    started = time.perf_counter()
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await never.wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            if stats["ttfb"] is None and message.get("body"):
+                stats["ttfb"] = time.perf_counter() - started
+            stats["bytes"] += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    stats["total"] = time.perf_counter() - started
+    return stats
+
+
+async def measure(mode: str, size: int) -> dict:
+    store = FakeStore()
+    app = build_app(store)
+    (owner, owner_headers), *_ = seed_users(store, 1, prefix="owner")
+    start = datetime.now(timezone.utc) + timedelta(days=30)
+    event = store.seed(
+        "events",
+        [
+            {
+                "title": "Conference",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=8)).isoformat(),
+                "created_by": owner["id"],
+            }
+        ],
+    )[0]
+    attendees = store.seed(
+        "users",
+        [
+            {"email": f"attendee{i}@example.com", "full_name": f"Attendee {i}"}
+            for i in range(size)
+        ],
+    )
+    store.seed(
+        "rsvps",
+        [
+            {"event_id": event["id"], "user_id": user["id"], "status": "going"}
+            for user in attendees
+        ],
+    )
+
+    baseline = _peak_rss_mb()
+    stats = await drive(app, MODES[mode].format(event_id=event["id"]), owner_headers)
+    stats.update(mode=mode, size=size, peak_rss_delta_mb=_peak_rss_mb() - baseline)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument(
+        "--child", nargs=2, metavar=("MODE", "SIZE"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.child:
+        mode, size = args.child
+        print(json.dumps(asyncio.run(measure(mode, int(size)))))
+        return
+
+    print(f"{'size':>7} {'mode':>7} {'status':>6} {'peak_rss+MB':>12} "
+          f"{'ttfb_ms':>9} {'total_ms':>9} {'bytes':>11}")
+    for size in args.sizes:
+        for mode in args.modes:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.export_memory",
+                    "--child",
+                    mode,
+                    str(size),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            row = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{row['size']:>7} {row['mode']:>7} {row['status']:>6} "
+                f"{row['peak_rss_delta_mb']:>12.1f} {(row['ttfb'] or 0) * 1000:>9.1f} "
+                f"{row['total'] * 1000:>9.1f} {row['bytes']:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
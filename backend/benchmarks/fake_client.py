@@ -0,0 +1,43 @@
+"""In-process PostgREST client over a FakeStore, with no HTTP in between.
+
+``FakeClient`` is an ``app.db.AsyncClient`` whose ``send`` hands each
+request straight to ``FakeStore.execute``, so the full
+``table().select().eq().range().execute()`` chain the services build is
+exercised without sockets or ASGI. Bodies and results still round-trip
+through JSON as they would on the wire, so callers never share rows with
+the store. Round-trip latency is the store's (``FakeStore(latency=...)``).
+"""
+import json
+
+from app.db import APIError, AsyncClient
+from app.db.postgrest import APIResponse, Request
+from app.db.stats import record_query
+
+
+class FakeClient(AsyncClient):
+    def __init__(self, store):
+        # No httpx pool: requests never leave the process
+        self.store = store
+        self.rest_url = "fake://rest/v1"
+
+    async def send(self, request: Request) -> APIResponse:
+        record_query()
+        body = None
+        if request.body is not None:
+            body = json.loads(json.dumps(request.body, default=str))
+        status, data, count = await self.store.execute(
+            request.method,
+            request.path,
+            list(request.params),
+            dict(request.headers),
+            body,
+        )
+        data = json.loads(json.dumps(data)) if data is not None else None
+        if status >= 400:
+            error = data if isinstance(data, dict) else {"message": str(data)}
+            error.setdefault("code", str(status))
+            raise APIError(error)
+        return APIResponse(data, count)
+
+    async def aclose(self) -> None:
+        pass
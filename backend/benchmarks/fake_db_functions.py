@@ -0,0 +1,551 @@
+"""Python stand-ins for the triggers and functions in db/migrations.
+
+Each one mirrors the SQL it is named after closely enough for the fake
+PostgREST store to answer the services' queries the way Postgres would.
+"""
+import re
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from app.utils.geo import bounding_boxes, haversine_km, in_box
+
+from .fake_postgrest import FakeError, calendar_versions, now_iso
+
+STATUSES = ("going", "maybe", "not_going", "waitlisted")
+
+
+def _counts_row(store, event_id):
+    row = store.lookup("event_rsvp_counts", ("event_id",), (event_id,))
+    if row is not None:
+        return row
+    return store.seed("event_rsvp_counts", [{"event_id": event_id}])[0]
+
+
+# 003_event_rsvp_counts.sql: create_event_rsvp_counts()
+def create_event_rsvp_counts(store, op, old, new):
+    if op == "INSERT":
+        _counts_row(store, new["id"])
+
+
+# 005_rsvp_waitlist.sql: apply_rsvp_count_delta()
+def apply_rsvp_count_delta(store, op, old, new):
+    if old is not None:
+        counts = _counts_row(store, old["event_id"])
+        if old["status"] in STATUSES:
+            counts[old["status"]] -= 1
+        counts["updated_at"] = now_iso()
+    if new is not None:
+        counts = _counts_row(store, new["event_id"])
+        if new["status"] in STATUSES:
+            counts[new["status"]] += 1
+        counts["updated_at"] = now_iso()
+
+
+def _event(store, event_id):
+    return store.lookup("events", ("id",), (event_id,))
+
+
+def _update_rsvp(store, rsvp, **changes):
+    old = dict(rsvp)
+    rsvp.update(changes)
+    rsvp["updated_at"] = now_iso()
+    store.fire("rsvps", "UPDATE", old, rsvp)
+
+
+def _with_counts(store, event, **extra):
+    counts = _counts_row(store, event["id"])
+    return dict(
+        event, rsvp_counts={status: counts[status] for status in STATUSES}, **extra
+    )
+
+
+# The stand-ins below run without awaiting, so each is atomic with respect
+# to other requests on the fake's event loop, like the event row lock.
+
+
+# 005_rsvp_waitlist.sql: promote_waitlist()
+def promote_waitlist(store, p_event_id):
+    event = _event(store, p_event_id)
+    if event is None:
+        return 0
+    capacity = event.get("max_attendees")
+    promoted = 0
+    while capacity is None or _counts_row(store, p_event_id)["going"] < capacity:
+        waiting = [
+            r
+            for r in store.tables["rsvps"]
+            if r["event_id"] == p_event_id and r["status"] == "waitlisted"
+        ]
+        if not waiting:
+            break
+        head = min(waiting, key=lambda r: r["waitlist_position"])
+        _update_rsvp(store, head, status="going", waitlist_position=None)
+        promoted += 1
+    return promoted
+
+
+# 005_rsvp_waitlist.sql: rsvps_promote_waitlist()
+def rsvps_promote_waitlist(store, op, old, new):
+    if old is not None and old["status"] == "going":
+        if new is None or new["status"] != "going":
+            promote_waitlist(store, old["event_id"])
+
+
+# 005_rsvp_waitlist.sql: events_promote_waitlist()
+def events_promote_waitlist(store, op, old, new):
+    if op == "UPDATE" and old.get("max_attendees") != new.get("max_attendees"):
+        promote_waitlist(store, new["id"])
+
+
+# 006_rsvp_bulk.sql: rsvp_apply(), also the body of rsvp_upsert()
+def rsvp_upsert(store, p_event_id, p_user_id, p_status):
+    event = _event(store, p_event_id)
+    if event is None:
+        raise FakeError(404, "PT404", "event not found")
+    existing = store.lookup("rsvps", ("event_id", "user_id"), (p_event_id, p_user_id))
+    previous = existing["status"] if existing else None
+    position = existing["waitlist_position"] if existing else None
+    status = p_status
+    capacity = event.get("max_attendees")
+    if p_status == "going" and capacity is not None:
+        if previous == "waitlisted":
+            status = "waitlisted"
+        elif previous != "going":
+            counts = _counts_row(store, p_event_id)
+            if counts["going"] >= capacity:
+                position = counts["next_waitlist_position"]
+                counts["next_waitlist_position"] += 1
+                status = "waitlisted"
+    if status != "waitlisted":
+        position = None
+    if existing is None:
+        row = {
+            "event_id": p_event_id,
+            "user_id": p_user_id,
+            "status": status,
+            "waitlist_position": position,
+        }
+        return dict(store.seed("rsvps", [row])[0])
+    _update_rsvp(store, existing, status=status, waitlist_position=position)
+    return dict(existing)
+
+
+# 006_rsvp_bulk.sql: rsvp_upsert_many()
+def rsvp_upsert_many(store, p_organizer_id, p_rsvps):
+    results = []
+    indexed = sorted(enumerate(p_rsvps), key=lambda item: item[1]["event_id"])
+    for index, item in indexed:
+        try:
+            event = _event(store, item["event_id"])
+            if event is None:
+                raise FakeError(404, "PT404", "event not found")
+            if event["created_by"] != p_organizer_id:
+                raise FakeError(403, "PT403", "not the event organizer")
+            rsvp = rsvp_upsert(
+                store, item["event_id"], item["user_id"], item["status"]
+            )
+            results.append({"index": index, "rsvp": rsvp})
+        except FakeError as exc:
+            error = exc.body
+            results.append(
+                {"index": index, "code": error["code"], "message": error["message"]}
+            )
+    return results
+
+
+# 012_rsvp_ingest.sql: rsvp_apply_batch()
+def rsvp_apply_batch(store, p_rsvps):
+    results = []
+    indexed = sorted(enumerate(p_rsvps), key=lambda item: item[1]["event_id"])
+    for index, item in indexed:
+        try:
+            rsvp = rsvp_upsert(
+                store, item["event_id"], item["user_id"], item["status"]
+            )
+            results.append({"index": index, "rsvp": rsvp})
+        except FakeError as exc:
+            error = exc.body
+            results.append(
+                {"index": index, "code": error["code"], "message": error["message"]}
+            )
+    return results
+
+
+# 005_rsvp_waitlist.sql: rsvp_cancel()
+def rsvp_cancel(store, p_rsvp_id, p_user_id):
+    rsvp = store.lookup("rsvps", ("id",), (p_rsvp_id,))
+    if rsvp is None:
+        raise FakeError(404, "PT404", "rsvp not found")
+    if rsvp["user_id"] != p_user_id:
+        raise FakeError(403, "PT403", "not your rsvp")
+    store.remove("rsvps", [rsvp])
+    store.fire("rsvps", "DELETE", rsvp, None)
+    return dict(rsvp)
+
+
+# 008_event_search.sql: search_events(). Plain word matching stands in for
+# websearch_to_tsquery; setweight A/B/C become ts_rank_cd's 1.0/0.4/0.2.
+SEARCH_WEIGHTS = (
+    ("title", 1.0),
+    ("category", 0.4),
+    ("location", 0.4),
+    ("description", 0.2),
+)
+
+
+def _words(text):
+    return set(re.findall(r"\w+", (text or "").lower()))
+
+
+def search_events(
+    store,
+    p_query=None,
+    p_category=None,
+    p_from=None,
+    p_to=None,
+    p_user_id=None,
+    p_limit=20,
+    p_offset=0,
+):
+    terms = _words(p_query)
+    matched = []
+    for event in store.tables["events"]:
+        if not (event.get("is_public") or event.get("created_by") == p_user_id):
+            continue
+        if p_from and event["start_time"] < p_from:
+            continue
+        if p_to and event["start_time"] >= p_to:
+            continue
+        rank = 0.0
+        if terms:
+            fields = [
+                (_words(event.get(column)), weight) for column, weight in SEARCH_WEIGHTS
+            ]
+            if not all(any(term in words for words, _ in fields) for term in terms):
+                continue
+            rank = sum(
+                weight for term in terms for words, weight in fields if term in words
+            )
+        matched.append((rank, event))
+
+    facets = Counter(event.get("category") for _, event in matched)
+    filtered = [
+        (rank, event)
+        for rank, event in matched
+        if p_category is None or event.get("category") == p_category
+    ]
+    filtered.sort(key=lambda item: (-item[0], item[1]["start_time"], item[1]["id"]))
+    return {
+        "total": len(filtered),
+        "results": [
+            _with_counts(store, event, rank=rank)
+            for rank, event in filtered[p_offset : p_offset + p_limit]
+        ],
+        "facets": [
+            {"category": category, "count": count}
+            for category, count in sorted(
+                facets.items(), key=lambda item: (-item[1], item[0] or "")
+            )
+        ],
+    }
+
+
+# 009_event_location.sql: events_nearby(). A scan with the same box test
+# stands in for the GiST index.
+def events_nearby(
+    store, p_lat, p_lon, p_radius_km, p_user_id=None, p_from=None, p_limit=50
+):
+    boxes = bounding_boxes(p_lat, p_lon, p_radius_km)
+    nearby = []
+    for event in store.tables["events"]:
+        lat, lon = event.get("latitude"), event.get("longitude")
+        if lat is None or not any(in_box(lat, lon, box) for box in boxes):
+            continue
+        if not (event.get("is_public") or event.get("created_by") == p_user_id):
+            continue
+        if p_from and event["start_time"] < p_from:
+            continue
+        distance = haversine_km(p_lat, p_lon, lat, lon)
+        if distance <= p_radius_km:
+            nearby.append((distance, event))
+    nearby.sort(key=lambda item: (item[0], item[1]["start_time"], item[1]["id"]))
+    return [
+        _with_counts(store, event, distance_km=distance)
+        for distance, event in nearby[:p_limit]
+    ]
+
+
+def _instant(value):
+    moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _in_window(row, p_series_ids, p_from, p_to):
+    return (
+        row["series_id"] in p_series_ids
+        and _instant(p_from) <= _instant(row["occurrence_start"]) < _instant(p_to)
+    )
+
+
+# 010_event_series.sql: series_window()
+def series_window(store, p_series_ids, p_from, p_to, p_user_id=None):
+    p_series_ids = set(p_series_ids)
+    rsvps = [
+        r
+        for r in store.tables["series_rsvps"]
+        if _in_window(r, p_series_ids, p_from, p_to)
+    ]
+    counts = {}
+    for r in rsvps:
+        key = (r["series_id"], r["occurrence_start"])
+        row = counts.setdefault(
+            key,
+            {
+                "series_id": key[0],
+                "occurrence_start": key[1],
+                "going": 0,
+                "maybe": 0,
+                "not_going": 0,
+            },
+        )
+        row[r["status"]] += 1
+    return {
+        "exceptions": [
+            dict(x)
+            for x in store.tables["event_series_exceptions"]
+            if _in_window(x, p_series_ids, p_from, p_to)
+        ],
+        "counts": list(counts.values()),
+        "mine": [
+            {k: r[k] for k in ("series_id", "occurrence_start", "status")}
+            for r in rsvps
+            if r["user_id"] == p_user_id
+        ],
+    }
+
+
+# 010_event_series.sql: series_rsvp_upsert()
+def series_rsvp_upsert(store, p_series_id, p_occurrence_start, p_user_id, p_status):
+    series = store.lookup("event_series", ("id",), (p_series_id,))
+    if series is None:
+        raise FakeError(404, "PT404", "series not found")
+    occurrence = (p_series_id, p_occurrence_start)
+    exception = store.lookup(
+        "event_series_exceptions", ("series_id", "occurrence_start"), occurrence
+    )
+    if exception and exception["cancelled"]:
+        raise FakeError(404, "PT404", "occurrence is cancelled")
+    existing = store.lookup(
+        "series_rsvps",
+        ("series_id", "occurrence_start", "user_id"),
+        occurrence + (p_user_id,),
+    )
+    capacity = series.get("max_attendees")
+    if p_status == "going" and capacity is not None:
+        if existing is None or existing["status"] != "going":
+            going = sum(
+                1
+                for r in store.tables["series_rsvps"]
+                if (r["series_id"], r["occurrence_start"]) == occurrence
+                and r["status"] == "going"
+            )
+            if going >= capacity:
+                raise FakeError(409, "PT409", "occurrence is full")
+    if existing is None:
+        row = {
+            "series_id": p_series_id,
+            "occurrence_start": p_occurrence_start,
+            "user_id": p_user_id,
+            "status": p_status,
+        }
+        return dict(store.seed("series_rsvps", [row])[0])
+    existing.update(status=p_status, updated_at=now_iso())
+    return dict(existing)
+
+
+# 011_calendar_sync.sql: touch_calendar()
+def touch_calendar(store, user_id):
+    feed = store.lookup("calendar_feeds", ("user_id",), (user_id,))
+    if feed is None:
+        store.seed("calendar_feeds", [{"user_id": user_id}])
+    else:
+        feed.update(version=next(calendar_versions), changed_at=now_iso())
+
+
+# 011_calendar_sync.sql: rsvps_touch_calendar()
+def rsvps_touch_calendar(store, op, old, new):
+    if op == "DELETE":
+        key = (old["user_id"], old["event_id"])
+        tombstone = store.lookup("calendar_tombstones", ("user_id", "event_id"), key)
+        if tombstone is None:
+            row = {"user_id": key[0], "event_id": key[1], "rsvp_id": old["id"]}
+            store.seed("calendar_tombstones", [row])
+        else:
+            tombstone.update(rsvp_id=old["id"], deleted_at=now_iso())
+        touch_calendar(store, old["user_id"])
+        return
+    if op == "INSERT":
+        key = (new["user_id"], new["event_id"])
+        tombstone = store.lookup("calendar_tombstones", ("user_id", "event_id"), key)
+        if tombstone is not None:
+            store.remove("calendar_tombstones", [tombstone])
+    touch_calendar(store, new["user_id"])
+
+
+CALENDAR_FIELDS = ("title", "description", "location", "start_time", "end_time")
+
+
+# 011_calendar_sync.sql: events_touch_calendars()
+def events_touch_calendars(store, op, old, new):
+    if op != "UPDATE" or all(old.get(f) == new.get(f) for f in CALENDAR_FIELDS):
+        return
+    for rsvp in store.tables["rsvps"]:
+        if rsvp["event_id"] == new["id"]:
+            touch_calendar(store, rsvp["user_id"])
+
+
+# 011_calendar_sync.sql: calendar_entries()
+def calendar_entries(store, user_id, since=None):
+    entries = []
+    for r in store.tables["rsvps"]:
+        if r["user_id"] != user_id:
+            continue
+        e = _event(store, r["event_id"])
+        changed = max(_instant(r["updated_at"]), _instant(e["updated_at"]))
+        if since is not None and changed <= since:
+            continue
+        entries.append(
+            {
+                "rsvp_id": r["id"],
+                "status": r["status"],
+                "event_id": e["id"],
+                **{f: e.get(f) for f in CALENDAR_FIELDS},
+                "updated_at": changed.isoformat(),
+            }
+        )
+    entries.sort(key=lambda x: (_instant(x["start_time"]), x["event_id"]))
+    return entries
+
+
+# 011_calendar_sync.sql: calendar_feed()
+def calendar_feed(store, p_token_hash, p_version=None, p_modified_since=None):
+    feed = store.lookup("calendar_feeds", ("token_hash",), (p_token_hash,))
+    if feed is None or p_token_hash is None:
+        return None
+    state = {"version": feed["version"], "changed_at": feed["changed_at"]}
+    changed = _instant(feed["changed_at"]).replace(microsecond=0)
+    if feed["version"] == p_version or (
+        p_modified_since is not None and changed <= _instant(p_modified_since)
+    ):
+        return dict(state, modified=False)
+    entries = [
+        x
+        for x in calendar_entries(store, feed["user_id"])
+        if x["status"] != "not_going"
+    ]
+    return dict(state, modified=True, entries=entries)
+
+
+# 011_calendar_sync.sql: calendar_changes()
+def calendar_changes(
+    store, p_user_id, p_since=None, p_version=None, p_retention_days=30
+):
+    feed = store.lookup("calendar_feeds", ("user_id",), (p_user_id,))
+    version = feed["version"] if feed else 0
+    now = datetime.now(timezone.utc)
+    if p_since is not None and version == p_version:
+        return {"version": version, "as_of": now.isoformat(), "modified": False}
+    since = None
+    if p_since is not None:
+        if _instant(p_since) < now - timedelta(days=p_retention_days):
+            raise FakeError(410, "PT410", "sync token expired")
+        since = _instant(p_since) - timedelta(seconds=5)
+    tombstones = [
+        t for t in store.tables["calendar_tombstones"] if t["user_id"] == p_user_id
+    ]
+    store.remove(
+        "calendar_tombstones",
+        [
+            t
+            for t in tombstones
+            if _instant(t["deleted_at"]) < now - timedelta(days=p_retention_days)
+        ],
+    )
+    deleted = [
+        {k: t[k] for k in ("rsvp_id", "event_id", "deleted_at")}
+        for t in sorted(tombstones, key=lambda t: _instant(t["deleted_at"]))
+        if since is not None and _instant(t["deleted_at"]) > since
+    ]
+    return {
+        "version": version,
+        "as_of": now.isoformat(),
+        "modified": True,
+        "entries": calendar_entries(store, p_user_id, since),
+        "deleted": deleted,
+    }
+
+
+# 013_rsvp_conflicts.sql: rsvp_conflicts()
+def rsvp_conflicts(store, p_user_id, p_event_id=None):
+    def key(event):
+        return (_instant(event["start_time"]), event["id"])
+
+    def overlaps(a, b):
+        return _instant(a["start_time"]) < _instant(b["end_time"]) and _instant(
+            b["start_time"]
+        ) < _instant(a["end_time"])
+
+    def pair(event, other):
+        row = {
+            field: event[field] for field in ("title", "start_time", "end_time")
+        }
+        row["event_id"] = event["id"]
+        row["conflict_id"] = other["id"]
+        for field in ("title", "start_time", "end_time"):
+            row[f"conflict_{field}"] = other[field]
+        return row
+
+    schedule = sorted(
+        (
+            _event(store, rsvp["event_id"])
+            for rsvp in store.tables["rsvps"]
+            if rsvp["user_id"] == p_user_id and rsvp["status"] == "going"
+        ),
+        key=key,
+    )
+    if p_event_id is not None:
+        event = _event(store, p_event_id)
+        if event is None:
+            raise FakeError(404, "PT404", "event not found")
+        return [
+            pair(event, other)
+            for other in schedule
+            if other["id"] != event["id"] and overlaps(event, other)
+        ]
+    return [
+        pair(event, other)
+        for i, event in enumerate(schedule)
+        for other in schedule[i + 1 :]
+        if overlaps(event, other)
+    ]
+
+
+def install(store) -> None:
+    store.register_trigger("events", create_event_rsvp_counts)
+    store.register_trigger("rsvps", apply_rsvp_count_delta)
+    store.register_trigger("rsvps", rsvps_promote_waitlist)
+    store.register_trigger("events", events_promote_waitlist)
+    store.register_trigger("rsvps", rsvps_touch_calendar)
+    store.register_trigger("events", events_touch_calendars)
+    store.register_rpc("rsvp_upsert", rsvp_upsert)
+    store.register_rpc("rsvp_upsert_many", rsvp_upsert_many)
+    store.register_rpc("rsvp_apply_batch", rsvp_apply_batch)
+    store.register_rpc("rsvp_conflicts", rsvp_conflicts)
+    store.register_rpc("rsvp_cancel", rsvp_cancel)
+    store.register_rpc("promote_waitlist", promote_waitlist)
+    store.register_rpc("search_events", search_events)
+    store.register_rpc("events_nearby", events_nearby)
+    store.register_rpc("series_window", series_window)
+    store.register_rpc("series_rsvp_upsert", series_rsvp_upsert)
+    store.register_rpc("calendar_feed", calendar_feed)
+    store.register_rpc("calendar_changes", calendar_changes)
@@ -0,0 +1,569 @@
+"""In-memory stand-in for Supabase's PostgREST endpoint.
+
+Implements the subset of PostgREST the services use (filters, ``or``/``and``
+trees, ordering, ranges, resource embedding, upserts, counts and RPC) over
+plain Python lists, with a configurable artificial round-trip latency.  It
+can be used in-process through ``httpx.ASGITransport`` or served over real
+HTTP so the synchronous supabase client can be benchmarked against it too:
+
+    python -m benchmarks.fake_postgrest --port 54321 --latency-ms 20
+"""
+import argparse
+import asyncio
+import fnmatch
+import functools
+import itertools
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from app.db.query import Embed, Filter, Logic, parse_order, parse_params, parse_select
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# calendar_version_seq
+calendar_versions = itertools.count(1)
+
+
+class ForeignKey:
+    def __init__(self, column: str, ref_table: str, name: str, ref_column: str = "id"):
+        self.column = column
+        self.ref_table = ref_table
+        self.ref_column = ref_column
+        self.name = name
+
+
+# Mirrors db/migrations closely enough for the services' queries.
+DEFAULT_SCHEMA: Dict[str, Dict[str, Any]] = {
+    "users": {
+        "defaults": {"is_active": True, "full_name": None},
+        "unique": [("email",)],
+        "foreign_keys": [],
+    },
+    "events": {
+        "defaults": {
+            "description": None,
+            "location": None,
+            "is_public": True,
+            "category": None,
+            "max_attendees": None,
+            "latitude": None,
+            "longitude": None,
+        },
+        "unique": [],
+        "foreign_keys": [ForeignKey("created_by", "users", "events_created_by_fkey")],
+    },
+    "rsvps": {
+        "defaults": {"waitlist_position": None},
+        "unique": [("event_id", "user_id")],
+        "foreign_keys": [
+            ForeignKey("event_id", "events", "rsvps_event_id_fkey"),
+            ForeignKey("user_id", "users", "rsvps_user_id_fkey"),
+        ],
+    },
+    "event_rsvp_counts": {
+        "defaults": {
+            "going": 0,
+            "maybe": 0,
+            "not_going": 0,
+            "waitlisted": 0,
+            "next_waitlist_position": 1,
+        },
+        "unique": [("event_id",)],
+        "foreign_keys": [
+            ForeignKey("event_id", "events", "event_rsvp_counts_event_id_fkey")
+        ],
+    },
+    "event_series": {
+        "defaults": {
+            "description": None,
+            "location": None,
+            "category": None,
+            "is_public": True,
+            "max_attendees": None,
+            "until": None,
+        },
+        "unique": [],
+        "foreign_keys": [
+            ForeignKey("created_by", "users", "event_series_created_by_fkey")
+        ],
+    },
+    "event_series_exceptions": {
+        "defaults": {
+            "cancelled": False,
+            "title": None,
+            "description": None,
+            "location": None,
+            "start_time": None,
+            "end_time": None,
+        },
+        "unique": [("series_id", "occurrence_start")],
+        "foreign_keys": [
+            ForeignKey(
+                "series_id", "event_series", "event_series_exceptions_series_id_fkey"
+            )
+        ],
+    },
+    "series_rsvps": {
+        "defaults": {},
+        "unique": [("series_id", "occurrence_start", "user_id")],
+        "foreign_keys": [
+            ForeignKey("series_id", "event_series", "series_rsvps_series_id_fkey"),
+            ForeignKey("user_id", "users", "series_rsvps_user_id_fkey"),
+        ],
+    },
+    "calendar_feeds": {
+        "defaults": {
+            "token_hash": None,
+            "version": lambda: next(calendar_versions),
+            "changed_at": now_iso,
+        },
+        "unique": [("user_id",), ("token_hash",)],
+        "foreign_keys": [
+            ForeignKey("user_id", "users", "calendar_feeds_user_id_fkey")
+        ],
+    },
+    "calendar_tombstones": {
+        "defaults": {"deleted_at": now_iso},
+        "unique": [("user_id", "event_id")],
+        "foreign_keys": [
+            ForeignKey("user_id", "users", "calendar_tombstones_user_id_fkey")
+        ],
+    },
+}
+
+
+class FakeError(Exception):
+    def __init__(self, status: int, code: str, message: str, details: str = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "message": message, "details": details, "hint": None}
+
+
+class FakeStore:
+    def __init__(
+        self,
+        schema: Optional[Dict[str, Dict[str, Any]]] = None,
+        latency: float = 0.0,
+        install_functions: bool = True,
+    ):
+        self.schema = schema or DEFAULT_SCHEMA
+        self.tables: Dict[str, List[Dict[str, Any]]] = {name: [] for name in self.schema}
+        # Hash index per unique column set, like the unique btree indexes
+        self.indexes: Dict[str, Dict[Tuple[str, ...], Dict[tuple, Dict[str, Any]]]] = {
+            name: {cols: {} for cols in self._unique_sets(name)} for name in self.schema
+        }
+        self.rpcs: Dict[str, Callable] = {}
+        self.triggers: Dict[str, List[Callable]] = {}
+        self.latency = latency
+        self.calls = 0
+        if install_functions:
+            from .fake_db_functions import install
+
+            install(self)
+
+    # Setup -------------------------------------------------------------
+
+    def register_rpc(self, name: str, fn: Callable) -> None:
+        """``fn(store, **params)`` may be sync or async and returns JSON data."""
+        self.rpcs[name] = fn
+
+    def register_trigger(self, table: str, fn: Callable) -> None:
+        """``fn(store, op, old, new)`` runs after every row change on ``table``."""
+        self.triggers.setdefault(table, []).append(fn)
+
+    def fire(self, table: str, op: str, old, new) -> None:
+        for trigger in self.triggers.get(table, []):
+            trigger(self, op, old, new)
+
+    def seed(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self._insert_row(table, dict(row)) for row in rows]
+
+    def lookup(self, table: str, cols: Tuple[str, ...], key: tuple):
+        """Row whose unique ``cols`` equal ``key``, via the hash index."""
+        return self.indexes[table][cols].get(key)
+
+    def remove(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        doomed = {id(r) for r in rows}
+        self.tables[table] = [r for r in self.tables[table] if id(r) not in doomed]
+        for row in rows:
+            self._unindex(table, row)
+
+    # Execution ---------------------------------------------------------
+
+    async def execute(
+        self,
+        method: str,
+        path: str,
+        params: List[Tuple[str, str]],
+        headers: Dict[str, str],
+        body: Any,
+    ) -> Tuple[int, Any, Optional[int]]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        prefer = headers.get("prefer") or headers.get("Prefer") or ""
+        try:
+            if path.startswith("rpc/"):
+                return 200, await self._rpc(path[4:], body or {}), None
+            table = path
+            if table not in self.tables:
+                raise FakeError(404, "42P01", f'relation "{table}" does not exist')
+            filters, modifiers = parse_params(params)
+            if method == "GET":
+                return self._select(table, filters, modifiers, "count=exact" in prefer)
+            if method == "POST":
+                return self._insert(table, body, modifiers, prefer)
+            if method == "PATCH":
+                return self._update(table, filters, body, modifiers)
+            if method == "DELETE":
+                return self._delete(table, filters, modifiers)
+            raise FakeError(405, "PGRST000", f"unsupported method {method}")
+        except FakeError as exc:
+            return exc.status, exc.body, None
+
+    async def _rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        fn = self.rpcs.get(name)
+        if fn is None:
+            raise FakeError(404, "PGRST202", f"Could not find the function {name}")
+        result = fn(self, **params)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    def _select(self, table, filters, modifiers, want_count):
+        rows = self.match(table, filters)
+        total = len(rows)
+        rows = self.sort(rows, modifiers.get("order"))
+        offset = int(modifiers.get("offset", 0))
+        limit = modifiers.get("limit")
+        rows = rows[offset : offset + int(limit) if limit is not None else None]
+        data = [self.project(table, row, modifiers.get("select", "*")) for row in rows]
+        return 200, data, total if want_count else None
+
+    def _insert(self, table, body, modifiers, prefer):
+        rows = body if isinstance(body, list) else [body]
+        merge = "resolution=merge-duplicates" in prefer
+        ignore = "resolution=ignore-duplicates" in prefer
+        conflict = modifiers.get("on_conflict")
+        conflict_cols = tuple(c.strip() for c in conflict.split(",")) if conflict else None
+        written, inserted = [], []
+        try:
+            for row in rows:
+                existing = self._find_conflict(table, row, conflict_cols) if merge or ignore else None
+                if existing is not None:
+                    if merge:
+                        old = dict(existing)
+                        self._unindex(table, existing)
+                        existing.update(row)
+                        existing["updated_at"] = now_iso()
+                        self._index(table, existing)
+                        self.fire(table, "UPDATE", old, existing)
+                        written.append(existing)
+                    continue
+                inserted.append(self._insert_row(table, dict(row)))
+                written.append(inserted[-1])
+        except FakeError:
+            # A multi-row INSERT is one statement: undo the rows it added
+            self.remove(table, inserted)
+            for row in inserted:
+                self.fire(table, "DELETE", row, None)
+            raise
+        return 201, self._representation(table, written, modifiers, prefer), None
+
+    def _update(self, table, filters, body, modifiers):
+        rows = self.match(table, filters)
+        for row in rows:
+            candidate = {**row, **body}
+            self._check_unique(table, candidate, ignore=row)
+            old = dict(row)
+            self._unindex(table, row)
+            row.update(body)
+            row["updated_at"] = now_iso()
+            self._index(table, row)
+            self.fire(table, "UPDATE", old, row)
+        return 200, [self.project(table, r, modifiers.get("select", "*")) for r in rows], None
+
+    def _delete(self, table, filters, modifiers):
+        rows = self.match(table, filters)
+        self.remove(table, rows)
+        for row in rows:
+            self.fire(table, "DELETE", row, None)
+        self._cascade(table, rows)
+        return 200, [self.project(table, r, modifiers.get("select", "*")) for r in rows], None
+
+    def _representation(self, table, rows, modifiers, prefer):
+        if "return=minimal" in prefer:
+            return None
+        return [self.project(table, r, modifiers.get("select", "*")) for r in rows]
+
+    def _insert_row(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        spec = self.schema[table]
+        for key, value in spec.get("defaults", {}).items():
+            row.setdefault(key, value() if callable(value) else value)
+        row.setdefault("id", str(uuid.uuid4()))
+        stamp = now_iso()
+        row.setdefault("created_at", stamp)
+        row.setdefault("updated_at", stamp)
+        self._check_unique(table, row)
+        self.tables[table].append(row)
+        self._index(table, row)
+        self.fire(table, "INSERT", None, row)
+        return row
+
+    def _cascade(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        # Every foreign key in the migrations is "on delete cascade".
+        for child, spec in self.schema.items():
+            for fk in spec.get("foreign_keys", []):
+                if fk.ref_table != table:
+                    continue
+                keys = {row.get(fk.ref_column) for row in rows}
+                orphans = [r for r in self.tables[child] if r.get(fk.column) in keys]
+                if orphans:
+                    self.remove(child, orphans)
+                    for row in orphans:
+                        self.fire(child, "DELETE", row, None)
+                    self._cascade(child, orphans)
+
+    def _unique_sets(self, table: str):
+        return [("id",)] + list(self.schema[table].get("unique", []))
+
+    def _index(self, table: str, row: Dict[str, Any]) -> None:
+        for cols, index in self.indexes[table].items():
+            index[tuple(row.get(c) for c in cols)] = row
+
+    def _unindex(self, table: str, row: Dict[str, Any]) -> None:
+        for cols, index in self.indexes[table].items():
+            key = tuple(row.get(c) for c in cols)
+            if index.get(key) is row:
+                del index[key]
+
+    def _check_unique(self, table, row, ignore=None):
+        for cols, index in self.indexes[table].items():
+            key = tuple(row.get(c) for c in cols)
+            if None in key:
+                # NULLs never conflict in a unique index
+                continue
+            other = index.get(key)
+            if other is not None and other is not ignore:
+                raise FakeError(
+                    409,
+                    "23505",
+                    "duplicate key value violates unique constraint",
+                    f"Key ({', '.join(cols)}) already exists.",
+                )
+
+    def _find_conflict(self, table, row, cols):
+        candidates = [cols] if cols else self._unique_sets(table)
+        for cols in candidates:
+            if not all(c in row for c in cols):
+                continue
+            key = tuple(row[c] for c in cols)
+            if cols in self.indexes[table]:
+                return self.indexes[table][cols].get(key)
+            for other in self.tables[table]:
+                if tuple(other.get(c) for c in cols) == key:
+                    return other
+        return None
+
+    # Query evaluation --------------------------------------------------
+
+    def match(self, table: str, filters) -> List[Dict[str, Any]]:
+        return [row for row in self.tables[table] if all(_eval(f, row) for f in filters)]
+
+    def sort(self, rows, order_text: Optional[str]):
+        if not order_text:
+            return list(rows)
+        rows = list(rows)
+        for order in reversed(parse_order(order_text)):
+            nullsfirst = order.desc if order.nullsfirst is None else order.nullsfirst
+            present = [r for r in rows if r.get(order.column) is not None]
+            missing = [r for r in rows if r.get(order.column) is None]
+            present.sort(key=lambda r: _sort_key(r[order.column]), reverse=order.desc)
+            rows = missing + present if nullsfirst else present + missing
+        return rows
+
+    def project(self, table: str, row: Dict[str, Any], select: str) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for item in parse_select(select):
+            if isinstance(item, Embed):
+                out[item.alias] = self._embed(table, row, item)
+            elif item == "*":
+                out.update(row)
+            else:
+                alias, _, column = item.rpartition(":")
+                column = column.split("::")[0]
+                out[alias or column] = row.get(column)
+        return out
+
+    def _embed(self, table: str, row: Dict[str, Any], embed: Embed):
+        select = _render_select(embed.columns)
+        for fk in self.schema[table].get("foreign_keys", []):
+            if fk.ref_table == embed.table and embed.hint in (None, fk.name, fk.column):
+                target = self.lookup(embed.table, (fk.ref_column,), (row.get(fk.column),))
+                return self.project(embed.table, target, select) if target else None
+        for fk in self.schema[embed.table].get("foreign_keys", []):
+            if fk.ref_table == table and embed.hint in (None, fk.name, fk.column):
+                if (fk.column,) in self.indexes[embed.table]:
+                    child = self.lookup(
+                        embed.table, (fk.column,), (row.get(fk.ref_column),)
+                    )
+                    return self.project(embed.table, child, select) if child else None
+                children = [
+                    self.project(embed.table, r, select)
+                    for r in self.tables[embed.table]
+                    if r.get(fk.column) == row.get(fk.ref_column)
+                ]
+                if (fk.column,) in self.schema[embed.table].get("unique", []):
+                    return children[0] if children else None
+                return children
+        raise FakeError(
+            400,
+            "PGRST200",
+            f"Could not find a relationship between '{table}' and '{embed.table}'",
+        )
+
+
+def _render_select(items) -> str:
+    parts = []
+    for item in items:
+        if isinstance(item, Embed):
+            head = f"{item.alias}:{item.table}" + (f"!{item.hint}" if item.hint else "")
+            parts.append(f"{head}({_render_select(item.columns)})")
+        else:
+            parts.append(item)
+    return ",".join(parts) or "*"
+
+
+# Rows and filters repeat the same timestamp strings on every scan
+@functools.lru_cache(maxsize=65536)
+def _parse_ts(value: str) -> Optional[datetime]:
+    if len(value) < 10 or value[4] != "-":
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _sort_key(value):
+    if isinstance(value, str):
+        parsed = _parse_ts(value)
+        if parsed is not None:
+            return parsed
+    return value
+
+
+def _coerce(cell: Any, literal: Any) -> Any:
+    if literal in ("null", None):
+        return None
+    if isinstance(cell, bool):
+        return literal in ("true", True)
+    if isinstance(cell, (int, float)):
+        try:
+            return float(literal)
+        except (TypeError, ValueError):
+            return literal
+    if isinstance(cell, str) and isinstance(literal, str):
+        parsed = _parse_ts(literal)
+        if parsed is not None and _parse_ts(cell) is not None:
+            return parsed
+    return literal
+
+
+def _compare(op: str, cell: Any, literal: Any) -> bool:
+    if op == "is":
+        if literal in ("null", None):
+            return cell is None
+        return cell is (literal == "true")
+    if op == "in":
+        return any(_compare("eq", cell, item) for item in literal)
+    if cell is None:
+        return False
+    value = _coerce(cell, literal)
+    cell = _sort_key(cell) if isinstance(value, datetime) else cell
+    if op == "eq":
+        return cell == value
+    if op == "neq":
+        return cell != value
+    if op in ("like", "ilike"):
+        pattern = str(literal).replace("%", "*")
+        if op == "ilike":
+            return fnmatch.fnmatchcase(str(cell).lower(), pattern.lower())
+        return fnmatch.fnmatchcase(str(cell), pattern)
+    try:
+        if op == "gt":
+            return cell > value
+        if op == "gte":
+            return cell >= value
+        if op == "lt":
+            return cell < value
+        if op == "lte":
+            return cell <= value
+    except TypeError:
+        return False
+    raise FakeError(400, "PGRST100", f"unsupported operator {op}")
+
+
+def _eval(node, row) -> bool:
+    if isinstance(node, Logic):
+        results = (_eval(child, row) for child in node.children)
+        outcome = any(results) if node.op == "or" else all(results)
+    elif "." in node.column:
+        # Filters on embedded resources are not supported; treat as pass-through.
+        return True
+    else:
+        outcome = _compare(node.op, row.get(node.column), node.value)
+    return not outcome if node.negate else outcome
+
+
+def create_app(store: FakeStore) -> Starlette:
+    async def handle(request: Request) -> Response:
+        body = None
+        raw = await request.body()
+        if raw:
+            body = json.loads(raw)
+        status, data, count = await store.execute(
+            request.method,
+            request.path_params["path"],
+            list(request.query_params.multi_items()),
+            dict(request.headers),
+            body,
+        )
+        headers = {}
+        if count is not None:
+            size = len(data) if isinstance(data, list) else 0
+            headers["Content-Range"] = f"0-{max(size - 1, 0)}/{count}"
+        content = b"" if data is None else json.dumps(data).encode()
+        return Response(content, status, headers, media_type="application/json")
+
+    methods = ["GET", "POST", "PATCH", "DELETE"]
+    return Starlette(routes=[Route("/rest/v1/{path:path}", handle, methods=methods)])
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    store = FakeStore(latency=args.latency_ms / 1000)
+    uvicorn.run(create_app(store), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Wire the FastAPI app to an in-memory FakeStore for offline load tests."""
+import os
+import statistics
+import time
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+import httpx
+
+FAKE_URL = "http://fake-postgrest.local"
+FAKE_KEY = "bench.bench.bench"
+
+os.environ.setdefault("SUPABASE_URL", FAKE_URL)
+os.environ.setdefault("SUPABASE_KEY", FAKE_KEY)
+os.environ.setdefault("SUPABASE_JWT_SECRET", "benchmark-secret")
+
+
+def build_app(store, in_process: bool = True):
+    """Return ``app.main.app`` with every service query routed to ``store``.
+
+    By default queries go straight to the store through ``FakeClient``;
+    ``in_process=False`` sends them over HTTP-over-ASGI to the fake
+    PostgREST app instead, which also exercises the real client's encoding.
+    """
+    from app import database
+    from app.db import AsyncClient
+    from benchmarks.fake_client import FakeClient
+    from benchmarks.fake_postgrest import create_app
+
+    if in_process:
+        database.set_client(FakeClient(store))
+    else:
+        database.set_client(
+            AsyncClient(
+                f"{FAKE_URL}/rest/v1",
+                FAKE_KEY,
+                transport=httpx.ASGITransport(app=create_app(store)),
+            )
+        )
+    reset_caches()
+    from app.main import app
+
+    return app
+
+
+def reset_caches() -> None:
+    """Drop process-wide caches so a new store starts cold."""
+    from app.services import auth, event_cache, rate_limit
+    from app.utils.cache import MemoryCacheBackend
+
+    auth.principal_cache.clear()
+    rate_limit.limiter.store.clear()
+    if isinstance(event_cache.backend, MemoryCacheBackend):
+        event_cache.backend.cache.clear()
+
+
+def api_client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench.local"
+    )
+
+
+def seed_users(store, count: int, prefix: str = "user") -> List[Tuple[dict, Dict]]:
+    """Insert users directly and mint tokens for them, skipping bcrypt."""
+    from app.services.auth import create_access_token
+
+    rows = [
+        {"email": f"{prefix}{i}@example.com", "full_name": f"{prefix} {i}"}
+        for i in range(count)
+    ]
+    users = store.seed("users", rows)
+    return [
+        (
+            user,
+            {
+                "Authorization": "Bearer "
+                + create_access_token({"sub": user["email"]}, timedelta(hours=1))
+            },
+        )
+        for user in users
+    ]
+
+
+class Timer:
+    def __init__(self):
+        self.samples: List[float] = []
+
+    async def time(self, coro):
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.samples.append(time.perf_counter() - started)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self, wall: float) -> str:
+        mean = statistics.mean(self.samples) if self.samples else 0.0
+        return (
+            f"requests={len(self.samples)} wall={wall:.3f}s "
+            f"rps={len(self.samples) / wall if wall else 0:.1f} "
+            f"p50={self.percentile(0.5) * 1000:.1f}ms "
+            f"p95={self.percentile(0.95) * 1000:.1f}ms "
+            f"p99={self.percentile(0.99) * 1000:.1f}ms "
+            f"mean={mean * 1000:.1f}ms"
+        )
@@ -0,0 +1,103 @@
+"""Run the load scenarios against the app over an in-memory database.
+
+Each scenario gets a fresh FakeStore behind the in-process FakeClient and
+is driven by the closed-loop generator in benchmarks.loadgen. Reports RPS,
+p50/p95/p99 latency and database calls per request. With ``--check`` the
+results are compared with a thresholds file and the exit code is 1 on any
+regression, for CI:
+
+    python -m benchmarks.load --check benchmarks/thresholds.json
+    python -m benchmarks.load --scenario browse --requests 5000 --concurrency 200
+
+Database calls per request do not depend on the machine, so their limits
+are tight; latency and throughput limits leave room for slow CI runners.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict, List
+
+from benchmarks.fake_postgrest import FakeStore
+from benchmarks.harness import api_client, build_app
+from benchmarks.loadgen import Report, run_load
+from benchmarks.scenarios import SCENARIOS
+
+
+async def run_scenario(
+    name: str, latency: float, requests: int = None, concurrency: int = None
+) -> Report:
+    setup, size, default_requests, default_concurrency, _ = SCENARIOS[name]
+    store = FakeStore(latency=latency)
+    app = build_app(store)
+    request = setup(store, size)
+    async with api_client(app) as client:
+        return await run_load(
+            name,
+            client,
+            request,
+            store=store,
+            total=requests or default_requests,
+            concurrency=concurrency or default_concurrency,
+        )
+
+
+def check(reports: List[Report], thresholds: Dict[str, dict]) -> List[str]:
+    failures = []
+    for report in reports:
+        limits = thresholds.get(report.name, {})
+        result = report.as_dict()
+        expected = SCENARIOS[report.name][4]
+        measured = {
+            "max_p95_ms": result["p95_ms"],
+            "max_p99_ms": result["p99_ms"],
+            "max_db_calls_per_request": result["db_calls_per_request"],
+            "max_error_rate": report.error_rate(expected),
+            "min_rps": result["rps"],
+        }
+        for key, limit in limits.items():
+            value = measured[key]
+            ok = value >= limit if key.startswith("min_") else value <= limit
+            if not ok:
+                failures.append(f"{report.name}: {key}={value} (limit {limit})")
+    return failures
+
+
+async def main_async(args) -> int:
+    names = args.scenario or list(SCENARIOS)
+    reports = []
+    for name in names:
+        report = await run_scenario(
+            name, args.latency_ms / 1000, args.requests, args.concurrency
+        )
+        print(report.line(), flush=True)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({r.name: r.as_dict() for r in reports}, fh, indent=2)
+    if not args.check:
+        return 0
+    with open(args.check) as fh:
+        failures = check(reports, json.load(fh))
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    print("FAIL" if failures else "PASS")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable"
+    )
+    parser.add_argument("--requests", type=int, help="override the scenario default")
+    parser.add_argument("--concurrency", type=int, help="override the scenario default")
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--check", help="thresholds JSON; exit 1 on regression")
+    sys.exit(asyncio.run(main_async(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Closed-loop async load generator.
+
+``concurrency`` workers share one request budget; each worker issues its
+next request as soon as the previous one returns, so the offered load
+tracks the app's throughput. Latency is measured per request around the
+ASGI call, and database calls are counted on the FakeStore.
+"""
+import asyncio
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+# request(client, worker, i) -> response
+RequestFn = Callable[[httpx.AsyncClient, int, int], Awaitable[httpx.Response]]
+
+
+class Report:
+    def __init__(self, name: str, concurrency: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.samples: List[float] = []
+        self.statuses: Counter = Counter()
+        self.wall = 0.0
+        self.db_calls = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def error_rate(self, expected) -> float:
+        if not self.requests:
+            return 0.0
+        errors = sum(n for code, n in self.statuses.items() if code not in expected)
+        return errors / self.requests
+
+    def as_dict(self) -> Dict[str, float]:
+        requests = self.requests
+        return {
+            "requests": requests,
+            "concurrency": self.concurrency,
+            "wall_s": round(self.wall, 3),
+            "rps": round(requests / self.wall, 1) if self.wall else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 2),
+            "p95_ms": round(self.percentile(0.95) * 1000, 2),
+            "p99_ms": round(self.percentile(0.99) * 1000, 2),
+            "db_calls_per_request": round(self.db_calls / requests, 2)
+            if requests
+            else 0.0,
+            "statuses": {str(code): n for code, n in sorted(self.statuses.items())},
+        }
+
+    def line(self) -> str:
+        d = self.as_dict()
+        return (
+            f"{self.name:<12} requests={d['requests']} c={d['concurrency']} "
+            f"rps={d['rps']:.1f} p50={d['p50_ms']:.1f}ms p95={d['p95_ms']:.1f}ms "
+            f"p99={d['p99_ms']:.1f}ms db/req={d['db_calls_per_request']:.2f} "
+            f"statuses={d['statuses']}"
+        )
+
+
+async def run_load(
+    name: str,
+    client: httpx.AsyncClient,
+    request: RequestFn,
+    *,
+    store,
+    total: int,
+    concurrency: int,
+) -> Report:
+    report = Report(name, concurrency)
+    issued = 0
+
+    async def worker(worker_id: int) -> None:
+        nonlocal issued
+        while issued < total:
+            i = issued
+            issued += 1
+            started = time.perf_counter()
+            response = await request(client, worker_id, i)
+            report.samples.append(time.perf_counter() - started)
+            report.statuses[response.status_code] += 1
+
+    calls_before = store.calls
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(min(concurrency, total))))
+    report.wall = time.perf_counter() - started
+    report.db_calls = store.calls - calls_before
+    return report
@@ -0,0 +1,119 @@
+"""Concurrent RSVP rush against one capacity-limited event.
+
+Every simulated attendee POSTs ``going`` to the same event at once, then a
+share of the accepted attendees cancel concurrently. The run fails (exit
+code 1) if the event is ever overbooked, if a request errors, or if the
+waitlist is not promoted strictly in order.
+
+    python -m benchmarks.rsvp_rush --clients 500 --capacity 100 --latency-ms 5
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.fake_postgrest import FakeStore
+from benchmarks.harness import Timer, api_client, build_app, seed_users
+
+
+def _event_rsvps(store, event_id, status):
+    return [
+        r
+        for r in store.tables["rsvps"]
+        if r["event_id"] == event_id and r["status"] == status
+    ]
+
+
+async def run(clients: int, capacity: int, cancellations: int, latency: float) -> int:
+    store = FakeStore(latency=latency)
+    app = build_app(store)
+    (owner, _), *attendees = seed_users(store, clients + 1)
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    event = store.seed(
+        "events",
+        [
+            {
+                "title": "Hot event",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=2)).isoformat(),
+                "created_by": owner["id"],
+                "max_attendees": capacity,
+            }
+        ],
+    )[0]
+
+    timer = Timer()
+    async with api_client(app) as client:
+
+        async def rsvp(headers):
+            response = await timer.time(
+                client.post(
+                    "/api/v1/rsvps/",
+                    json={"event_id": event["id"], "status": "going"},
+                    headers=headers,
+                )
+            )
+            return response.status_code, response.json()
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(rsvp(h) for _, h in attendees))
+        wall = time.perf_counter() - started
+        statuses = Counter(code for code, _ in results)
+        accepted = Counter(body.get("status") for code, body in results if code == 201)
+        print(f"clients={clients} capacity={capacity} statuses={dict(statuses)}")
+        print(f"rush: {dict(accepted)}")
+        print(timer.summary(wall))
+
+        waitlist = sorted(
+            _event_rsvps(store, event["id"], "waitlisted"),
+            key=lambda r: r["waitlist_position"],
+        )
+        tokens = {user["id"]: headers for user, headers in attendees}
+        leaving = _event_rsvps(store, event["id"], "going")[:cancellations]
+        cancel_timer = Timer()
+        started = time.perf_counter()
+        cancelled = await asyncio.gather(
+            *(
+                cancel_timer.time(
+                    client.delete(
+                        f"/api/v1/rsvps/{r['id']}", headers=tokens[r["user_id"]]
+                    )
+                )
+                for r in leaving
+            )
+        )
+        wall = time.perf_counter() - started
+        print(f"cancellations: {Counter(r.status_code for r in cancelled)}")
+        print(cancel_timer.summary(wall))
+
+    going = _event_rsvps(store, event["id"], "going")
+    going_users = {r["user_id"] for r in going}
+    expected = {r["user_id"] for r in waitlist[: len(leaving)]}
+    remaining = len(_event_rsvps(store, event["id"], "waitlisted"))
+    print(f"going rows={len(going)} waitlisted rows={remaining}")
+    print(f"db calls={store.calls}")
+    ok = set(statuses) == {201} and all(r.status_code == 204 for r in cancelled)
+    ok = ok and len(going) == min(clients, capacity)
+    ok = ok and expected <= going_users
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--cancellations", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    sys.exit(
+        asyncio.run(
+            run(args.clients, args.capacity, args.cancellations, args.latency_ms / 1000)
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
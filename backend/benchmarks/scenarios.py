@@ -0,0 +1,131 @@
+"""Load scenarios for benchmarks.load.
+
+Each scenario seeds a fresh FakeStore and returns the request function the
+load generator calls; ``expected`` lists the statuses that count as
+success.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Tuple
+
+from benchmarks.harness import seed_users
+
+PASSWORD = "correct horse battery staple"
+
+
+def _start(days: int = 1, hours: int = 0) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=days, hours=hours)
+
+
+def _event(owner: dict, title: str, start: datetime, **fields) -> dict:
+    return {
+        "title": title,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=2)).isoformat(),
+        "created_by": owner["id"],
+        **fields,
+    }
+
+
+def login_storm(store, size: int):
+    """POST /auth/token for ``size`` distinct users (bcrypt on every call)."""
+    from app.utils.passwords import hash_password
+
+    hashed = hash_password(PASSWORD)
+    users = store.seed(
+        "users",
+        [
+            {"email": f"login{i}@example.com", "hashed_password": hashed}
+            for i in range(size)
+        ],
+    )
+
+    async def request(client, worker, i):
+        return await client.post(
+            "/api/v1/auth/token",
+            data={"username": users[i % size]["email"], "password": PASSWORD},
+        )
+
+    return request
+
+
+def rsvp_rush(store, size: int):
+    """Every request is a different user RSVPing 'going' to one event."""
+    (owner, _), *attendees = seed_users(store, size + 1, prefix="rush")
+    event = store.seed(
+        "events", [_event(owner, "Hot event", _start(), max_attendees=size // 5)]
+    )[0]
+
+    async def request(client, worker, i):
+        _, headers = attendees[i % size]
+        return await client.post(
+            "/api/v1/rsvps/",
+            json={"event_id": event["id"], "status": "going"},
+            headers=headers,
+        )
+
+    return request
+
+
+def browse(store, size: int):
+    """Users page through GET /events with X-Next-Cursor, 20 at a time."""
+    viewers = seed_users(store, 50, prefix="browse")
+    owner = viewers[0][0]
+    store.seed(
+        "events",
+        [_event(owner, f"Event {i}", _start(hours=i)) for i in range(size)],
+    )
+    cursors: Dict[int, str] = {}
+
+    async def request(client, worker, i):
+        _, headers = viewers[worker % len(viewers)]
+        params = {"limit": 20}
+        if worker in cursors:
+            params["cursor"] = cursors[worker]
+        response = await client.get("/api/v1/events/", params=params, headers=headers)
+        next_cursor = response.headers.get("x-next-cursor")
+        if next_cursor:
+            cursors[worker] = next_cursor
+        else:
+            # Last page: start over from the top
+            cursors.pop(worker, None)
+        return response
+
+    return request
+
+
+def export(store, size: int):
+    """The organizer downloads the CSV attendee export of a ``size``-RSVP event."""
+    (owner, headers), *_ = seed_users(store, 1, prefix="export")
+    attendees = store.seed(
+        "users",
+        [
+            {"email": f"attendee{i}@example.com", "full_name": f"Attendee {i}"}
+            for i in range(size)
+        ],
+    )
+    event = store.seed("events", [_event(owner, "Conference", _start())])[0]
+    store.seed(
+        "rsvps",
+        [
+            {"event_id": event["id"], "user_id": user["id"], "status": "going"}
+            for user in attendees
+        ],
+    )
+
+    async def request(client, worker, i):
+        return await client.get(
+            f"/api/v1/rsvps/event/{event['id']}/export",
+            params={"format": "csv"},
+            headers=headers,
+        )
+
+    return request
+
+
+# name -> (setup, dataset size, requests, concurrency, expected statuses)
+SCENARIOS: Dict[str, Tuple[Callable, int, int, int, Tuple[int, ...]]] = {
+    "login_storm": (login_storm, 16, 16, 8, (200,)),
+    "rsvp_rush": (rsvp_rush, 1000, 1000, 100, (201,)),
+    "browse": (browse, 500, 500, 50, (200,)),
+    "export": (export, 3000, 10, 2, (200,)),
+}
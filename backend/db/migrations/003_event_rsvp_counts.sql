@@ -0,0 +1,94 @@
+-- Per-event RSVP counters, maintained by triggers on rsvps so that event
+-- listings can report attendance without reading every RSVP row.
+create table if not exists event_rsvp_counts (
+  event_id uuid references events(id) on delete cascade not null primary key,
+  going integer not null default 0,
+  maybe integer not null default 0,
+  not_going integer not null default 0,
+  updated_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+-- Enable Row Level Security for event_rsvp_counts table
+alter table event_rsvp_counts enable row level security;
+
+-- Counters are visible wherever the event itself is visible
+create policy "Counts are viewable with their event"
+on event_rsvp_counts for select
+to anon, authenticated
+using (
+  exists (
+    select 1 from events
+    where events.id = event_rsvp_counts.event_id
+    and (events.is_public = true or events.created_by = auth.uid())
+  )
+);
+
+-- Every event starts with a zeroed counter row
+create or replace function create_event_rsvp_counts()
+returns trigger as $$
+begin
+  insert into event_rsvp_counts (event_id) values (new.id)
+  on conflict (event_id) do nothing;
+  return null;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+create or replace trigger events_create_rsvp_counts
+after insert on events
+for each row
+execute function create_event_rsvp_counts();
+
+-- Apply the delta of one RSVP change to its event's counters
+create or replace function apply_rsvp_count_delta()
+returns trigger as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    update event_rsvp_counts set
+      going = going - (old.status = 'going')::int,
+      maybe = maybe - (old.status = 'maybe')::int,
+      not_going = not_going - (old.status = 'not_going')::int,
+      updated_at = now()
+    where event_id = old.event_id;
+  end if;
+
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into event_rsvp_counts (event_id, going, maybe, not_going)
+    values (
+      new.event_id,
+      (new.status = 'going')::int,
+      (new.status = 'maybe')::int,
+      (new.status = 'not_going')::int
+    )
+    on conflict (event_id) do update set
+      going = event_rsvp_counts.going + excluded.going,
+      maybe = event_rsvp_counts.maybe + excluded.maybe,
+      not_going = event_rsvp_counts.not_going + excluded.not_going,
+      updated_at = now();
+  end if;
+
+  return null;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+create or replace trigger rsvps_apply_count_delta
+after insert or update of status, event_id or delete on rsvps
+for each row
+execute function apply_rsvp_count_delta();
+
+-- Backfill counters for existing events
+insert into event_rsvp_counts (event_id, going, maybe, not_going)
+select
+  events.id,
+  count(rsvps.id) filter (where rsvps.status = 'going'),
+  count(rsvps.id) filter (where rsvps.status = 'maybe'),
+  count(rsvps.id) filter (where rsvps.status = 'not_going')
+from events
+left join rsvps on rsvps.event_id = events.id
+group by events.id
+on conflict (event_id) do update set
+  going = excluded.going,
+  maybe = excluded.maybe,
+  not_going = excluded.not_going,
+  updated_at = now();
@@ -0,0 +1,48 @@
+-- Atomic RSVP create/update with capacity enforcement in one round trip.
+--
+-- The event row is locked first, so concurrent RSVPs for the same event are
+-- serialised and the capacity check cannot race. Errors use PostgREST's
+-- PTxxx convention so they surface with the matching HTTP status:
+--   PT404 event not found, PT409 event is full, PT403 wrong user.
+create or replace function rsvp_upsert(p_event_id uuid, p_user_id uuid, p_status text)
+returns rsvps as $$
+declare
+  v_event events;
+  v_previous text;
+  v_going integer;
+  v_rsvp rsvps;
+begin
+  if auth.uid() is not null and auth.uid() <> p_user_id then
+    raise exception 'cannot RSVP on behalf of another user' using errcode = 'PT403';
+  end if;
+
+  select * into v_event from events where id = p_event_id for no key update;
+  if not found then
+    raise exception 'event not found' using errcode = 'PT404';
+  end if;
+
+  select status into v_previous
+  from rsvps
+  where event_id = p_event_id and user_id = p_user_id;
+
+  if p_status = 'going'
+     and v_event.max_attendees is not null
+     and v_previous is distinct from 'going' then
+    select going into v_going from event_rsvp_counts where event_id = p_event_id;
+    if coalesce(v_going, 0) >= v_event.max_attendees then
+      raise exception 'event is full' using errcode = 'PT409';
+    end if;
+  end if;
+
+  insert into rsvps (event_id, user_id, status)
+  values (p_event_id, p_user_id, p_status)
+  on conflict (event_id, user_id) do update set status = excluded.status
+  returning * into v_rsvp;
+
+  return v_rsvp;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+-- Server-side only: the API calls it with the service role key
+revoke execute on function rsvp_upsert(uuid, uuid, text) from public, anon, authenticated;
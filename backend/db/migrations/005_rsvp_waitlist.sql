@@ -0,0 +1,220 @@
+-- Ordered waitlist for full events with automatic promotion.
+--
+-- A 'going' RSVP for a full event is stored as 'waitlisted' with a
+-- per-event, monotonically increasing waitlist_position. When a seat frees
+-- up (a going RSVP changes status or is deleted, or max_attendees is
+-- raised) the head of the waitlist is promoted inside the same
+-- transaction. The head is found through a partial index, so promotion
+-- never scans the event's RSVPs.
+
+alter table rsvps drop constraint if exists rsvps_status_check;
+alter table rsvps add constraint rsvps_status_check
+  check (status in ('going', 'not_going', 'maybe', 'waitlisted'));
+alter table rsvps add column if not exists waitlist_position bigint;
+
+create index if not exists idx_rsvps_waitlist
+on rsvps(event_id, waitlist_position)
+where status = 'waitlisted';
+
+alter table event_rsvp_counts
+  add column if not exists waitlisted integer not null default 0,
+  add column if not exists next_waitlist_position bigint not null default 1;
+
+-- Count waitlisted RSVPs alongside the other statuses
+create or replace function apply_rsvp_count_delta()
+returns trigger as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    update event_rsvp_counts set
+      going = going - (old.status = 'going')::int,
+      maybe = maybe - (old.status = 'maybe')::int,
+      not_going = not_going - (old.status = 'not_going')::int,
+      waitlisted = waitlisted - (old.status = 'waitlisted')::int,
+      updated_at = now()
+    where event_id = old.event_id;
+  end if;
+
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into event_rsvp_counts (event_id, going, maybe, not_going, waitlisted)
+    values (
+      new.event_id,
+      (new.status = 'going')::int,
+      (new.status = 'maybe')::int,
+      (new.status = 'not_going')::int,
+      (new.status = 'waitlisted')::int
+    )
+    on conflict (event_id) do update set
+      going = event_rsvp_counts.going + excluded.going,
+      maybe = event_rsvp_counts.maybe + excluded.maybe,
+      not_going = event_rsvp_counts.not_going + excluded.not_going,
+      waitlisted = event_rsvp_counts.waitlisted + excluded.waitlisted,
+      updated_at = now();
+  end if;
+
+  return null;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+-- Fill free seats from the head of the waitlist. Takes the same event row
+-- lock as rsvp_upsert, so promotions and new RSVPs are serialised.
+create or replace function promote_waitlist(p_event_id uuid)
+returns integer as $$
+declare
+  v_capacity integer;
+  v_going integer;
+  v_next uuid;
+  v_promoted integer := 0;
+begin
+  select max_attendees into v_capacity
+  from events where id = p_event_id
+  for no key update;
+  if not found then
+    -- The event itself is being deleted
+    return 0;
+  end if;
+
+  loop
+    select going into v_going from event_rsvp_counts where event_id = p_event_id;
+    exit when v_capacity is not null and coalesce(v_going, 0) >= v_capacity;
+
+    select id into v_next
+    from rsvps
+    where event_id = p_event_id and status = 'waitlisted'
+    order by waitlist_position
+    limit 1;
+    exit when v_next is null;
+
+    update rsvps set status = 'going', waitlist_position = null where id = v_next;
+    v_promoted := v_promoted + 1;
+  end loop;
+
+  return v_promoted;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+revoke execute on function promote_waitlist(uuid) from public, anon, authenticated;
+
+create or replace function rsvps_promote_waitlist()
+returns trigger as $$
+begin
+  if old.status = 'going' and (tg_op = 'DELETE' or new.status <> 'going') then
+    perform promote_waitlist(old.event_id);
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+-- Named to sort after rsvps_apply_count_delta, so counters are current
+create or replace trigger rsvps_promote_waitlist
+after update of status or delete on rsvps
+for each row
+execute function rsvps_promote_waitlist();
+
+create or replace function events_promote_waitlist()
+returns trigger as $$
+begin
+  if new.max_attendees is distinct from old.max_attendees then
+    perform promote_waitlist(new.id);
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+create or replace trigger events_promote_waitlist
+after update of max_attendees on events
+for each row
+execute function events_promote_waitlist();
+
+-- rsvp_upsert now waitlists instead of rejecting when the event is full
+create or replace function rsvp_upsert(p_event_id uuid, p_user_id uuid, p_status text)
+returns rsvps as $$
+declare
+  v_event events;
+  v_previous text;
+  v_position bigint;
+  v_status text := p_status;
+  v_going integer;
+  v_rsvp rsvps;
+begin
+  if auth.uid() is not null and auth.uid() <> p_user_id then
+    raise exception 'cannot RSVP on behalf of another user' using errcode = 'PT403';
+  end if;
+
+  select * into v_event from events where id = p_event_id for no key update;
+  if not found then
+    raise exception 'event not found' using errcode = 'PT404';
+  end if;
+
+  select status, waitlist_position into v_previous, v_position
+  from rsvps
+  where event_id = p_event_id and user_id = p_user_id;
+
+  if p_status = 'going' and v_event.max_attendees is not null then
+    if v_previous = 'waitlisted' then
+      -- Keep the existing place in line
+      v_status := 'waitlisted';
+    elsif v_previous is distinct from 'going' then
+      select going into v_going from event_rsvp_counts where event_id = p_event_id;
+      if coalesce(v_going, 0) >= v_event.max_attendees then
+        update event_rsvp_counts
+        set next_waitlist_position = next_waitlist_position + 1
+        where event_id = p_event_id
+        returning next_waitlist_position - 1 into v_position;
+        v_status := 'waitlisted';
+      end if;
+    end if;
+  end if;
+
+  if v_status <> 'waitlisted' then
+    v_position := null;
+  end if;
+
+  insert into rsvps (event_id, user_id, status, waitlist_position)
+  values (p_event_id, p_user_id, v_status, v_position)
+  on conflict (event_id, user_id) do update set
+    status = excluded.status,
+    waitlist_position = excluded.waitlist_position
+  returning * into v_rsvp;
+
+  return v_rsvp;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+revoke execute on function rsvp_upsert(uuid, uuid, text) from public, anon, authenticated;
+
+-- Cancel an RSVP. Locks the event before the RSVP (same order as
+-- rsvp_upsert and promote_waitlist) so concurrent cancellations cannot
+-- deadlock or double-promote.
+create or replace function rsvp_cancel(p_rsvp_id uuid, p_user_id uuid)
+returns rsvps as $$
+declare
+  v_event_id uuid;
+  v_rsvp rsvps;
+begin
+  if auth.uid() is not null and auth.uid() <> p_user_id then
+    raise exception 'cannot cancel on behalf of another user' using errcode = 'PT403';
+  end if;
+
+  select event_id into v_event_id from rsvps where id = p_rsvp_id;
+  if not found then
+    raise exception 'rsvp not found' using errcode = 'PT404';
+  end if;
+  perform 1 from events where id = v_event_id for no key update;
+
+  delete from rsvps where id = p_rsvp_id and user_id = p_user_id
+  returning * into v_rsvp;
+  if v_rsvp.id is null then
+    raise exception 'not your rsvp' using errcode = 'PT403';
+  end if;
+
+  return v_rsvp;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+revoke execute on function rsvp_cancel(uuid, uuid) from public, anon, authenticated;
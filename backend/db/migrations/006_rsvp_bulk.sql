@@ -0,0 +1,125 @@
+-- Bulk RSVP import for organizers, one round trip per chunk of rows.
+--
+-- The body of rsvp_upsert moves into rsvp_apply so the bulk function can
+-- reuse the capacity and waitlist logic for attendees other than the
+-- caller. Every row runs in its own subtransaction: a bad row is reported
+-- back with its SQLSTATE instead of aborting the rest of the chunk.
+
+create or replace function rsvp_apply(p_event_id uuid, p_user_id uuid, p_status text)
+returns rsvps as $$
+declare
+  v_event events;
+  v_previous text;
+  v_position bigint;
+  v_status text := p_status;
+  v_going integer;
+  v_rsvp rsvps;
+begin
+  select * into v_event from events where id = p_event_id for no key update;
+  if not found then
+    raise exception 'event not found' using errcode = 'PT404';
+  end if;
+
+  select status, waitlist_position into v_previous, v_position
+  from rsvps
+  where event_id = p_event_id and user_id = p_user_id;
+
+  if p_status = 'going' and v_event.max_attendees is not null then
+    if v_previous = 'waitlisted' then
+      -- Keep the existing place in line
+      v_status := 'waitlisted';
+    elsif v_previous is distinct from 'going' then
+      select going into v_going from event_rsvp_counts where event_id = p_event_id;
+      if coalesce(v_going, 0) >= v_event.max_attendees then
+        update event_rsvp_counts
+        set next_waitlist_position = next_waitlist_position + 1
+        where event_id = p_event_id
+        returning next_waitlist_position - 1 into v_position;
+        v_status := 'waitlisted';
+      end if;
+    end if;
+  end if;
+
+  if v_status <> 'waitlisted' then
+    v_position := null;
+  end if;
+
+  insert into rsvps (event_id, user_id, status, waitlist_position)
+  values (p_event_id, p_user_id, v_status, v_position)
+  on conflict (event_id, user_id) do update set
+    status = excluded.status,
+    waitlist_position = excluded.waitlist_position
+  returning * into v_rsvp;
+
+  return v_rsvp;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+-- Internal: only reachable through rsvp_upsert and rsvp_upsert_many
+revoke execute on function rsvp_apply(uuid, uuid, text) from public, anon, authenticated;
+
+create or replace function rsvp_upsert(p_event_id uuid, p_user_id uuid, p_status text)
+returns rsvps as $$
+begin
+  if auth.uid() is not null and auth.uid() <> p_user_id then
+    raise exception 'cannot RSVP on behalf of another user' using errcode = 'PT403';
+  end if;
+  return rsvp_apply(p_event_id, p_user_id, p_status);
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+revoke execute on function rsvp_upsert(uuid, uuid, text) from public, anon, authenticated;
+
+-- p_rsvps is a JSON array of {event_id, user_id, status}. Returns one entry
+-- per input row, {index, rsvp} or {index, code, message}. Rows are applied
+-- in event_id order so concurrent imports lock events in the same order.
+create or replace function rsvp_upsert_many(p_organizer_id uuid, p_rsvps jsonb)
+returns jsonb as $$
+declare
+  v_item record;
+  v_created_by uuid;
+  v_rsvp rsvps;
+  v_results jsonb := '[]'::jsonb;
+begin
+  if auth.uid() is not null and auth.uid() <> p_organizer_id then
+    raise exception 'cannot import on behalf of another organizer' using errcode = 'PT403';
+  end if;
+
+  for v_item in
+    select ordinality - 1 as index, value
+    from jsonb_array_elements(p_rsvps) with ordinality
+    order by value->>'event_id', ordinality
+  loop
+    begin
+      select created_by into v_created_by
+      from events where id = (v_item.value->>'event_id')::uuid;
+      if not found then
+        raise exception 'event not found' using errcode = 'PT404';
+      end if;
+      if v_created_by <> p_organizer_id then
+        raise exception 'not the event organizer' using errcode = 'PT403';
+      end if;
+
+      v_rsvp := rsvp_apply(
+        (v_item.value->>'event_id')::uuid,
+        (v_item.value->>'user_id')::uuid,
+        v_item.value->>'status'
+      );
+      v_results := v_results || jsonb_build_object(
+        'index', v_item.index, 'rsvp', to_jsonb(v_rsvp)
+      );
+    exception when others then
+      v_results := v_results || jsonb_build_object(
+        'index', v_item.index, 'code', sqlstate, 'message', sqlerrm
+      );
+    end;
+  end loop;
+
+  return v_results;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+revoke execute on function rsvp_upsert_many(uuid, jsonb) from public, anon, authenticated;
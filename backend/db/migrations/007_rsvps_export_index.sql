@@ -0,0 +1,4 @@
+-- Keyset pagination over an event's RSVPs in signup order, used by the
+-- streaming attendee export (GET /rsvps/event/{event_id}/export).
+create index if not exists idx_rsvps_event_created
+on rsvps(event_id, created_at, id);
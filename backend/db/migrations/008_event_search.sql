@@ -0,0 +1,86 @@
+-- Full-text and faceted event search.
+--
+-- search_vector is maintained by Postgres itself and indexed with GIN; the
+-- (category, start_time) index serves category-filtered browsing and date
+-- ranges within a category.
+alter table events add column if not exists search_vector tsvector
+  generated always as (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(category, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+  ) stored;
+
+create index if not exists idx_events_search on events using gin(search_vector);
+create index if not exists idx_events_category_start_time on events(category, start_time);
+
+-- One round trip for a ranked page, its total and per-category facet
+-- counts. Facets are computed over every match before the category filter,
+-- so clients can show the other categories the query also hits.
+create or replace function search_events(
+  p_query text default null,
+  p_category text default null,
+  p_from timestamptz default null,
+  p_to timestamptz default null,
+  p_user_id uuid default null,
+  p_limit integer default 20,
+  p_offset integer default 0
+)
+returns jsonb as $$
+  with matched as (
+    select e.*, coalesce(ts_rank_cd(e.search_vector, q.query), 0) as rank
+    from events e
+    left join lateral (
+      select websearch_to_tsquery('english', p_query) as query
+      where nullif(trim(p_query), '') is not null
+    ) q on true
+    where (q.query is null or e.search_vector @@ q.query)
+      and (e.is_public or e.created_by = p_user_id)
+      and (p_from is null or e.start_time >= p_from)
+      and (p_to is null or e.start_time < p_to)
+  ),
+  filtered as (
+    select * from matched
+    where p_category is null or category = p_category
+  ),
+  page as (
+    select * from filtered
+    order by rank desc, start_time, id
+    limit p_limit offset p_offset
+  )
+  select jsonb_build_object(
+    'total', (select count(*) from filtered),
+    'results', coalesce(
+      (
+        select jsonb_agg(
+          (to_jsonb(page) - 'search_vector') || jsonb_build_object(
+            'rsvp_counts', jsonb_build_object(
+              'going', coalesce(c.going, 0),
+              'maybe', coalesce(c.maybe, 0),
+              'not_going', coalesce(c.not_going, 0),
+              'waitlisted', coalesce(c.waitlisted, 0)
+            )
+          )
+          order by page.rank desc, page.start_time, page.id
+        )
+        from page
+        left join event_rsvp_counts c on c.event_id = page.id
+      ),
+      '[]'::jsonb
+    ),
+    'facets', coalesce(
+      (
+        select jsonb_agg(
+          jsonb_build_object('category', category, 'count', n)
+          order by n desc, category
+        )
+        from (select category, count(*) as n from matched group by category) f
+      ),
+      '[]'::jsonb
+    )
+  );
+$$ language sql stable security definer
+set search_path = public, pg_temp;
+
+revoke execute on function search_events(text, text, timestamptz, timestamptz, uuid, integer, integer)
+from public, anon, authenticated;
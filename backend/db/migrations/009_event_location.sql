@@ -0,0 +1,110 @@
+-- Optional coordinates on events and "events near me" without PostGIS.
+--
+-- A GiST index on point(longitude, latitude) answers bounding-box
+-- containment (<@). events_nearby narrows to the box(es) around the search
+-- circle through that index, then computes exact great-circle distances
+-- for the candidates only and sorts by them.
+alter table events
+  add column if not exists latitude double precision
+    check (latitude between -90 and 90),
+  add column if not exists longitude double precision
+    check (longitude between -180 and 180);
+
+alter table events drop constraint if exists events_coordinates_pair;
+alter table events add constraint events_coordinates_pair
+  check ((latitude is null) = (longitude is null));
+
+create index if not exists idx_events_location
+on events using gist (point(longitude, latitude))
+where latitude is not null;
+
+create or replace function haversine_km(
+  lat1 double precision, lon1 double precision,
+  lat2 double precision, lon2 double precision
+)
+returns double precision as $$
+  select 2 * 6371.0088 * asin(least(1, sqrt(
+    sin(radians(lat2 - lat1) / 2) ^ 2
+    + cos(radians(lat1)) * cos(radians(lat2)) * sin(radians(lon2 - lon1) / 2) ^ 2
+  )));
+$$ language sql immutable strict;
+
+create or replace function events_nearby(
+  p_lat double precision,
+  p_lon double precision,
+  p_radius_km double precision,
+  p_user_id uuid default null,
+  p_from timestamptz default null,
+  p_limit integer default 50
+)
+returns jsonb as $$
+declare
+  v_angular double precision := p_radius_km / 6371.0088;
+  v_min_lat double precision := greatest(p_lat - degrees(p_radius_km / 6371.0088), -90);
+  v_max_lat double precision := least(p_lat + degrees(p_radius_km / 6371.0088), 90);
+  v_ratio double precision;
+  v_dlon double precision := 180;
+  v_box box;
+  v_wrap box;
+begin
+  -- Longitude half-width of the circle; a circle reaching a pole spans
+  -- every longitude
+  if v_min_lat > -90 and v_max_lat < 90 then
+    v_ratio := sin(v_angular) / cos(radians(p_lat));
+    if v_ratio < 1 then
+      v_dlon := degrees(asin(v_ratio));
+    end if;
+  end if;
+
+  if v_dlon >= 180 then
+    v_box := box(point(-180, v_min_lat), point(180, v_max_lat));
+  elsif p_lon - v_dlon < -180 then
+    v_box := box(point(p_lon - v_dlon + 360, v_min_lat), point(180, v_max_lat));
+    v_wrap := box(point(-180, v_min_lat), point(p_lon + v_dlon, v_max_lat));
+  elsif p_lon + v_dlon > 180 then
+    v_box := box(point(p_lon - v_dlon, v_min_lat), point(180, v_max_lat));
+    v_wrap := box(point(-180, v_min_lat), point(p_lon + v_dlon - 360, v_max_lat));
+  else
+    v_box := box(point(p_lon - v_dlon, v_min_lat), point(p_lon + v_dlon, v_max_lat));
+  end if;
+
+  return coalesce((
+    select jsonb_agg(nearby.event order by nearby.distance_km, nearby.start_time, nearby.id)
+    from (
+      select
+        (to_jsonb(e) - 'search_vector') || jsonb_build_object(
+          'distance_km', d.km,
+          'rsvp_counts', jsonb_build_object(
+            'going', coalesce(c.going, 0),
+            'maybe', coalesce(c.maybe, 0),
+            'not_going', coalesce(c.not_going, 0),
+            'waitlisted', coalesce(c.waitlisted, 0)
+          )
+        ) as event,
+        d.km as distance_km,
+        e.start_time,
+        e.id
+      from events e
+      cross join lateral (
+        select haversine_km(p_lat, p_lon, e.latitude, e.longitude) as km
+      ) d
+      left join event_rsvp_counts c on c.event_id = e.id
+      where e.latitude is not null
+        and (
+          point(e.longitude, e.latitude) <@ v_box
+          or (v_wrap is not null and point(e.longitude, e.latitude) <@ v_wrap)
+        )
+        and d.km <= p_radius_km
+        and (e.is_public or e.created_by = p_user_id)
+        and (p_from is null or e.start_time >= p_from)
+      order by d.km, e.start_time, e.id
+      limit p_limit
+    ) nearby
+  ), '[]'::jsonb);
+end;
+$$ language plpgsql stable security definer
+set search_path = public, pg_temp;
+
+revoke execute on function events_nearby(
+  double precision, double precision, double precision, uuid, timestamptz, integer
+) from public, anon, authenticated;
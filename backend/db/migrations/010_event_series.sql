@@ -0,0 +1,240 @@
+-- Recurring event series.
+--
+-- A series stores its recurrence rule once; occurrences are expanded by the
+-- API only inside the requested window (app/utils/recurrence.py). Only
+-- occurrences that differ from the rule (event_series_exceptions) or that
+-- have RSVPs (series_rsvps) get rows, keyed by the occurrence's original
+-- start time.
+create table if not exists event_series (
+  id uuid default uuid_generate_v4() primary key,
+  title text not null,
+  description text,
+  location text,
+  category text,
+  is_public boolean default true not null,
+  max_attendees integer,
+  -- First occurrence; every occurrence lasts end_time - start_time
+  start_time timestamp with time zone not null,
+  end_time timestamp with time zone not null,
+  rrule text not null,
+  -- Start of the last occurrence, null for an endless series
+  until timestamp with time zone,
+  created_by uuid references auth.users(id) on delete cascade not null,
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  updated_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  constraint series_end_after_start check (end_time > start_time)
+);
+
+create table if not exists event_series_exceptions (
+  series_id uuid references event_series(id) on delete cascade not null,
+  occurrence_start timestamp with time zone not null,
+  cancelled boolean default false not null,
+  -- Null columns inherit from the series
+  title text,
+  description text,
+  location text,
+  start_time timestamp with time zone,
+  end_time timestamp with time zone,
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  updated_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  primary key (series_id, occurrence_start)
+);
+
+create table if not exists series_rsvps (
+  id uuid default uuid_generate_v4() primary key,
+  series_id uuid references event_series(id) on delete cascade not null,
+  occurrence_start timestamp with time zone not null,
+  user_id uuid references auth.users(id) on delete cascade not null,
+  status text check (status in ('going', 'not_going', 'maybe')) not null,
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  updated_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  unique (series_id, occurrence_start, user_id)
+);
+
+create index if not exists idx_event_series_created_by on event_series(created_by);
+create index if not exists idx_event_series_window on event_series(start_time, until);
+create index if not exists idx_series_rsvps_user on series_rsvps(user_id, occurrence_start);
+
+create or replace trigger update_event_series_updated_at
+before update on event_series
+for each row
+execute function update_updated_at_column();
+
+create or replace trigger update_event_series_exceptions_updated_at
+before update on event_series_exceptions
+for each row
+execute function update_updated_at_column();
+
+create or replace trigger update_series_rsvps_updated_at
+before update on series_rsvps
+for each row
+execute function update_updated_at_column();
+
+alter table event_series enable row level security;
+alter table event_series_exceptions enable row level security;
+alter table series_rsvps enable row level security;
+
+create policy "Series are viewable like events"
+on event_series for select
+to anon, authenticated
+using (is_public = true or created_by = auth.uid());
+
+create policy "Users can manage their own series"
+on event_series for all
+to authenticated
+using (auth.uid() = created_by)
+with check (auth.uid() = created_by);
+
+create policy "Series exceptions are viewable with their series"
+on event_series_exceptions for select
+to anon, authenticated
+using (
+  exists (
+    select 1 from event_series s
+    where s.id = event_series_exceptions.series_id
+    and (s.is_public = true or s.created_by = auth.uid())
+  )
+);
+
+create policy "Series creators can manage exceptions"
+on event_series_exceptions for all
+to authenticated
+using (
+  exists (
+    select 1 from event_series s
+    where s.id = event_series_exceptions.series_id and s.created_by = auth.uid()
+  )
+);
+
+create policy "Users can view series RSVPs they can see"
+on series_rsvps for select
+to authenticated
+using (
+  exists (
+    select 1 from event_series s
+    where s.id = series_rsvps.series_id
+    and (s.is_public = true or s.created_by = auth.uid())
+  )
+  or auth.uid() = user_id
+);
+
+create policy "Users can manage their own series RSVPs"
+on series_rsvps for all
+to authenticated
+using (auth.uid() = user_id)
+with check (auth.uid() = user_id);
+
+-- Everything the occurrence listing needs besides the series rows, for
+-- many series and one window, in a single round trip.
+create or replace function series_window(
+  p_series_ids uuid[],
+  p_from timestamptz,
+  p_to timestamptz,
+  p_user_id uuid default null
+)
+returns jsonb as $$
+  select jsonb_build_object(
+    'exceptions', coalesce((
+      select jsonb_agg(x)
+      from event_series_exceptions x
+      where x.series_id = any(p_series_ids)
+        and x.occurrence_start >= p_from and x.occurrence_start < p_to
+    ), '[]'::jsonb),
+    'counts', coalesce((
+      select jsonb_agg(c)
+      from (
+        select
+          series_id,
+          occurrence_start,
+          count(*) filter (where status = 'going') as going,
+          count(*) filter (where status = 'maybe') as maybe,
+          count(*) filter (where status = 'not_going') as not_going
+        from series_rsvps
+        where series_id = any(p_series_ids)
+          and occurrence_start >= p_from and occurrence_start < p_to
+        group by series_id, occurrence_start
+      ) c
+    ), '[]'::jsonb),
+    'mine', coalesce((
+      select jsonb_agg(jsonb_build_object(
+        'series_id', series_id,
+        'occurrence_start', occurrence_start,
+        'status', status
+      ))
+      from series_rsvps
+      where user_id = p_user_id
+        and series_id = any(p_series_ids)
+        and occurrence_start >= p_from and occurrence_start < p_to
+    ), '[]'::jsonb)
+  );
+$$ language sql stable security definer
+set search_path = public, pg_temp;
+
+revoke execute on function series_window(uuid[], timestamptz, timestamptz, uuid)
+from public, anon, authenticated;
+
+-- RSVP to one occurrence with the same guarantees as rsvp_upsert: the
+-- series row lock serialises the capacity check. Full occurrences are
+-- rejected (PT409); cancelled ones are not found (PT404).
+create or replace function series_rsvp_upsert(
+  p_series_id uuid,
+  p_occurrence_start timestamptz,
+  p_user_id uuid,
+  p_status text
+)
+returns series_rsvps as $$
+declare
+  v_series event_series;
+  v_previous text;
+  v_going integer;
+  v_rsvp series_rsvps;
+begin
+  if auth.uid() is not null and auth.uid() <> p_user_id then
+    raise exception 'cannot RSVP on behalf of another user' using errcode = 'PT403';
+  end if;
+
+  select * into v_series from event_series where id = p_series_id for no key update;
+  if not found then
+    raise exception 'series not found' using errcode = 'PT404';
+  end if;
+
+  perform 1 from event_series_exceptions
+  where series_id = p_series_id
+    and occurrence_start = p_occurrence_start
+    and cancelled;
+  if found then
+    raise exception 'occurrence is cancelled' using errcode = 'PT404';
+  end if;
+
+  select status into v_previous
+  from series_rsvps
+  where series_id = p_series_id
+    and occurrence_start = p_occurrence_start
+    and user_id = p_user_id;
+
+  if p_status = 'going'
+     and v_series.max_attendees is not null
+     and v_previous is distinct from 'going' then
+    select count(*) into v_going
+    from series_rsvps
+    where series_id = p_series_id
+      and occurrence_start = p_occurrence_start
+      and status = 'going';
+    if v_going >= v_series.max_attendees then
+      raise exception 'occurrence is full' using errcode = 'PT409';
+    end if;
+  end if;
+
+  insert into series_rsvps (series_id, occurrence_start, user_id, status)
+  values (p_series_id, p_occurrence_start, p_user_id, p_status)
+  on conflict (series_id, occurrence_start, user_id) do update set
+    status = excluded.status
+  returning * into v_rsvp;
+
+  return v_rsvp;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+revoke execute on function series_rsvp_upsert(uuid, timestamptz, uuid, text)
+from public, anon, authenticated;
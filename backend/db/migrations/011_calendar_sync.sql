@@ -0,0 +1,235 @@
+-- Personal calendar feeds and incremental sync.
+--
+-- calendar_feeds holds one row per user with a change version taken from a
+-- global sequence. Triggers bump it whenever something in the user's
+-- calendar changes: one of their RSVPs is written or deleted, or an event
+-- they RSVP'd to is edited. A poll that presents the current version is
+-- answered from that single row. Deleted RSVPs (including those removed
+-- by an event's cascade delete) leave a tombstone so delta syncs can
+-- report them.
+create sequence if not exists calendar_version_seq;
+
+create table if not exists calendar_feeds (
+  user_id uuid references users(id) on delete cascade not null primary key,
+  -- sha256 of the feed URL token; the token itself is never stored
+  token_hash text unique,
+  version bigint not null default nextval('calendar_version_seq'),
+  changed_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+create table if not exists calendar_tombstones (
+  user_id uuid references users(id) on delete cascade not null,
+  event_id uuid not null,
+  rsvp_id uuid not null,
+  deleted_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  primary key (user_id, event_id)
+);
+
+create index if not exists idx_calendar_tombstones_user_deleted
+on calendar_tombstones(user_id, deleted_at);
+
+alter table calendar_feeds enable row level security;
+alter table calendar_tombstones enable row level security;
+
+create policy "Users can view their own calendar feed"
+on calendar_feeds for select
+to authenticated
+using (auth.uid() = user_id);
+
+create policy "Users can view their own calendar tombstones"
+on calendar_tombstones for select
+to authenticated
+using (auth.uid() = user_id);
+
+create or replace function touch_calendar(p_user_id uuid)
+returns void as $$
+begin
+  insert into calendar_feeds (user_id) values (p_user_id)
+  on conflict (user_id) do update set
+    version = nextval('calendar_version_seq'),
+    changed_at = now();
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+revoke execute on function touch_calendar(uuid) from public, anon, authenticated;
+
+create or replace function rsvps_touch_calendar()
+returns trigger as $$
+begin
+  if tg_op = 'DELETE' then
+    -- Cascading from the user's own deletion: nothing left to sync
+    if not exists (select 1 from users where id = old.user_id) then
+      return null;
+    end if;
+    insert into calendar_tombstones (user_id, event_id, rsvp_id)
+    values (old.user_id, old.event_id, old.id)
+    on conflict (user_id, event_id) do update set
+      rsvp_id = excluded.rsvp_id,
+      deleted_at = now();
+    perform touch_calendar(old.user_id);
+    return null;
+  end if;
+
+  if tg_op = 'INSERT' then
+    -- A fresh RSVP supersedes an earlier deletion
+    delete from calendar_tombstones
+    where user_id = new.user_id and event_id = new.event_id;
+  end if;
+  perform touch_calendar(new.user_id);
+  return null;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+create or replace trigger rsvps_touch_calendar
+after insert or update or delete on rsvps
+for each row
+execute function rsvps_touch_calendar();
+
+create or replace function events_touch_calendars()
+returns trigger as $$
+begin
+  perform touch_calendar(r.user_id)
+  from rsvps r
+  where r.event_id = new.id;
+  return null;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+-- Only the fields that appear in a calendar entry
+create or replace trigger events_touch_calendars
+after update on events
+for each row
+when (
+  old.title is distinct from new.title
+  or old.description is distinct from new.description
+  or old.location is distinct from new.location
+  or old.start_time is distinct from new.start_time
+  or old.end_time is distinct from new.end_time
+)
+execute function events_touch_calendars();
+
+create or replace function calendar_entries(p_user_id uuid, p_since timestamptz)
+returns jsonb as $$
+  select coalesce(jsonb_agg(jsonb_build_object(
+    'rsvp_id', r.id,
+    'status', r.status,
+    'event_id', e.id,
+    'title', e.title,
+    'description', e.description,
+    'location', e.location,
+    'start_time', e.start_time,
+    'end_time', e.end_time,
+    'updated_at', greatest(r.updated_at, e.updated_at)
+  ) order by e.start_time, e.id), '[]'::jsonb)
+  from rsvps r
+  join events e on e.id = r.event_id
+  where r.user_id = p_user_id
+  and (p_since is null or r.updated_at > p_since or e.updated_at > p_since);
+$$ language sql stable security definer
+set search_path = public, pg_temp;
+
+revoke execute on function calendar_entries(uuid, timestamptz) from public, anon, authenticated;
+
+-- The .ics feed. The URL token is the credential, so this is callable
+-- without a session. Returns null for an unknown token, and omits the
+-- entries when the caller already holds the current version or has seen
+-- everything up to changed_at.
+create or replace function calendar_feed(
+  p_token_hash text,
+  p_version bigint default null,
+  p_modified_since timestamptz default null
+)
+returns jsonb as $$
+declare
+  v_feed calendar_feeds;
+begin
+  select * into v_feed from calendar_feeds where token_hash = p_token_hash;
+  if not found then
+    return null;
+  end if;
+
+  if v_feed.version = p_version
+    or date_trunc('second', v_feed.changed_at) <= p_modified_since then
+    return jsonb_build_object(
+      'version', v_feed.version, 'changed_at', v_feed.changed_at, 'modified', false
+    );
+  end if;
+
+  return jsonb_build_object(
+    'version', v_feed.version,
+    'changed_at', v_feed.changed_at,
+    'modified', true,
+    'entries', (
+      select coalesce(jsonb_agg(entry), '[]'::jsonb)
+      from jsonb_array_elements(calendar_entries(v_feed.user_id, null)) entry
+      where entry->>'status' <> 'not_going'
+    )
+  );
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+-- Delta sync. With p_since null this is a full sync. Otherwise it returns
+-- the caller's RSVPs whose row or event changed after p_since, plus the
+-- tombstones written since then, unless p_version is still current.
+-- updated_at is the writing transaction's start time, so a write that
+-- committed just after the previous sync can carry an earlier timestamp;
+-- the window is widened by a few seconds to catch it, at the cost of
+-- occasionally repeating an entry.
+create or replace function calendar_changes(
+  p_user_id uuid,
+  p_since timestamptz default null,
+  p_version bigint default null,
+  p_retention_days integer default 30
+)
+returns jsonb as $$
+declare
+  v_version bigint;
+  v_as_of timestamptz := now();
+  v_since timestamptz := p_since - interval '5 seconds';
+begin
+  if auth.uid() is not null and auth.uid() <> p_user_id then
+    raise exception 'cannot sync another user''s calendar' using errcode = 'PT403';
+  end if;
+
+  select coalesce(max(version), 0) into v_version
+  from calendar_feeds where user_id = p_user_id;
+
+  if p_since is not null and v_version = p_version then
+    return jsonb_build_object(
+      'version', v_version, 'as_of', v_as_of, 'modified', false
+    );
+  end if;
+
+  if p_since < now() - make_interval(days => p_retention_days) then
+    raise exception 'sync token expired' using errcode = 'PT410';
+  end if;
+
+  delete from calendar_tombstones
+  where user_id = p_user_id
+  and deleted_at < now() - make_interval(days => p_retention_days);
+
+  return jsonb_build_object(
+    'version', v_version,
+    'as_of', v_as_of,
+    'modified', true,
+    'entries', calendar_entries(p_user_id, v_since),
+    'deleted', (
+      select coalesce(jsonb_agg(jsonb_build_object(
+        'rsvp_id', t.rsvp_id, 'event_id', t.event_id, 'deleted_at', t.deleted_at
+      ) order by t.deleted_at), '[]'::jsonb)
+      from calendar_tombstones t
+      where p_since is not null
+      and t.user_id = p_user_id
+      and t.deleted_at > v_since
+    )
+  );
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+revoke execute on function calendar_changes(uuid, timestamptz, bigint, integer)
+from public, anon, authenticated;
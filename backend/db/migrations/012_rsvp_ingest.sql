@@ -0,0 +1,43 @@
+-- Batched apply for the write-behind RSVP queue (RSVP_INGEST_MODE=queue,
+-- app/services/rsvp_queue.py). The API has already authenticated each row's
+-- user when it journaled the RSVP, so this is only callable with the
+-- service role. Same shape as rsvp_upsert_many: p_rsvps is a JSON array of
+-- {event_id, user_id, status}, the result has one {index, rsvp} or
+-- {index, code, message} entry per row, and rows are applied in event_id
+-- order, each in its own subtransaction. Rows for the same event keep their
+-- order, so the latest RSVP of a user wins.
+
+create or replace function rsvp_apply_batch(p_rsvps jsonb)
+returns jsonb as $$
+declare
+  v_item record;
+  v_rsvp rsvps;
+  v_results jsonb := '[]'::jsonb;
+begin
+  for v_item in
+    select ordinality - 1 as index, value
+    from jsonb_array_elements(p_rsvps) with ordinality
+    order by value->>'event_id', ordinality
+  loop
+    begin
+      v_rsvp := rsvp_apply(
+        (v_item.value->>'event_id')::uuid,
+        (v_item.value->>'user_id')::uuid,
+        v_item.value->>'status'
+      );
+      v_results := v_results || jsonb_build_object(
+        'index', v_item.index, 'rsvp', to_jsonb(v_rsvp)
+      );
+    exception when others then
+      v_results := v_results || jsonb_build_object(
+        'index', v_item.index, 'code', sqlstate, 'message', sqlerrm
+      );
+    end;
+  end loop;
+
+  return v_results;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+revoke execute on function rsvp_apply_batch(jsonb) from public, anon, authenticated;
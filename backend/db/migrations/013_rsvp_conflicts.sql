@@ -0,0 +1,128 @@
+-- Schedule conflicts between the events a user is going to.
+--
+-- rsvp_schedule holds one row per 'going' RSVP with its event's time range,
+-- kept in sync by triggers on rsvps (including waitlist promotions made
+-- inside the database) and on events. A GiST index on (user_id, period)
+-- answers "which of this user's events overlap this range" in
+-- O(log n + k), so no request ever compares a user's events pairwise.
+create extension if not exists btree_gist;
+
+create table if not exists rsvp_schedule (
+  user_id uuid references users(id) on delete cascade not null,
+  event_id uuid references events(id) on delete cascade not null,
+  period tstzrange not null,
+  primary key (user_id, event_id)
+);
+
+create index if not exists idx_rsvp_schedule_user_period
+on rsvp_schedule using gist (user_id, period);
+
+-- Internal; read through rsvp_conflicts
+alter table rsvp_schedule enable row level security;
+
+insert into rsvp_schedule (user_id, event_id, period)
+select r.user_id, r.event_id, tstzrange(e.start_time, e.end_time)
+from rsvps r
+join events e on e.id = r.event_id
+where r.status = 'going'
+on conflict do nothing;
+
+create or replace function rsvps_sync_schedule()
+returns trigger as $$
+begin
+  if tg_op <> 'INSERT' and old.status = 'going' then
+    delete from rsvp_schedule
+    where user_id = old.user_id and event_id = old.event_id;
+  end if;
+  if tg_op <> 'DELETE' and new.status = 'going' then
+    insert into rsvp_schedule (user_id, event_id, period)
+    select new.user_id, new.event_id, tstzrange(e.start_time, e.end_time)
+    from events e
+    where e.id = new.event_id
+    on conflict (user_id, event_id) do update set period = excluded.period;
+  end if;
+  return null;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+create or replace trigger rsvps_sync_schedule
+after insert or update of status, event_id, user_id or delete on rsvps
+for each row
+execute function rsvps_sync_schedule();
+
+create or replace function events_sync_schedule()
+returns trigger as $$
+begin
+  update rsvp_schedule
+  set period = tstzrange(new.start_time, new.end_time)
+  where event_id = new.id;
+  return null;
+end;
+$$ language plpgsql security definer
+set search_path = public, pg_temp;
+
+create or replace trigger events_sync_schedule
+after update of start_time, end_time on events
+for each row
+when (
+  old.start_time is distinct from new.start_time
+  or old.end_time is distinct from new.end_time
+)
+execute function events_sync_schedule();
+
+-- With p_event_id: the user's 'going' events overlapping that event (which
+-- need not be one of them yet). Without: every overlapping pair of the
+-- user's 'going' events, each pair once.
+create or replace function rsvp_conflicts(p_user_id uuid, p_event_id uuid default null)
+returns table (
+  event_id uuid,
+  title text,
+  start_time timestamptz,
+  end_time timestamptz,
+  conflict_id uuid,
+  conflict_title text,
+  conflict_start_time timestamptz,
+  conflict_end_time timestamptz
+) as $$
+begin
+  if auth.uid() is not null and auth.uid() <> p_user_id then
+    raise exception 'cannot read another user''s schedule' using errcode = 'PT403';
+  end if;
+
+  if p_event_id is not null then
+    if not exists (select 1 from events e where e.id = p_event_id) then
+      raise exception 'event not found' using errcode = 'PT404';
+    end if;
+    return query
+    select e.id, e.title, e.start_time, e.end_time,
+           o.id, o.title, o.start_time, o.end_time
+    from events e
+    join rsvp_schedule s
+      on s.user_id = p_user_id
+     and s.period && tstzrange(e.start_time, e.end_time)
+     and s.event_id <> e.id
+    join events o on o.id = s.event_id
+    where e.id = p_event_id
+    order by o.start_time, o.id;
+    return;
+  end if;
+
+  return query
+  select e.id, e.title, e.start_time, e.end_time,
+         o.id, o.title, o.start_time, o.end_time
+  from rsvp_schedule a
+  join rsvp_schedule b
+    on b.user_id = a.user_id
+   and b.period && a.period
+   and b.event_id <> a.event_id
+  join events e on e.id = a.event_id
+  join events o on o.id = b.event_id
+  where a.user_id = p_user_id
+    and (e.start_time, e.id) < (o.start_time, o.id)
+  order by e.start_time, e.id, o.start_time, o.id;
+end;
+$$ language plpgsql stable security definer
+set search_path = public, pg_temp;
+
+revoke execute on function rsvp_conflicts(uuid, uuid) from public, anon, authenticated;
@@ -0,0 +1,89 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.series import SeriesCreate
+from app.utils.recurrence import MAX_COUNT, Recurrence
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "rule, dtstart",
+    [
+        ("FREQ=DAILY;COUNT=10", utc(2024, 1, 1, 9)),
+        ("FREQ=DAILY;INTERVAL=3;UNTIL=20240301T090000Z", utc(2024, 1, 1, 9)),
+        ("FREQ=DAILY;UNTIL=20240105", utc(2024, 1, 1, 9)),
+        ("FREQ=WEEKLY;COUNT=9", utc(2024, 1, 3, 18)),
+        ("FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=7", utc(2024, 1, 3, 18)),
+        ("FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,SU;UNTIL=20240601", utc(2024, 1, 3, 18)),
+        ("FREQ=WEEKLY;BYDAY=MO;UNTIL=20240108T180000Z", utc(2024, 1, 1, 18)),
+        ("FREQ=MONTHLY;COUNT=13", utc(2024, 1, 15, 12)),
+        ("FREQ=MONTHLY;COUNT=13", utc(2024, 1, 31, 12)),
+        ("FREQ=MONTHLY;INTERVAL=5;UNTIL=20400101", utc(2024, 1, 29, 12)),
+        ("FREQ=MONTHLY;INTERVAL=12;COUNT=5", utc(2096, 2, 29, 12)),
+        ("FREQ=MONTHLY;INTERVAL=7;UNTIL=20310531T120000Z", utc(2024, 5, 31, 12)),
+    ],
+)
+def test_last_matches_expansion(rule, dtstart):
+    recurrence = Recurrence.parse(rule)
+    assert recurrence.last(dtstart) == list(recurrence.between(dtstart))[-1]
+
+
+def test_last_before_first_occurrence():
+    rule = Recurrence.parse("FREQ=DAILY;UNTIL=20231231")
+    assert rule.last(utc(2024, 1, 1, 9)) is None
+    assert Recurrence.parse("FREQ=WEEKLY").last(utc(2024, 1, 1)) is None
+
+
+@pytest.mark.parametrize(
+    "rule, expected",
+    [
+        ("FREQ=DAILY;UNTIL=99991231", utc(9999, 12, 30, 9)),
+        ("FREQ=WEEKLY;BYDAY=MO,FR;UNTIL=99991231", utc(9999, 12, 27, 9)),
+        ("FREQ=MONTHLY;UNTIL=99991231", utc(9999, 12, 30, 9)),
+        ("FREQ=DAILY;INTERVAL=100000000;COUNT=5", utc(2024, 1, 30, 9)),
+        (f"FREQ=MONTHLY;INTERVAL=100000;COUNT={MAX_COUNT}", utc(2024, 1, 30, 9)),
+    ],
+)
+def test_last_stops_at_latest_datetime(rule, expected):
+    started = time.perf_counter()
+    assert Recurrence.parse(rule).last(utc(2024, 1, 30, 9)) == expected
+    assert time.perf_counter() - started < 1
+
+
+@pytest.mark.parametrize(
+    "rule",
+    ["FREQ=DAILY", "FREQ=WEEKLY;BYDAY=MO,FR", "FREQ=MONTHLY", "FREQ=DAILY;INTERVAL=7"],
+)
+def test_expansion_ends_at_latest_datetime(rule):
+    starts = list(Recurrence.parse(rule).between(utc(2024, 1, 31), utc(9999, 12, 1)))
+    assert starts and starts[-1].year == 9999
+
+
+def series(rrule: str) -> dict:
+    return {
+        "title": "Standup",
+        "start_time": utc(2024, 1, 1, 9),
+        "end_time": utc(2024, 1, 1, 10),
+        "rrule": rrule,
+    }
+
+
+def test_schema_rejects_until_beyond_horizon():
+    with pytest.raises(ValidationError, match="UNTIL must be before"):
+        SeriesCreate(**series("FREQ=MONTHLY;UNTIL=99991231"))
+    with pytest.raises(ValidationError, match="UNTIL must be before"):
+        SeriesCreate(**series("FREQ=DAILY;UNTIL=22000101"))
+    created = SeriesCreate(**series("FREQ=DAILY;UNTIL=21991231"))
+    assert created.rrule == "FREQ=DAILY;UNTIL=21991231T000000Z"
+
+
+def test_schema_caps_count():
+    with pytest.raises(ValidationError, match="COUNT must be between"):
+        SeriesCreate(**series(f"FREQ=DAILY;COUNT={MAX_COUNT + 1}"))
+    assert SeriesCreate(**series(f"FREQ=DAILY;COUNT={MAX_COUNT}"))